@@ -0,0 +1,57 @@
+"""
+Read latency of a slow endpoint under concurrent load, uncached,
+cached with a short ttl, and cached with a stale window to refresh in.
+
+python3 -m benchmarks.cached_benchmark
+"""
+import statistics
+import threading
+import time
+
+import flask
+
+from jason import cached
+
+THREADS = 4
+REQUESTS = 300
+WORK = 0.005
+
+
+def make_app():
+    app = flask.Flask(__name__)
+
+    def items():
+        time.sleep(WORK)
+        return flask.jsonify(list(range(100)))
+
+    app.add_url_rule("/uncached", "uncached", items)
+    app.add_url_rule("/cached", "cached", cached(ttl=0.05)(items))
+    app.add_url_rule("/stale", "stale", cached(ttl=0.05, stale=1)(items))
+    return app
+
+
+def measure(app, path):
+    timings = []
+
+    def worker():
+        client = app.test_client()
+        for _ in range(REQUESTS):
+            start = time.perf_counter()
+            client.get(path)
+            timings.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[int(len(timings) * 0.99)]
+    print(f"{path:<10} p50 {p50 * 1e3:>7.2f} ms   p99 {p99 * 1e3:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    app = make_app()
+    for path in ("/uncached", "/cached", "/stale"):
+        measure(app, path)
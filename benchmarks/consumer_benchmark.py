@@ -0,0 +1,113 @@
+"""
+To run this, you will need 'flask_sqlalchemy' and 'kombu' installed.
+
+Compares the per-message consumer from examples/consumer_example.py
+with jason.ext.kombu.BatchConsumer, using kombu's in-memory transport
+and a sqlite database so that only the consumer overhead is measured.
+
+python3 -m benchmarks.consumer_benchmark
+"""
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from kombu import Connection, Exchange, Queue
+
+from jason import make_config, props
+from jason.ext.kombu import BatchConsumer
+from jason.ext.sqlalchemy import SQLAlchemy
+from jason.service import App
+
+MESSAGES = 5000
+URL = "memory://"
+
+db = SQLAlchemy()
+exchange = Exchange("bench_exchange", "direct")
+
+
+class MyModel(db.Model):
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    created = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    name = db.Column(db.String, nullable=False)
+
+
+class CreateItemSchema(props.Model):
+    name = props.String(min_length=3, max_length=32)
+
+
+def make_app(path):
+    config = make_config("postgres", "rabbit").load(test_db_url=f"sqlite:///{path}")
+    app = App(__name__, config=config, testing=True)
+    db.init_app(app)
+    return app
+
+
+def publish(queue):
+    with Connection(URL) as connection:
+        producer = connection.Producer()
+        for i in range(MESSAGES):
+            producer.publish(
+                {"name": f"item-{i}"},
+                exchange=exchange,
+                routing_key=queue.routing_key,
+                declare=[queue],
+            )
+
+
+def per_message(app, queue):
+    count = 0
+    schema = props.Nested(CreateItemSchema)
+
+    def on_message(body, message):
+        nonlocal count
+        with app.app_context():
+            db.session.add(MyModel(**schema.load(body)))
+            db.session.commit()
+        message.ack()
+        count += 1
+
+    with Connection(URL) as connection:
+        with connection.Consumer(queue, callbacks=[on_message]):
+            while count < MESSAGES:
+                connection.drain_events(timeout=1)
+
+
+def batched(app, queue, batch_size):
+    @BatchConsumer(
+        queue,
+        batch_size=batch_size,
+        batch_timeout=0.1,
+        model=CreateItemSchema,
+        database=db,
+        connection_url=URL,
+    )
+    def consumer(items):
+        db.session.bulk_insert_mappings(MyModel, items)
+
+    thread = threading.Thread(target=consumer, kwargs={"app": app})
+    thread.start()
+    while consumer.consumer.messages < MESSAGES:
+        time.sleep(0.001)
+    consumer.consumer.stop()
+    thread.join()
+
+
+def measure(name, func, *args):
+    with tempfile.TemporaryDirectory() as directory:
+        app = make_app(os.path.join(directory, "bench.db"))
+        queue = Queue(name, exchange=exchange, routing_key=name)
+        publish(queue)
+        start = time.perf_counter()
+        func(app, queue, *args)
+        elapsed = time.perf_counter() - start
+        with app.app_context():
+            assert MyModel.query.count() == MESSAGES
+    print(f"{name:<24} {MESSAGES / elapsed:>10.0f} msg/s")
+
+
+if __name__ == "__main__":
+    measure("per-message", per_message)
+    for size in (10, 100, 500):
+        measure(f"batched ({size})", batched, size)
@@ -0,0 +1,75 @@
+"""
+Compares PyJWT with jason.token.hs256.HS256 when encoding and decoding
+the same HS256 tokens, using the options jason.token.Handler decodes with.
+
+python3 -m benchmarks.hs256_benchmark
+"""
+import time
+
+import jwt
+
+from jason.token import Handler
+from jason.token.hs256 import HS256
+
+ROUNDS = 20000
+KEY = "secret"
+
+
+def claims():
+    now = time.time()
+    return {
+        "iat": now,
+        "nbf": now,
+        "exp": now + 60,
+        "iss": "issuer",
+        "aud": "audience",
+        "uid": "user-id",
+        "scp": ["read:thing", "write:thing"],
+    }
+
+
+def pyjwt_encode():
+    return jwt.encode(claims(), KEY, algorithm="HS256")
+
+
+def pyjwt_decode(token):
+    return jwt.decode(
+        token,
+        KEY,
+        algorithms=["HS256"],
+        options=Handler.DECODER_OPTIONS,
+        issuer="issuer",
+        audience="audience",
+    )
+
+
+signer = HS256(KEY)
+
+
+def fast_encode():
+    return signer.encode(claims())
+
+
+def fast_decode(token):
+    return signer.decode(
+        token,
+        options=Handler.DECODER_OPTIONS,
+        issuer="issuer",
+        audience="audience",
+    )
+
+
+def measure(name, func, *args):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<16} {elapsed / ROUNDS * 1e6:>8.2f} us/op")
+
+
+if __name__ == "__main__":
+    token = pyjwt_encode()
+    measure("pyjwt encode", pyjwt_encode)
+    measure("hs256 encode", fast_encode)
+    measure("pyjwt decode", pyjwt_decode, token)
+    measure("hs256 decode", fast_decode, token)
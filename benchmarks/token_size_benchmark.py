@@ -0,0 +1,53 @@
+"""
+Compares the size of the token header and the time taken to generate and
+decode it, with and without a jason.token.ClaimCodec.
+
+python3 -m benchmarks.token_size_benchmark
+"""
+import time
+
+from jason import token
+
+ROUNDS = 2000
+SCOPES = [f"{action}:{thing}" for action in ("read", "write") for thing in range(60)]
+CLAIMS = {"tenant_identifier": "d0c7e6b1-9c7a-4c38-9a7a-3f1c2e6b4f1a"}
+
+
+def make_handler(claim_codec):
+    return token.Handler(
+        key="secret",
+        lifespan=60,
+        algorithm="HS256",
+        issuer="issuer",
+        audience="audience",
+        verify=True,
+        encryption_key="encryption-key",
+        claim_codec=claim_codec,
+    )
+
+
+def measure(name, handler):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        token_string = handler.generate_token("user-id", SCOPES, dict(CLAIMS))
+    encode = (time.perf_counter() - start) / ROUNDS
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        handler.decode_token(token_string)
+    decode = (time.perf_counter() - start) / ROUNDS
+    print(
+        f"{name:<24} {len(token_string):>8} bytes "
+        f"{encode * 1e6:>8.1f} us encode {decode * 1e6:>8.1f} us decode"
+    )
+
+
+if __name__ == "__main__":
+    measure("plain", make_handler([]))
+    measure(
+        "short keys",
+        make_handler(token.ClaimCodec({"tenant_identifier": "t"}, compress=False)),
+    )
+    measure(
+        "short keys + deflate",
+        make_handler(token.ClaimCodec({"tenant_identifier": "t"})),
+    )
@@ -15,7 +15,7 @@ from datetime import datetime
 
 from flask import Blueprint, jsonify
 
-from jason import make_config, props, request_schema, service
+from jason import conditional, make_config, props, request_schema, service
 from jason.ext.sqlalchemy import SQLAlchemy
 
 blueprint = Blueprint("simple_api", __name__)
@@ -49,5 +49,6 @@ def create_item(json):
 
 
 @blueprint.route("/", methods=["GET"])
+@conditional(max_age=5)
 def get_item_list():
     return jsonify([obj.dict for obj in MyModel.query.all()])
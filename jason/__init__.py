@@ -1,9 +1,20 @@
 from . import crypto, props
+from .service import Cached as _Cached
+from .service import Conditional as _Conditional
 from .service import RequestSchema as _RequestSchema
-from .service import Service, ServiceConfig, ServiceThreads, make_config, mixins
+from .service import (
+    Service,
+    ServiceConfig,
+    ServiceThreads,
+    make_config,
+    mixins,
+    stream_json,
+)
 from .token import Handler
 from .token import Protect as _Protect
 from .token import TokenValidationError
 
 service = Service
 request_schema = _RequestSchema
+conditional = _Conditional
+cached = _Cached
@@ -1 +1,11 @@
-from .chacha20 import ChaCha20
+from .aead import (
+    CIPHERS,
+    AEADCipher,
+    available_ciphers,
+    fastest_cipher,
+    get_cipher,
+    register,
+)
+from .aes import AESGCM
+from .chacha20 import ChaCha20, XChaCha20
+from .stream import StreamDecryptor, StreamEncryptor, decrypt_stream, encrypt_stream
@@ -0,0 +1,126 @@
+"""
+jason.crypto.aead.py
+
+the envelope and registry shared by every AEAD cipher
+
+envelopes are url safe base64 of
+version 2: version (1 byte) + cipher id (1 byte) + nonce + cipher text + tag
+version 1: version (1 byte) + nonce + cipher text + tag, always ChaCha20-Poly1305
+"""
+import base64
+import time
+from typing import Dict, Iterable, List, Type, Union
+
+from Crypto.Random import get_random_bytes
+
+CIPHERS: Dict[str, Type["AEADCipher"]] = {}
+CIPHER_IDS: Dict[int, Type["AEADCipher"]] = {}
+
+ENVELOPE_VERSION = 2
+# version 1 envelopes and legacy tokens don't record a cipher
+DEFAULT_CIPHER_ID = 1
+
+
+def register(cls: Type["AEADCipher"]) -> Type["AEADCipher"]:
+    if cls.cipher_id in CIPHER_IDS and CIPHER_IDS[cls.cipher_id] is not cls:
+        raise ValueError(f"cipher id {cls.cipher_id} is already registered")
+    CIPHERS[cls.name] = cls
+    CIPHER_IDS[cls.cipher_id] = cls
+    return cls
+
+
+def available_ciphers() -> List[str]:
+    return [name for name, cls in CIPHERS.items() if cls.available()]
+
+
+def get_cipher(name: str) -> Type["AEADCipher"]:
+    if name not in CIPHERS:
+        raise ValueError(
+            f"unknown cipher '{name}'. valid ciphers are: {', '.join(CIPHERS)}"
+        )
+    if not CIPHERS[name].available():
+        raise ValueError(f"cipher '{name}' is not supported by this pycryptodome")
+    return CIPHERS[name]
+
+
+def fastest_cipher(
+    key: str, names: Iterable[str] = None, size: int = 1024, rounds: int = 200
+) -> "AEADCipher":
+    sample = get_random_bytes(size)
+    timings = {}
+    for name in names or available_ciphers():
+        cipher = get_cipher(name)(key)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            cipher.decrypt_bytes(cipher.encrypt_bytes(sample))
+        timings[name] = (time.perf_counter() - start, cipher)
+    if not timings:
+        raise ValueError("no ciphers are available")
+    return min(timings.values(), key=lambda timing: timing[0])[1]
+
+
+class AEADCipher:
+    name: str = None
+    cipher_id: int = None
+    encoding = "utf8"
+    nonce_length = 12
+    tag_length = 16
+    _key_length = 32
+
+    def __init__(self, key: str):
+        self.secret = key
+        key = key.rjust(self._key_length)
+        self.key = key.encode(self.encoding)
+        self._ciphers = {self.cipher_id: self}
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def _new(self, nonce: bytes):
+        raise NotImplementedError
+
+    def _cipher(self, cipher_id: int) -> "AEADCipher":
+        # tokens from the rest of the fleet may have used a different cipher
+        if cipher_id not in self._ciphers:
+            if cipher_id not in CIPHER_IDS:
+                raise ValueError(f"unknown cipher id {cipher_id}")
+            self._ciphers[cipher_id] = CIPHER_IDS[cipher_id](self.secret)
+        return self._ciphers[cipher_id]
+
+    def encrypt_bytes(self, plain_text: bytes) -> bytes:
+        nonce = get_random_bytes(self.nonce_length)
+        cipher_bytes, tag = self._new(nonce).encrypt_and_digest(plain_text)
+        return bytes((ENVELOPE_VERSION, self.cipher_id)) + nonce + cipher_bytes + tag
+
+    def decrypt_bytes(self, envelope: bytes) -> bytes:
+        if envelope[:1] == bytes((ENVELOPE_VERSION,)) and len(envelope) > 1:
+            return self._cipher(envelope[1]).open(envelope[2:])
+        if envelope[:1] == b"\x01":
+            return self._cipher(DEFAULT_CIPHER_ID).open(envelope[1:])
+        raise ValueError(f"unsupported envelope version {envelope[:1]}")
+
+    def open(self, sealed: bytes) -> bytes:
+        if len(sealed) < self.nonce_length + self.tag_length:
+            raise ValueError("encrypted token is too short")
+        nonce = sealed[: self.nonce_length]
+        return self._new(nonce).decrypt_and_verify(
+            sealed[self.nonce_length : -self.tag_length], sealed[-self.tag_length :]
+        )
+
+    def encrypt(self, plain_text: Union[str, bytes]) -> str:
+        if isinstance(plain_text, str):
+            plain_text = plain_text.encode(self.encoding)
+        envelope = self.encrypt_bytes(plain_text)
+        return base64.urlsafe_b64encode(envelope).rstrip(b"=").decode(self.encoding)
+
+    def decrypt(self, encrypted: Union[str, bytes]) -> str:
+        if isinstance(encrypted, bytes):
+            encrypted = encrypted.decode(self.encoding)
+        # the legacy format always ends in the padding of its 8 byte nonce,
+        # envelopes are never padded
+        if encrypted.endswith("="):
+            return self._cipher(DEFAULT_CIPHER_ID).decrypt_legacy(encrypted)
+        encrypted = encrypted.encode(self.encoding)
+        envelope = base64.urlsafe_b64decode(encrypted + b"=" * (-len(encrypted) % 4))
+        return self.decrypt_bytes(envelope).decode(self.encoding)
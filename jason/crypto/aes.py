@@ -0,0 +1,17 @@
+"""
+jason.crypto.aes.py
+
+wraps AES-GCM in Crypto.Cipher from pycryptodome, which uses AES-NI where the cpu has it
+"""
+from Crypto.Cipher import AES
+
+from .aead import AEADCipher, register
+
+
+@register
+class AESGCM(AEADCipher):
+    name = "aes-gcm"
+    cipher_id = 3
+
+    def _new(self, nonce: bytes):
+        return AES.new(self.key, AES.MODE_GCM, nonce=nonce, mac_len=self.tag_length)
@@ -1,24 +1,27 @@
 """
 jason.crypto.chacha20.py
 
-wraps ChaCha20 in Crypto.Cipher from pycryptodome
+wraps ChaCha20-Poly1305 and XChaCha20-Poly1305 in Crypto.Cipher from pycryptodome
 """
 import base64
 import re
 
 from Crypto.Cipher import ChaCha20 as _ChaCha20
+from Crypto.Cipher import ChaCha20_Poly1305 as _ChaCha20_Poly1305
 
+from .aead import AEADCipher, register
 
-class ChaCha20:
-    encoding = "utf8"
+
+@register
+class ChaCha20(AEADCipher):
+    name = "chacha20-poly1305"
+    cipher_id = 1
     _join_char = "-"
     _join_string = _join_char * 2
-    _key_length = 32
     _escape = (_join_char, f"%{_join_char}")
 
-    def __init__(self, key: str):
-        key = key.rjust(self._key_length)
-        self.key = key.encode(self.encoding)
+    def _new(self, nonce: bytes):
+        return _ChaCha20_Poly1305.new(key=self.key, nonce=nonce)
 
     def escape(self, string: str) -> str:
         return re.sub(self._escape[0], self._escape[1], string)
@@ -26,19 +29,29 @@ class ChaCha20:
     def un_escape(self, string: str) -> str:
         return re.sub(self._escape[1], self._escape[0], string)
 
-    def encrypt(self, plain_text: str) -> str:
-        cipher = _ChaCha20.new(key=self.key)
-        if isinstance(plain_text, str):
-            plain_text = plain_text.encode(self.encoding)
-        cipher_bytes = cipher.encrypt(plain_text)
-        nonce = base64.b64encode(cipher.nonce).decode(self.encoding)
-        cipher_text = base64.b64encode(cipher_bytes).decode(self.encoding)
-        return f"{self.escape(cipher_text)}{self._join_string}{self.escape(nonce)}"
-
-    def decrypt(self, encrypted: str) -> str:
+    def decrypt_legacy(self, encrypted: str) -> str:
         cipher_text, nonce = encrypted.split(self._join_string)
         cipher_text = base64.b64decode(self.un_escape(cipher_text))
         nonce = base64.b64decode(self.un_escape(nonce))
         cipher = _ChaCha20.new(key=self.key, nonce=nonce)
         plain_text = cipher.decrypt(cipher_text)
         return plain_text.decode(self.encoding)
+
+
+@register
+class XChaCha20(AEADCipher):
+    name = "xchacha20-poly1305"
+    cipher_id = 2
+    nonce_length = 24
+
+    @classmethod
+    def available(cls) -> bool:
+        # 24 byte nonces need pycryptodome 3.9 or later
+        try:
+            _ChaCha20_Poly1305.new(key=bytes(32), nonce=bytes(cls.nonce_length))
+        except ValueError:
+            return False
+        return True
+
+    def _new(self, nonce: bytes):
+        return _ChaCha20_Poly1305.new(key=self.key, nonce=nonce)
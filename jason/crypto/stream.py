@@ -0,0 +1,172 @@
+"""
+jason.crypto.stream.py
+
+chunked ChaCha20-Poly1305 for payloads too large to hold in memory
+
+a stream is a header of
+version (1 byte) + chunk size (4 bytes) + nonce prefix (7 bytes)
+followed by chunks of up to `chunk size` bytes of cipher text, each with a 16 byte tag.
+each chunk's nonce is the prefix + its index (4 bytes) + a final chunk flag (1 byte),
+so chunks can't be reordered, dropped or truncated without failing authentication.
+"""
+from typing import Iterable, Iterator, Union
+
+from Crypto.Cipher import ChaCha20_Poly1305 as _ChaCha20_Poly1305
+from Crypto.Random import get_random_bytes
+
+VERSION = 1
+HEADER_LENGTH = 12
+TAG_LENGTH = 16
+PREFIX_LENGTH = 7
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1024 * 1024
+_MAX_CHUNKS = 2**32
+
+
+def _key(key: Union[str, bytes]) -> bytes:
+    # the same key derivation as jason.crypto.ChaCha20, so one secret serves both
+    if isinstance(key, str):
+        key = key.rjust(32).encode("utf8")
+    if len(key) != 32:
+        raise ValueError("key must be 32 bytes")
+    return key
+
+
+class StreamEncryptor:
+    def __init__(self, key: Union[str, bytes], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+        self.key = _key(key)
+        self.chunk_size = chunk_size
+        self.prefix = get_random_bytes(PREFIX_LENGTH)
+        self.header = bytes((VERSION,)) + chunk_size.to_bytes(4, "big") + self.prefix
+        self.index = 0
+        self.finalized = False
+        self._buffer = bytearray()
+        self._header_sent = False
+
+    def _seal(self, plain_text: bytes, final: bool) -> bytes:
+        if self.index >= _MAX_CHUNKS:
+            raise ValueError("stream is too long")
+        nonce = self.prefix + self.index.to_bytes(4, "big") + bytes((final,))
+        cipher = _ChaCha20_Poly1305.new(key=self.key, nonce=nonce)
+        cipher.update(self.header)
+        cipher_text, tag = cipher.encrypt_and_digest(plain_text)
+        self.index += 1
+        return cipher_text + tag
+
+    def _start(self) -> bytes:
+        if self._header_sent:
+            return b""
+        self._header_sent = True
+        return self.header
+
+    def update(self, data: bytes) -> bytes:
+        if self.finalized:
+            raise ValueError("stream has already been finalized")
+        self._buffer += data
+        out = [self._start()]
+        # always hold back at least one byte, the last chunk has to be sealed as final
+        while len(self._buffer) > self.chunk_size:
+            out.append(self._seal(bytes(self._buffer[: self.chunk_size]), False))
+            del self._buffer[: self.chunk_size]
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        if self.finalized:
+            raise ValueError("stream has already been finalized")
+        self.finalized = True
+        out = self._start() + self._seal(bytes(self._buffer), True)
+        self._buffer.clear()
+        return out
+
+
+class StreamDecryptor:
+    def __init__(self, key: Union[str, bytes], max_chunk_size: int = MAX_CHUNK_SIZE):
+        self.key = _key(key)
+        self.max_chunk_size = max_chunk_size
+        self.header = None
+        self.chunk_size = None
+        self.prefix = None
+        self.index = 0
+        self.finalized = False
+        self._buffer = bytearray()
+
+    def _read_header(self) -> bool:
+        if len(self._buffer) < HEADER_LENGTH:
+            return False
+        header = bytes(self._buffer[:HEADER_LENGTH])
+        if header[0] != VERSION:
+            raise ValueError(f"unsupported stream version {header[0]}")
+        chunk_size = int.from_bytes(header[1:5], "big")
+        if not 0 < chunk_size <= self.max_chunk_size:
+            raise ValueError(f"stream chunk size {chunk_size} is not allowed")
+        self.header = header
+        self.chunk_size = chunk_size
+        self.prefix = header[5:]
+        del self._buffer[:HEADER_LENGTH]
+        return True
+
+    def _open(self, sealed: bytes, final: bool) -> bytes:
+        if self.index >= _MAX_CHUNKS:
+            raise ValueError("stream is too long")
+        nonce = self.prefix + self.index.to_bytes(4, "big") + bytes((final,))
+        cipher = _ChaCha20_Poly1305.new(key=self.key, nonce=nonce)
+        cipher.update(self.header)
+        plain_text = cipher.decrypt_and_verify(
+            sealed[:-TAG_LENGTH], sealed[-TAG_LENGTH:]
+        )
+        self.index += 1
+        return plain_text
+
+    def update(self, data: bytes) -> bytes:
+        if self.finalized:
+            raise ValueError("stream has already been finalized")
+        self._buffer += data
+        if self.header is None and not self._read_header():
+            return b""
+        sealed_size = self.chunk_size + TAG_LENGTH
+        out = []
+        # a full chunk is only known not to be the last once more data follows it
+        while len(self._buffer) > sealed_size:
+            out.append(self._open(bytes(self._buffer[:sealed_size]), False))
+            del self._buffer[:sealed_size]
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        if self.finalized:
+            raise ValueError("stream has already been finalized")
+        self.finalized = True
+        if self.header is None and not self._read_header():
+            raise ValueError("stream is truncated")
+        if len(self._buffer) < TAG_LENGTH:
+            raise ValueError("stream is truncated")
+        plain_text = self._open(bytes(self._buffer), True)
+        self._buffer.clear()
+        return plain_text
+
+
+def encrypt_stream(
+    key: Union[str, bytes],
+    chunks: Iterable[bytes],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    encryptor = StreamEncryptor(key, chunk_size=chunk_size)
+    for chunk in chunks:
+        out = encryptor.update(chunk)
+        if out:
+            yield out
+    yield encryptor.finalize()
+
+
+def decrypt_stream(
+    key: Union[str, bytes],
+    chunks: Iterable[bytes],
+    max_chunk_size: int = MAX_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    decryptor = StreamDecryptor(key, max_chunk_size=max_chunk_size)
+    for chunk in chunks:
+        out = decryptor.update(chunk)
+        if out:
+            yield out
+    yield decryptor.finalize()
@@ -0,0 +1,176 @@
+import functools
+import logging
+import socket
+import threading
+import time
+from typing import Any, Callable, List, NoReturn, Sequence, Tuple, Type, Union
+
+from jason import mixins, props
+
+try:
+    import kombu
+except ImportError as ex:
+    raise ImportError(
+        "jason.ext.kombu requires kombu, install it with 'pip install kombu'"
+    ) from ex
+
+logger = logging.getLogger(__name__)
+
+
+class BatchConsumer:
+    def __init__(
+        self,
+        queues: Union[kombu.Queue, Sequence[kombu.Queue]],
+        batch_size: int = 100,
+        batch_timeout: float = 1.0,
+        prefetch_count: int = None,
+        model: Type[props.Model] = None,
+        database: Any = None,
+        connection_url: str = None,
+    ):
+        if isinstance(queues, kombu.Queue):
+            queues = [queues]
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.queues = list(queues)
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.prefetch_count = prefetch_count or batch_size * 2
+        self.schema = props.Nested(model) if model is not None else None
+        self.database = database
+        self.connection_url = connection_url
+        self.handler = None
+        self.batches = 0
+        self.messages = 0
+        self.rejected = 0
+        self._pending: List[Tuple[Any, kombu.Message]] = []
+        self._first_received = None
+        self._multiple_ack = False
+        self._stopped = threading.Event()
+
+    def __call__(self, func: Callable[[List[Any]], Any]) -> Callable:
+        self.handler = func
+
+        @functools.wraps(func)
+        def run(app: Any = None, **kwargs: Any) -> NoReturn:
+            self.run(app)
+
+        run.consumer = self
+        return run
+
+    def connection(self, app: Any) -> kombu.Connection:
+        if self.connection_url is not None:
+            return kombu.Connection(self.connection_url)
+        app.assert_mixin(mixins.RabbitConfigMixin, "batch consumer")
+        return kombu.Connection(
+            hostname=app.config.RABBIT_HOST,
+            port=app.config.RABBIT_PORT,
+            userid=app.config.RABBIT_USER,
+            password=app.config.RABBIT_PASS,
+        )
+
+    def stop(self) -> NoReturn:
+        self._stopped.set()
+
+    def run(self, app: Any) -> NoReturn:
+        if self.handler is None:
+            raise ValueError("batch consumer has no handler")
+        self._stopped.clear()
+        with app.app_context(), self.connection(app) as connection:
+            self._multiple_ack = connection.transport.driver_type == "amqp"
+            with connection.Consumer(
+                self.queues, callbacks=[self._receive]
+            ) as consumer:
+                consumer.qos(prefetch_count=self.prefetch_count)
+                while not self._stopped.is_set():
+                    self._drain(connection)
+                    if self._batch_ready():
+                        self.flush()
+                self.flush()
+
+    def _receive(self, body: Any, message: kombu.Message) -> NoReturn:
+        if not self._pending:
+            self._first_received = time.monotonic()
+        self._pending.append((body, message))
+
+    def _drain(self, connection: kombu.Connection) -> NoReturn:
+        if self._pending:
+            timeout = self._first_received + self.batch_timeout - time.monotonic()
+            if timeout <= 0:
+                return
+        else:
+            timeout = self.batch_timeout
+        try:
+            # each drain_events call delivers at most one message per consumer,
+            # so keep pulling until the batch is full or the broker goes quiet
+            connection.drain_events(timeout=timeout)
+            while len(self._pending) < self.batch_size:
+                connection.drain_events(timeout=0)
+        except socket.timeout:
+            pass
+
+    def _batch_ready(self) -> bool:
+        if not self._pending:
+            return False
+        if len(self._pending) >= self.batch_size:
+            return True
+        return time.monotonic() - self._first_received >= self.batch_timeout
+
+    def _validate(self, batch: List[Tuple[Any, kombu.Message]]) -> List[Tuple]:
+        if self.schema is None:
+            return batch
+        valid = []
+        for body, message in batch:
+            try:
+                valid.append((self.schema.load(body), message))
+            except (props.PropertyValidationError, props.BatchValidationError) as ex:
+                logger.warning("rejecting invalid message: %s", ex)
+                message.reject()
+        return valid
+
+    def _ack(self, messages: List[kombu.Message]) -> NoReturn:
+        if self._multiple_ack:
+            messages[-1].ack(multiple=True)
+            return
+        for message in messages:
+            message.ack()
+
+    def _process(self, bodies: List[Any]) -> bool:
+        try:
+            self.handler(bodies)
+            if self.database is not None:
+                self.database.session.commit()
+        except Exception:
+            logger.exception("failed to process batch of %d messages", len(bodies))
+            if self.database is not None:
+                self.database.session.rollback()
+            return False
+        return True
+
+    def flush(self) -> NoReturn:
+        batch, self._pending = self._pending, []
+        batch = self._validate(batch)
+        if not batch:
+            return
+        messages = [message for _, message in batch]
+        if self._process([body for body, _ in batch]):
+            self._ack(messages)
+            self.batches += 1
+            self.messages += len(messages)
+            return
+        # one bad message shouldn't hold back the rest, so they're retried one by one
+        for body, message in batch:
+            self._retry(body, message)
+
+    def _retry(self, body: Any, message: kombu.Message) -> NoReturn:
+        if self._process([body]):
+            message.ack()
+            self.messages += 1
+            return
+        if message.delivery_info.get("redelivered", False):
+            # it has failed before, the broker dead letters it if the queue has one
+            logger.warning("rejecting message that failed after redelivery")
+            message.reject()
+            self.rejected += 1
+        else:
+            message.requeue()
@@ -1,4 +1,4 @@
-import functools
+import logging
 
 from jason import mixins
 
@@ -7,6 +7,8 @@ try:
 except ImportError:
     raise ImportError()  # TODO
 
+logger = logging.getLogger(__name__)
+
 
 class SQLAlchemy(flask_sqlalchemy.SQLAlchemy):
     def init_app(self, app, migrate=None):
@@ -43,9 +45,15 @@ class SQLAlchemy(flask_sqlalchemy.SQLAlchemy):
         if config.DB_PORT:
             db_host += f":{config.DB_PORT}"
         string = f"{config.DB_DRIVER}://{credentials}" f"{db_host}" f"{db_name}"
-        print(string)
+        logger.debug("database uri: %s://%s%s", config.DB_DRIVER, db_host, db_name)
         return string
 
+    @staticmethod
+    def stream(query, batch_size=1000):
+        # rows are fetched from a server side cursor a batch at a time,
+        # instead of loading the whole result before the first one is used
+        return query.execution_options(stream_results=True).yield_per(batch_size)
+
     @staticmethod
     def serializable(*names):
         def wrap(func):
@@ -1,5 +1,9 @@
 from .app import App
+from .cached import Cached
+from .compression import CompressionMiddleware
+from .conditional import Conditional
 from .config import ServiceConfig, make_config
+from .encryption import EncryptionMiddleware
 from .mixins import (
     CeleryConfigMixin,
     PostgresConfigMixin,
@@ -8,4 +12,5 @@ from .mixins import (
 )
 from .schema import RequestSchema
 from .service import Service
+from .streaming import stream_json
 from .threads import ServiceThreads
@@ -2,6 +2,9 @@ from typing import Any
 
 import flask
 
+from .compression import CompressionMiddleware
+from .conditional import conditional_response
+
 
 class App(flask.Flask):
     def __init__(self, name: str, config: Any, testing: bool = False, **kwargs: Any):
@@ -9,6 +12,18 @@ class App(flask.Flask):
         config.update(self.config)
         self.config = config
         self.testing = testing
+        self.service = None
+        if getattr(config, "ETAGS", False):
+            self.after_request(conditional_response)
+        if getattr(config, "COMPRESS", False):
+            self.wsgi_app = CompressionMiddleware.from_config(self.wsgi_app, config)
+
+    def defer(self, func, *args, **kwargs):
+        if "service_threads" not in self.extensions:
+            raise RuntimeError(
+                "could not defer call. ServiceThreads have not been initialised"
+            )
+        self.extensions["service_threads"].defer(func, *args, **kwargs)
 
     def assert_mixin(self, mixin, item, condition=""):
         if not isinstance(self.config, mixin):
@@ -0,0 +1,242 @@
+import concurrent.futures
+import functools
+import hashlib
+import json
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    NoReturn,
+    Optional,
+    Sequence,
+    Set,
+)
+from urllib.parse import parse_qsl
+
+import flask
+
+from jason.cache import LRUCache
+from jason.token.base import current_token
+
+
+class Entry(NamedTuple):
+    status: int
+    headers: List[List[str]]
+    body: bytes
+    fresh_until: float
+
+    def dumps(self) -> str:
+        return json.dumps(
+            [self.status, self.headers, self.body.decode("latin-1"), self.fresh_until]
+        )
+
+    @classmethod
+    def loads(cls, data: Any) -> "Entry":
+        status, headers, body, fresh_until = json.loads(data)
+        return cls(status, headers, body.encode("latin-1"), fresh_until)
+
+    def response(self) -> flask.Response:
+        return flask.Response(self.body, status=self.status, headers=self.headers)
+
+
+class Cached:
+    def __init__(
+        self,
+        ttl: float,
+        key: Callable = None,
+        claims: Sequence[str] = (),
+        stale: float = 0.0,
+        maxsize: int = 1024,
+        local_ttl: float = None,
+        redis: Any = None,
+        prefix: str = None,
+        lock_timeout: float = 10.0,
+        background: bool = True,
+    ):
+        self.ttl = ttl
+        self.key = key
+        self.claims = tuple(claims)
+        self.stale = stale
+        # with a shared tier, local copies are kept short so invalidations spread quickly
+        if local_ttl is None:
+            local_ttl = ttl + stale if redis is None else min(ttl, 1.0)
+        self.local = LRUCache(maxsize=maxsize, ttl=local_ttl)
+        self.redis = redis
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+        self.background = background
+        self.computes = 0
+        self.refreshes = 0
+        self.stale_hits = 0
+        self.shared_hits = 0
+        # striped, so the number of locks stays fixed however many keys there are
+        self._locks = [threading.Lock() for _ in range(256)]
+        self._refreshing: Set[str] = set()
+        self._refreshing_lock = threading.Lock()
+        self._executor = None
+
+    def __call__(self, func: Callable) -> Callable:
+        if self.prefix is None:
+            self.prefix = f"jason:cached:{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            if flask.request.method not in ("GET", "HEAD"):
+                return func(*args, **kwargs)
+            token = current_token() if self.claims else None
+            url = flask.request.full_path if self.key is None else None
+            key = self.make_key(args, kwargs, token, url, flask.request.get_data())
+            return self._get(key, lambda: func(*args, **kwargs))
+
+        call.cache = self
+        return call
+
+    def make_key(
+        self,
+        args: Sequence[Any],
+        kwargs: Dict[str, Any],
+        token: Dict[str, Any] = None,
+        url: str = None,
+        body: bytes = b"",
+    ) -> str:
+        if self.key is not None:
+            parts = self.key(*args, **kwargs)
+        else:
+            # the whole request, as views may read flask.request past their arguments
+            if url is None:
+                raise ValueError("the url of the request is needed for its key")
+            path, _, query = url.partition("?")
+            parts = [
+                path,
+                sorted(parse_qsl(query, keep_blank_values=True)),
+                hashlib.blake2b(body, digest_size=16).hexdigest() if body else None,
+            ]
+        claims = [(token or {}).get(claim) for claim in self.claims]
+        data = json.dumps([parts, claims], sort_keys=True, default=str).encode()
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    def _lock(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    def _lookup(self, key: str) -> Optional[Entry]:
+        entry = self.local.get(key)
+        if entry is None and self.redis is not None:
+            data = self.redis.get(key)
+            if data is not None:
+                entry = Entry.loads(data)
+                self.shared_hits += 1
+                self.local.set(key, entry)
+        return entry
+
+    def _get(self, key: str, compute: Callable) -> flask.Response:
+        entry = self._lookup(key)
+        if entry is not None:
+            if entry.fresh_until > time.time():
+                return entry.response()
+            # stale, one caller refreshes while everyone else is served the old copy
+            if self._start_refresh(key):
+                if not self.background:
+                    return self._refresh(key, compute)
+                self._refresh_later(key, compute)
+            self.stale_hits += 1
+            return entry.response()
+        # nothing to serve, callers for the same key wait for a single computation
+        with self._lock(key):
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry.response()
+            return self._compute(key, compute)
+
+    def _start_refresh(self, key: str) -> bool:
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+        if not self._claim_refresh(key):
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+            return False
+        return True
+
+    def _refresh_later(self, key: str, compute: Callable) -> NoReturn:
+        with self._refreshing_lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="cached-refresh"
+                )
+        # the refresh runs against a copy of the request it was started from
+        refresh = flask.copy_current_request_context(self._refresh)
+        self._executor.submit(refresh, key, compute)
+
+    def _refresh(self, key: str, compute: Callable) -> flask.Response:
+        try:
+            self.refreshes += 1
+            return self._compute(key, compute, refreshing=True)
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+
+    def _claim_refresh(self, key: str) -> bool:
+        if self.redis is None:
+            return True
+        return bool(
+            self.redis.set(f"{key}:lock", 1, nx=True, px=int(self.lock_timeout * 1000))
+        )
+
+    def _compute(
+        self, key: str, compute: Callable, refreshing: bool = False
+    ) -> flask.Response:
+        self.computes += 1
+        try:
+            response = flask.make_response(compute())
+        finally:
+            if refreshing and self.redis is not None:
+                self.redis.delete(f"{key}:lock")
+        # errors and streams are passed through, never cached
+        if response.status_code != 200 or response.is_streamed:
+            return response
+        entry = Entry(
+            response.status_code,
+            [list(header) for header in response.headers.items()],
+            response.get_data(),
+            time.time() + self.ttl,
+        )
+        self.local.set(key, entry)
+        if self.redis is not None:
+            self.redis.set(key, entry.dumps(), px=int((self.ttl + self.stale) * 1000))
+        return response
+
+    def invalidate(
+        self, *args: Any, token: Dict[str, Any] = None, url: str = None, **kwargs: Any
+    ) -> NoReturn:
+        key = self.make_key(args, kwargs, token, url)
+        self.local.pop(key)
+        if self.redis is not None:
+            self.redis.delete(key)
+
+    def clear(self) -> NoReturn:
+        self.local.clear()
+        if self.redis is not None:
+            keys = list(self.redis.scan_iter(match=f"{self.prefix}:*"))
+            if keys:
+                self.redis.delete(*keys)
+
+    def stop(self, wait: bool = True) -> NoReturn:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        stats.update(
+            computes=self.computes,
+            refreshes=self.refreshes,
+            stale_hits=self.stale_hits,
+            shared_hits=self.shared_hits,
+        )
+        return stats
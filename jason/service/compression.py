@@ -0,0 +1,405 @@
+import itertools
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+
+from .streams import FilteredInput, request_input
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
+Headers = List[Tuple[str, str]]
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _ZlibDecoder:
+    def __init__(self):
+        # 32 + 15 accepts both gzip and zlib wrapped deflate
+        self._decompressor = zlib.decompressobj(47)
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        try:
+            return self._decompressor.decompress(data, max_length)
+        except zlib.error as ex:
+            raise ValueError(str(ex))
+
+    def finish(self) -> bytes:
+        if not self._decompressor.eof:
+            raise ValueError("compressed body is truncated")
+        return b""
+
+
+class _BrotliDecoder:
+    def __init__(self):
+        self._decompressor = brotli.Decompressor()
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        try:
+            return self._decompressor.process(data, output_buffer_limit=max_length)
+        except brotli.error as ex:
+            raise ValueError(str(ex))
+
+    def finish(self) -> bytes:
+        if not self._decompressor.is_finished():
+            raise ValueError("compressed body is truncated")
+        return b""
+
+
+class _ZstdDecoder:
+    # no block inflates past 128 KiB and each takes at least 4 bytes of input
+    MAX_BLOCK_SIZE = 128 * 1024
+    MIN_BLOCK_INPUT = 4
+
+    def __init__(self):
+        self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes, max_length: int) -> bytes:
+        # zstd can't cap its output, so the input is fed a few blocks at a time,
+        # which never inflates more than one block past max_length
+        parts, size = [], 0
+        data = memoryview(data)
+        while data and size < max_length:
+            blocks = (max_length - size) // self.MAX_BLOCK_SIZE
+            step = max(1, blocks * self.MIN_BLOCK_INPUT)
+            try:
+                part = self._decompressor.decompress(data[:step])
+            except zstandard.ZstdError as ex:
+                raise ValueError(str(ex))
+            parts.append(part)
+            size += len(part)
+            data = data[step:]
+        return b"".join(parts)
+
+    def finish(self) -> bytes:
+        if not self._decompressor.eof:
+            raise ValueError("compressed body is truncated")
+        return b""
+
+
+# in order of preference when a client accepts more than one
+COMPRESSORS: Dict[str, Callable] = {}
+DECODERS: Dict[str, Callable] = {
+    "gzip": _ZlibDecoder,
+    "x-gzip": _ZlibDecoder,
+    "deflate": _ZlibDecoder,
+}
+LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+if brotli is not None:
+    COMPRESSORS["br"] = _Brotli
+    # request bodies only with a brotli that can cap its output (1.1 and later)
+    if hasattr(brotli.Decompressor, "can_accept_more_data"):
+        DECODERS["br"] = _BrotliDecoder
+if zstandard is not None:
+    COMPRESSORS["zstd"] = _Zstd
+    DECODERS["zstd"] = _ZstdDecoder
+COMPRESSORS["gzip"] = _Gzip
+
+
+def available_encodings() -> List[str]:
+    return list(COMPRESSORS)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate(header: str, encodings: Iterable[str]) -> Optional[str]:
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    # ties go to the server's order of preference
+    for encoding in encodings:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class DecompressingInput(FilteredInput):
+    error_message = "request body could not be decompressed"
+
+    def __init__(self, stream: Any, encoding: str, max_size: int):
+        super().__init__(stream)
+        self.decoder = DECODERS[encoding]()
+        self.max_size = max_size
+        self.size = 0
+
+    def _check(self, data: bytes) -> bytes:
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise RequestEntityTooLarge(
+                f"decompressed request body is larger than {self.max_size} bytes"
+            )
+        return data
+
+    def _update(self, data: bytes) -> bytes:
+        # never inflate more than one byte past the limit, however well it compresses
+        return self._check(self.decoder.decompress(data, self.max_size - self.size + 1))
+
+    def _finalize(self) -> bytes:
+        return self._check(self.decoder.finish())
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: Callable,
+        min_size: int = DEFAULT_MIN_SIZE,
+        types: Iterable[str] = DEFAULT_TYPES,
+        encodings: Iterable[str] = None,
+        level: int = None,
+        max_request_size: int = DEFAULT_MAX_REQUEST_SIZE,
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.types = tuple(t.strip().lower() for t in types if t.strip())
+        if encodings is None:
+            encodings = available_encodings()
+        # encodings that aren't installed are quietly left out
+        self.encodings = [e for e in encodings if e in COMPRESSORS]
+        self.levels = dict(LEVELS)
+        if level is not None:
+            self.levels["gzip"] = level
+        self.max_request_size = max_request_size
+
+    @classmethod
+    def from_config(cls, app: Callable, config: Any) -> "CompressionMiddleware":
+        return cls(
+            app,
+            min_size=config.COMPRESS_MIN_SIZE,
+            types=config.COMPRESS_TYPES.split(","),
+            encodings=[e.strip() for e in config.COMPRESS_ENCODINGS.split(",")],
+            level=config.COMPRESS_LEVEL,
+            max_request_size=config.COMPRESS_MAX_REQUEST_SIZE,
+        )
+
+    def compressible(self, content_type: str) -> bool:
+        mime = content_type.split(";")[0].strip().lower()
+        if mime.endswith(("+json", "+xml")):
+            return True
+        return any(
+            mime.startswith(t) if t.endswith("/") else mime == t for t in self.types
+        )
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable) -> Iterable:
+        content_encoding = environ.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if content_encoding and content_encoding != "identity":
+            if content_encoding not in DECODERS:
+                error = UnsupportedMediaType(
+                    f"unsupported Content-Encoding: {content_encoding}"
+                )
+                return error(environ, start_response)
+            environ["wsgi.input"] = DecompressingInput(
+                request_input(environ), content_encoding, self.max_request_size
+            )
+            # the decompressed length isn't known up front, the body is read to the end
+            environ["wsgi.input_terminated"] = True
+            environ.pop("CONTENT_LENGTH", None)
+            del environ["HTTP_CONTENT_ENCODING"]
+        encoding = None
+        if environ.get("REQUEST_METHOD") != "HEAD":
+            encoding = negotiate(
+                environ.get("HTTP_ACCEPT_ENCODING", ""), self.encodings
+            )
+        if encoding is None:
+            return self.app(environ, start_response)
+        return self._respond(environ, start_response, encoding)
+
+    def _eligible(self, status: str, headers: Headers) -> Optional[int]:
+        # returns the body length if known, -1 if not, None if it can't be compressed
+        if status[:3] in ("204", "206", "304") or status[:1] == "1":
+            return None
+        length = -1
+        content_type = None
+        for name, value in headers:
+            name = name.lower()
+            if name == "content-encoding":
+                return None
+            if name == "content-type":
+                content_type = value
+            elif name == "content-length":
+                length = int(value)
+            elif name == "cache-control" and "no-transform" in value.lower():
+                return None
+            # byte ranges are of the uncompressed body, compressing would corrupt them
+            elif name == "content-range":
+                return None
+            elif name == "accept-ranges" and value.strip().lower() == "bytes":
+                return None
+        if content_type is None or not self.compressible(content_type):
+            return None
+        if 0 <= length < self.min_size:
+            return None
+        return length
+
+    def _respond(
+        self, environ: Dict[str, Any], start_response: Callable, encoding: str
+    ) -> Iterable:
+        state = {}
+
+        def capture(status: str, headers: Headers, exc_info: Any = None) -> Callable:
+            state["status"], state["headers"] = status, headers
+            state["exc_info"] = exc_info
+            return state.setdefault("written", []).append
+
+        app_iter = self.app(environ, capture)
+        if "status" not in state:
+            # the app will call start_response lazily, decided on the first chunk
+            return self._compress(app_iter, state, start_response, encoding)
+        length = self._eligible(state["status"], state["headers"])
+        if length is None:
+            write = start_response(state["status"], state["headers"], state["exc_info"])
+            for data in state.get("written", []):
+                write(data)
+            return app_iter
+        return self._compress(app_iter, state, start_response, encoding, length)
+
+    def _compress(
+        self,
+        app_iter: Iterable[bytes],
+        state: Dict[str, Any],
+        start_response: Callable,
+        encoding: str,
+        length: int = None,
+    ) -> Iterator[bytes]:
+        try:
+            chunks = iter(app_iter)
+            pending = list(state.get("written", []))
+            if length is None:
+                for data in chunks:
+                    pending.append(data)
+                    break
+                length = self._eligible(state["status"], state["headers"])
+            if length == -1:
+                # a streamed body, only compressed once it is known to be big enough
+                size = sum(len(data) for data in pending)
+                while size < self.min_size:
+                    data = next(chunks, None)
+                    if data is None:
+                        length = None
+                        break
+                    pending.append(data)
+                    size += len(data)
+            if length is None:
+                start_response(state["status"], state["headers"], state["exc_info"])
+                yield from pending
+                yield from chunks
+                return
+            start_response(
+                state["status"],
+                self._headers(state["headers"], encoding),
+                state["exc_info"],
+            )
+            compressor = COMPRESSORS[encoding](self.levels[encoding])
+            # streamed bodies are flushed per chunk so clients see data as it comes
+            streaming = length == -1
+            for data in itertools.chain([b"".join(pending)], chunks):
+                out = compressor.compress(data)
+                if streaming:
+                    out += compressor.flush()
+                if out:
+                    yield out
+            yield compressor.finish()
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
+
+    @staticmethod
+    def _headers(headers: Headers, encoding: str) -> Headers:
+        result = []
+        vary = []
+        for name, value in headers:
+            lower = name.lower()
+            if lower == "content-length":
+                continue
+            if lower == "vary":
+                vary.append(value)
+                continue
+            if lower == "etag" and not value.startswith("W/"):
+                # the compressed bytes differ, so the tag can only be weak
+                value = f"W/{value}"
+            result.append((name, value))
+        if not any(
+            part.strip().lower() in ("accept-encoding", "*")
+            for value in vary
+            for part in value.split(",")
+        ):
+            vary.append("Accept-Encoding")
+        result.append(("Vary", ", ".join(vary)))
+        result.append(("Content-Encoding", encoding))
+        return result
@@ -0,0 +1,90 @@
+import functools
+import hashlib
+from typing import Any, Callable, Optional
+
+import flask
+from werkzeug.http import remove_entity_headers
+
+
+def make_etag(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def cache_control_header(**directives: Any) -> Optional[str]:
+    parts = []
+    for name, value in directives.items():
+        if value is None or value is False:
+            continue
+        name = name.replace("_", "-")
+        if value is True:
+            parts.append(name)
+        elif isinstance(value, int):
+            parts.append(f"{name}={value}")
+        else:
+            raise TypeError(f"cache control directive {name} must be a bool or int")
+    return ", ".join(parts) or None
+
+
+def not_modified(response: flask.Response) -> flask.Response:
+    # changed in place, so headers other hooks have set (a refreshed token, CORS) are kept
+    if hasattr(response.response, "close"):
+        response.response.close()
+    response.status_code = 304
+    response.set_data(b"")
+    remove_entity_headers(response.headers)
+    return response
+
+
+def conditional_response(
+    response: flask.Response, weak: bool = False
+) -> flask.Response:
+    # hashes the body for an ETag, unless the view already set one
+    if flask.request.method not in ("GET", "HEAD") or response.status_code != 200:
+        return response
+    etag, _ = response.get_etag()
+    if etag is None:
+        if response.is_streamed:
+            return response
+        etag = make_etag(response.get_data())
+        response.set_etag(etag, weak=weak)
+    if flask.request.if_none_match.contains_weak(etag):
+        return not_modified(response)
+    return response
+
+
+class Conditional:
+    def __init__(
+        self, version: Callable = None, weak: bool = False, **cache_control: Any
+    ):
+        self.version = version
+        self.weak = weak
+        self.cache_control = cache_control_header(**cache_control)
+
+    def _headers(self, response: flask.Response, etag: str = None) -> flask.Response:
+        if etag is not None:
+            response.set_etag(etag, weak=self.weak)
+        if self.cache_control is not None:
+            response.headers["Cache-Control"] = self.cache_control
+        return response
+
+    def __call__(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            if flask.request.method not in ("GET", "HEAD"):
+                return func(*args, **kwargs)
+            etag = None
+            if self.version is not None:
+                # a cheap version answers a matching If-None-Match without running the view
+                version = self.version(*args, **kwargs)
+                if not isinstance(version, bytes):
+                    version = str(version).encode()
+                etag = make_etag(version)
+                if flask.request.if_none_match.contains_weak(etag):
+                    return self._headers(flask.Response(status=304), etag)
+            response = flask.make_response(func(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            self._headers(response, etag)
+            return conditional_response(response, weak=self.weak)
+
+        return call
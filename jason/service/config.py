@@ -1,13 +1,23 @@
 from typing import Type
 
 from .. import props
-from . import mixins
+from . import compression, logs, mixins
 
 
 class ServiceConfig(props.ConfigObject):
     SERVE = props.Bool(default=True)
     SERVE_HOST = props.String(default="localhost")
     SERVE_PORT = props.Int(default=5000)
+    LOG_LEVEL = props.String(default="INFO")
+    LOG_LEVELS = props.String(nullable=True)
+    LOG_FORMAT = props.Choice(default="json", choices=logs.LOG_FORMATS)
+    ETAGS = props.Bool(default=False)
+    COMPRESS = props.Bool(default=False)
+    COMPRESS_MIN_SIZE = props.Int(default=compression.DEFAULT_MIN_SIZE)
+    COMPRESS_TYPES = props.String(default=",".join(compression.DEFAULT_TYPES))
+    COMPRESS_ENCODINGS = props.String(default="br,zstd,gzip")
+    COMPRESS_LEVEL = props.Int(default=6)
+    COMPRESS_MAX_REQUEST_SIZE = props.Int(default=compression.DEFAULT_MAX_REQUEST_SIZE)
 
 
 _CONFIG_MIXIN_MAP = {
@@ -0,0 +1,131 @@
+import atexit
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, NoReturn
+
+import flask
+
+logger = logging.getLogger(__name__)
+
+
+class DeferredQueueFull(queue.Full):
+    ...
+
+
+class DeferredQueue:
+    G_KEY = "_DEFERRED"
+    _STOP = object()
+
+    def __init__(self, workers: int = 4, maxsize: int = 1000, timeout: float = 1.0):
+        self.workers = workers
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.app = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        # space is reserved through the slots, so calls deferred in a request
+        # are sure to fit once the response has been sent
+        self._slots = threading.BoundedSemaphore(maxsize)
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self, app: Any = None) -> NoReturn:
+        with self._lock:
+            if app is not None:
+                self.app = app
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"jason-deferred-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+        atexit.register(self.stop)
+
+    def defer(self, func: Callable, *args: Any, **kwargs: Any) -> NoReturn:
+        if not flask.has_request_context():
+            return self.submit(func, *args, **kwargs)
+        # a full queue is reported to the view, not found out after the response
+        self._reserve()
+        pending = flask.g.setdefault(self.G_KEY, [])
+        if not pending:
+            flask.after_this_request(self._after_request)
+        pending.append((func, args, kwargs))
+
+    def _after_request(self, response: flask.Response) -> flask.Response:
+        pending = flask.g.pop(self.G_KEY, [])
+        response.call_on_close(lambda: self._submit_pending(pending))
+        return response
+
+    def _submit_pending(self, pending) -> NoReturn:
+        for func, args, kwargs in pending:
+            self._put(func, args, kwargs)
+
+    def _reserve(self) -> NoReturn:
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.rejected += 1
+            raise DeferredQueueFull(
+                f"deferred queue is full ({self.maxsize} items waiting)"
+            )
+
+    def submit(self, func: Callable, *args: Any, **kwargs: Any) -> NoReturn:
+        self._reserve()
+        self._put(func, args, kwargs)
+
+    def _put(self, func: Callable, args: Any, kwargs: Any) -> NoReturn:
+        if not self._threads:
+            self.start()
+        self._queue.put((func, args, kwargs))
+        with self._lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def _work(self) -> NoReturn:
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            self._slots.release()
+            func, args, kwargs = item
+            try:
+                if self.app is not None:
+                    with self.app.app_context():
+                        func(*args, **kwargs)
+                else:
+                    func(*args, **kwargs)
+            except Exception:
+                logger.exception("deferred call to %r failed", func)
+                with self._lock:
+                    self.failed += 1
+            else:
+                with self._lock:
+                    self.completed += 1
+
+    def stop(self, timeout: float = None) -> NoReturn:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        # workers finish whatever is already queued before they see the sentinel
+        for _ in threads:
+            self._queue.put(self._STOP)
+        for thread in threads:
+            thread.join(timeout)
+        atexit.unregister(self.stop)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "maxsize": self.maxsize,
+            "workers": len(self._threads),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
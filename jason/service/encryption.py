@@ -0,0 +1,135 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+from jason.crypto.stream import (
+    DEFAULT_CHUNK_SIZE,
+    MAX_CHUNK_SIZE,
+    StreamDecryptor,
+    StreamEncryptor,
+)
+
+from .streams import FilteredInput, request_input
+
+ENCODING = "x-chacha20-poly1305-stream"
+
+
+class DecryptingInput(FilteredInput):
+    error_message = "request body could not be decrypted"
+
+    def __init__(self, stream: Any, key: Union[str, bytes], max_chunk_size: int):
+        super().__init__(stream)
+        self.decryptor = StreamDecryptor(key, max_chunk_size=max_chunk_size)
+
+    def _update(self, data: bytes) -> bytes:
+        return self.decryptor.update(data)
+
+    def _finalize(self) -> bytes:
+        return self.decryptor.finalize()
+
+
+class EncryptionMiddleware:
+    def __init__(
+        self,
+        app: Callable,
+        key: Union[str, bytes],
+        paths: Iterable[str] = None,
+        required: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_chunk_size: int = MAX_CHUNK_SIZE,
+    ):
+        self.app = app
+        self.key = key
+        self.paths = tuple(paths) if paths is not None else None
+        self.required = required
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max_chunk_size
+
+    def _covers(self, environ: Dict[str, Any]) -> bool:
+        if self.paths is None:
+            return True
+        path = environ.get("PATH_INFO", "")
+        return any(path.startswith(prefix) for prefix in self.paths)
+
+    @staticmethod
+    def _accepts(environ: Dict[str, Any]) -> bool:
+        accepted = environ.get("HTTP_ACCEPT_ENCODING", "")
+        return any(
+            part.split(";")[0].strip() == ENCODING for part in accepted.split(",")
+        )
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable) -> Iterable:
+        if not self._covers(environ):
+            return self.app(environ, start_response)
+        # codings are listed in the order they were applied, so ours has to be last
+        codings = [
+            coding.strip()
+            for coding in environ.get("HTTP_CONTENT_ENCODING", "").split(",")
+            if coding.strip()
+        ]
+        if codings and codings[-1] == ENCODING:
+            environ["wsgi.input"] = DecryptingInput(
+                request_input(environ), self.key, self.max_chunk_size
+            )
+            # the decrypted length isn't known up front, the body is read to the end
+            environ["wsgi.input_terminated"] = True
+            environ.pop("CONTENT_LENGTH", None)
+            # the rest, e.g. gzip, is left for CompressionMiddleware to undo
+            if len(codings) > 1:
+                environ["HTTP_CONTENT_ENCODING"] = ", ".join(codings[:-1])
+            else:
+                del environ["HTTP_CONTENT_ENCODING"]
+        elif self.required and environ.get("CONTENT_LENGTH") not in (None, "", "0"):
+            return self._reject(start_response)
+        if not (self.required or self._accepts(environ)):
+            return self.app(environ, start_response)
+        return self._encrypt_response(environ, start_response)
+
+    @staticmethod
+    def _reject(start_response: Callable) -> List[bytes]:
+        body = f"request body must be sent with Content-Encoding: {ENCODING}".encode()
+        start_response(
+            "415 Unsupported Media Type",
+            [("Content-Type", "text/plain"), ("Content-Length", str(len(body)))],
+        )
+        return [body]
+
+    def _encrypt_response(
+        self, environ: Dict[str, Any], start_response: Callable
+    ) -> Iterator[bytes]:
+        # responses that can't have a body are passed through untouched
+        state = {"encrypt": environ.get("REQUEST_METHOD") != "HEAD"}
+
+        def encrypting_start_response(
+            status: str, headers: List[Tuple[str, str]], exc_info: Any = None
+        ) -> Callable:
+            if status[:3] in ("204", "304"):
+                state["encrypt"] = False
+            if not state["encrypt"]:
+                return start_response(status, headers, exc_info)
+            encodings = [
+                value for name, value in headers if name.lower() == "content-encoding"
+            ]
+            headers = [
+                (name, value)
+                for name, value in headers
+                if name.lower() not in ("content-length", "content-encoding")
+            ]
+            headers.append(("Content-Encoding", ", ".join(encodings + [ENCODING])))
+            headers.append(("Vary", "Accept-Encoding"))
+            return start_response(status, headers, exc_info)
+
+        app_iter = self.app(environ, encrypting_start_response)
+        if not state["encrypt"]:
+            return app_iter
+        return self._encrypt(app_iter)
+
+    def _encrypt(self, app_iter: Iterable[bytes]) -> Iterator[bytes]:
+        encryptor = StreamEncryptor(self.key, chunk_size=self.chunk_size)
+        try:
+            for data in app_iter:
+                out = encryptor.update(data)
+                if out:
+                    yield out
+            yield encryptor.finalize()
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
@@ -0,0 +1,123 @@
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Any, Dict, NoReturn
+
+LOG_FORMATS = ("json", "text")
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# attributes every LogRecord has, anything else was passed in with `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+_handler = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.datetime.utcfromtimestamp(record.created).isoformat()
+            + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # only do what has to happen on the calling thread: resolve the message
+        # and the traceback while they still exist, leave formatting to the writer
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(levels: str) -> Dict[str, str]:
+    parsed = {}
+    if not levels:
+        return parsed
+    for item in levels.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if "=" not in item:
+            raise ValueError(f"invalid log level '{item}', expected 'logger=LEVEL'")
+        name, level = (part.strip() for part in item.split("="))
+        parsed[name] = level.upper()
+    return parsed
+
+
+def _start(*writers: logging.Handler) -> NoReturn:
+    global _listener, _handler
+    log_queue = queue.SimpleQueue()
+    _handler = QueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, *writers)
+    _listener.start()
+    logging.getLogger().addHandler(_handler)
+
+
+def _restart_after_fork() -> NoReturn:
+    # a forked child inherits the queue handler but not the listener's thread,
+    # so it gets a queue and listener of its own (anything already queued is the parent's)
+    if _listener is None:
+        return
+    writers = _listener.handlers
+    logging.getLogger().removeHandler(_handler)
+    _start(*writers)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def init_logging(config: Any, stream: Any = None) -> NoReturn:
+    stop_logging()
+
+    log_format = getattr(config, "LOG_FORMAT", "json")
+    if log_format not in LOG_FORMATS:
+        raise ValueError(
+            f"invalid log format '{log_format}'. "
+            f"valid formats are: {', '.join(LOG_FORMATS)}"
+        )
+    writer = logging.StreamHandler(stream or sys.stdout)
+    if log_format == "json":
+        writer.setFormatter(JsonFormatter())
+    else:
+        writer.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    _start(writer)
+    root = logging.getLogger()
+    root.setLevel(getattr(config, "LOG_LEVEL", "INFO").upper())
+    for name, level in parse_levels(getattr(config, "LOG_LEVELS", None)).items():
+        logging.getLogger(name).setLevel(level)
+    atexit.unregister(stop_logging)
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> NoReturn:
+    global _listener, _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        # flushes anything still waiting in the queue
+        _listener.stop()
+        _listener = None
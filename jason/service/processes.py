@@ -0,0 +1,127 @@
+import logging
+import multiprocessing
+import threading
+import time
+from typing import Any, Callable, Dict, NoReturn
+
+from . import logs
+
+logger = logging.getLogger(__name__)
+
+
+def _context():
+    # children rebuild their app from the parent's service, which only
+    # survives the trip to the child process when it is forked
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _run_child(func: Callable, app: Any, inbox: Any, outbox: Any) -> NoReturn:
+    try:
+        service = getattr(app, "service", None)
+        if service is not None:
+            app = service._make_app()
+        func(app=app, inbox=inbox, outbox=outbox)
+    finally:
+        # children exit without running atexit, so queued records are flushed here
+        logs.stop_logging()
+
+
+class ServiceProcess:
+    def __init__(
+        self,
+        func: Callable,
+        name: str = None,
+        restart: bool = True,
+        max_restarts: int = None,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        queue_size: int = 0,
+    ):
+        self.func = func
+        self.name = name or func.__name__
+        self.restart = restart
+        self.max_restarts = max_restarts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.queue_size = queue_size
+        self.restarts = 0
+        self.process = None
+        self.inbox = None
+        self.outbox = None
+        self._app = None
+        self._context = _context()
+        self._stopped = threading.Event()
+        self._supervisor = None
+
+    def start(self, app: Any) -> NoReturn:
+        if self._supervisor is not None:
+            return
+        self._app = app
+        self._stopped.clear()
+        self.inbox = self._context.Queue(self.queue_size)
+        self.outbox = self._context.Queue(self.queue_size)
+        self._spawn()
+        self._supervisor = threading.Thread(
+            target=self._supervise, name=f"jason-process-{self.name}", daemon=True
+        )
+        self._supervisor.start()
+
+    def _spawn(self) -> NoReturn:
+        self.process = self._context.Process(
+            target=_run_child,
+            args=(self.func, self._app, self.inbox, self.outbox),
+            name=self.name,
+            daemon=True,
+        )
+        self.process.start()
+
+    def _supervise(self) -> NoReturn:
+        failures = 0
+        while True:
+            started = time.monotonic()
+            self.process.join()
+            if self._stopped.is_set() or self.process.exitcode == 0:
+                return
+            logger.warning(
+                "service process '%s' exited with code %s",
+                self.name,
+                self.process.exitcode,
+            )
+            if not self.restart or (
+                self.max_restarts is not None and self.restarts >= self.max_restarts
+            ):
+                return
+            # back off exponentially while the process keeps dying straight away
+            if time.monotonic() - started > self.max_backoff:
+                failures = 0
+            delay = min(self.backoff * 2**failures, self.max_backoff)
+            failures += 1
+            if self._stopped.wait(delay):
+                return
+            self.restarts += 1
+            self._spawn()
+
+    def put(self, item: Any, block: bool = True, timeout: float = None) -> NoReturn:
+        self.inbox.put(item, block, timeout)
+
+    def get(self, block: bool = True, timeout: float = None) -> Any:
+        return self.outbox.get(block, timeout)
+
+    def stop(self, timeout: float = 5.0) -> NoReturn:
+        self._stopped.set()
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        if self._supervisor is not None:
+            self._supervisor.join(timeout)
+            self._supervisor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": self.process.pid if self.process else None,
+            "alive": bool(self.process and self.process.is_alive()),
+            "exitcode": self.process.exitcode if self.process else None,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,307 @@
+import atexit
+import datetime
+import heapq
+import itertools
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, NoReturn, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+MISSED_POLICIES = ("coalesce", "skip", "catch_up")
+
+
+class CronExpression:
+    _FIELDS = (
+        ("minute", 0, 59),
+        ("hour", 0, 23),
+        ("day", 1, 31),
+        ("month", 1, 12),
+        ("weekday", 0, 6),
+    )
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != len(self._FIELDS):
+            raise ValueError(
+                f"invalid cron expression '{expression}', expected 5 fields"
+            )
+        self.expression = expression
+        self.minute, self.hour, self.day, self.month, self.weekday = (
+            self._parse(part, name, low, high)
+            for part, (name, low, high) in zip(parts, self._FIELDS)
+        )
+        # as in cron, when both days are restricted a match on either one is enough
+        self.either_day = not parts[2].startswith("*") and not parts[4].startswith("*")
+
+    @staticmethod
+    def _parse(part: str, name: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for item in part.split(","):
+            step = 1
+            if "/" in item:
+                item, step = item.split("/")
+                step = int(step)
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start, end = (int(v) for v in item.split("-"))
+            else:
+                start = end = int(item)
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"invalid cron {name} field '{part}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def next_after(self, timestamp: float) -> float:
+        moment = datetime.datetime.fromtimestamp(timestamp).replace(
+            second=0, microsecond=0
+        ) + datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=366 * 5)
+        while moment < limit:
+            if moment.month not in self.month:
+                moment = (moment.replace(day=1) + datetime.timedelta(days=32)).replace(
+                    day=1, hour=0, minute=0
+                )
+                continue
+            if not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+            if moment.hour not in self.hour:
+                moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            if moment.minute not in self.minute:
+                moment += datetime.timedelta(minutes=1)
+                continue
+            return moment.timestamp()
+        raise ValueError(f"cron expression '{self.expression}' never fires")
+
+    def _day_matches(self, moment: datetime.datetime) -> bool:
+        # cron weekdays start on sunday, python's on monday
+        day = moment.day in self.day
+        weekday = (moment.weekday() + 1) % 7 in self.weekday
+        return day or weekday if self.either_day else day and weekday
+
+
+class Job:
+    def __init__(
+        self,
+        func: Callable,
+        seconds: float = None,
+        cron: str = None,
+        jitter: float = 0.0,
+        missed: str = "coalesce",
+        overlap: bool = False,
+        name: str = None,
+    ):
+        if (seconds is None) == (cron is None):
+            raise ValueError("a job requires either an interval or a cron expression")
+        if seconds is not None and seconds <= 0:
+            raise ValueError("job interval must be greater than 0")
+        if missed not in MISSED_POLICIES:
+            raise ValueError(
+                f"invalid missed run policy '{missed}'. "
+                f"valid policies are: {', '.join(MISSED_POLICIES)}"
+            )
+        self.func = func
+        self.name = name or getattr(func, "__name__", repr(func))
+        self.seconds = seconds
+        self.cron = CronExpression(cron) if cron is not None else None
+        self.jitter = jitter
+        self.missed = missed
+        self.overlap = overlap
+        self.due = None
+        self.running = 0
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.missed_runs = 0
+        self.last_run = None
+        self.last_duration = None
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+        self.last_error = None
+
+    def next_after(self, timestamp: float) -> float:
+        if self.cron is not None:
+            return self.cron.next_after(timestamp)
+        return timestamp + self.seconds
+
+    def reschedule(self, now: float) -> int:
+        missed = 0
+        due = self.next_after(self.due)
+        if self.missed == "catch_up":
+            self.due = due
+            return missed
+        while due <= now:
+            missed += 1
+            due = self.next_after(due)
+        self.due = due
+        return missed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "missed": self.missed_runs,
+            "running": self.running,
+            "next_run": self.due,
+            "last_run": self.last_run,
+            "last_duration": self.last_duration,
+            "max_duration": self.max_duration,
+            "mean_duration": self.total_duration / self.runs if self.runs else None,
+            "last_error": self.last_error,
+        }
+
+
+class _DaemonExecutor:
+    # like a ThreadPoolExecutor, but its idle workers never hold up interpreter exit
+    _STOP = object()
+
+    def __init__(self, workers: int, name: str):
+        self._queue = queue.SimpleQueue()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, func: Callable, *args: Any) -> NoReturn:
+        self._queue.put((func, args))
+
+    def _work(self) -> NoReturn:
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            func, args = item
+            func(*args)
+
+    def shutdown(self, wait: bool = True) -> NoReturn:
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+class Scheduler:
+    def __init__(self, workers: int = 4):
+        self.workers = workers
+        self.jobs: List[Job] = []
+        self._app = None
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._lock = threading.Lock()
+        self._executor: Optional[_DaemonExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def add(self, job: Job) -> Job:
+        self.jobs.append(job)
+        if self._thread is not None:
+            self._schedule(job, time.time())
+        return job
+
+    def _schedule(self, job: Job, now: float) -> NoReturn:
+        job.due = job.next_after(now)
+        self._push(job)
+
+    def _push(self, job: Job) -> NoReturn:
+        fire_at = job.due + (random.uniform(0, job.jitter) if job.jitter else 0)
+        with self._condition:
+            heapq.heappush(self._heap, (fire_at, next(self._counter), job))
+            self._condition.notify()
+
+    def start(self, app: Any = None) -> NoReturn:
+        if self._thread is not None:
+            return
+        self._app = app
+        self._stopped = False
+        self._executor = _DaemonExecutor(self.workers, "jason-scheduler")
+        now = time.time()
+        for job in self.jobs:
+            self._schedule(job, now)
+        self._thread = threading.Thread(
+            target=self._dispatch, name="jason-scheduler", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop, wait=False)
+
+    def stop(self, wait: bool = True) -> NoReturn:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        self._heap = []
+        atexit.unregister(self.stop)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {job.name: job.stats() for job in self.jobs}
+
+    def _dispatch(self) -> NoReturn:
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._heap:
+                        delay = self._heap[0][0] - time.time()
+                        if delay <= 0:
+                            break
+                        self._condition.wait(delay)
+                    else:
+                        self._condition.wait()
+                if self._stopped:
+                    return
+                _, _, job = heapq.heappop(self._heap)
+            self._fire(job, time.time())
+
+    def _fire(self, job: Job, now: float) -> NoReturn:
+        missed = job.reschedule(now)
+        job.missed_runs += missed
+        if missed and job.missed == "skip":
+            self._push(job)
+            return
+        with self._lock:
+            if job.running and not job.overlap:
+                job.skipped += 1
+                start = False
+            else:
+                job.running += 1
+                start = True
+        if start:
+            self._executor.submit(self._run, job)
+        self._push(job)
+
+    def _run(self, job: Job) -> NoReturn:
+        started = time.perf_counter()
+        job.last_run = time.time()
+        try:
+            if self._app is not None:
+                with self._app.app_context():
+                    job.func(app=self._app)
+            else:
+                job.func(app=None)
+        except Exception as ex:
+            logger.exception("scheduled job '%s' failed", job.name)
+            with self._lock:
+                job.failures += 1
+                job.last_error = repr(ex)
+        finally:
+            duration = time.perf_counter() - started
+            with self._lock:
+                job.running -= 1
+                job.runs += 1
+                job.last_duration = duration
+                job.total_duration += duration
+                job.max_duration = max(job.max_duration, duration)
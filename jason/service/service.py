@@ -3,6 +3,7 @@ from typing import Any, Type
 
 import waitress
 
+from . import logs
 from .app import App
 from .config import ServiceConfig
 
@@ -25,8 +26,14 @@ class Service:
     def _pre_command(self, debug, config_values):
         self._debug = debug
         self._config = self._config_class.load(**config_values)
-        self._app = self._app_gen(__name__, config=self._config, testing=self._debug)
-        self._set_up(self._app)
+        logs.init_logging(self._config)
+        self._app = self._make_app()
+
+    def _make_app(self):
+        app = self._app_gen(__name__, config=self._config, testing=self._debug)
+        app.service = self
+        self._set_up(app)
+        return app
 
     def _set_up(self, app):
         raise NotImplementedError
@@ -35,7 +42,7 @@ class Service:
         self._pre_command(debug, config_values)
         if "service_threads" in self._app.extensions:
             service_threads = self._app.extensions["service_threads"]
-            service_threads.run_all(threaded=False)
+            service_threads.run_all()
         if no_serve is False and self._config.SERVE is True:
             if not detach:
                 self._serve(host=self._config.SERVE_HOST, port=self._config.SERVE_PORT)
@@ -0,0 +1,65 @@
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+import flask
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_END = object()
+
+
+def _identity(item: Any) -> Any:
+    return item
+
+
+def _encoder() -> Any:
+    # the app's encoder, so dates and the like come out the same as with jsonify
+    return flask.current_app.json_encoder(separators=(",", ":"))
+
+
+def _chunks(
+    items: Iterable[Any],
+    serialize: Callable,
+    ndjson: bool,
+    chunk_size: int,
+) -> Iterator[bytes]:
+    encode = _encoder().encode
+    opening, separator, closing = (b"", b"\n", b"\n") if ndjson else (b"[", b",", b"]")
+    iterator = iter(items)
+    first = next(iterator, _END)
+    if first is _END:
+        yield b"" if ndjson else b"[]"
+        return
+    # the first item goes out on its own, so clients get a byte as soon as possible
+    yield opening + encode(serialize(first)).encode()
+    parts, size = [], 0
+    for item in iterator:
+        data = encode(serialize(item)).encode()
+        parts.append(separator)
+        parts.append(data)
+        size += len(data) + 1
+        if size >= chunk_size:
+            yield b"".join(parts)
+            parts, size = [], 0
+    parts.append(closing)
+    yield b"".join(parts)
+
+
+def stream_json(
+    items: Iterable[Any],
+    serialize: Callable = None,
+    ndjson: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    status: int = 200,
+    headers: Dict[str, str] = None,
+) -> flask.Response:
+    chunks = _chunks(
+        items,
+        serialize if serialize is not None else _identity,
+        ndjson,
+        chunk_size,
+    )
+    return flask.Response(
+        flask.stream_with_context(chunks),
+        status=status,
+        headers=headers,
+        content_type="application/x-ndjson" if ndjson else "application/json",
+    )
@@ -0,0 +1,62 @@
+from typing import Any, Dict, Iterator, NoReturn
+
+from werkzeug.exceptions import BadRequest
+from werkzeug.wsgi import get_input_stream
+
+
+def request_input(environ: Dict[str, Any]) -> Any:
+    # the raw input, limited to Content-Length unless the server ends it itself,
+    # as a socket is never going to return b"" for the end of the body
+    return get_input_stream(environ)
+
+
+class FilteredInput:
+    # a file like wsgi.input that transforms the request body as it is read
+    read_size = 64 * 1024
+    error_message = "request body could not be read"
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+        self._buffer = bytearray()
+        self._done = False
+
+    def _update(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def _finalize(self) -> bytes:
+        raise NotImplementedError
+
+    def _fill(self, size: int) -> NoReturn:
+        try:
+            while not self._done and (size < 0 or len(self._buffer) < size):
+                data = self.stream.read(self.read_size)
+                if data:
+                    self._buffer += self._update(data)
+                else:
+                    self._buffer += self._finalize()
+                    self._done = True
+        except ValueError:
+            raise BadRequest(self.error_message)
+
+    def read(self, size: int = -1) -> bytes:
+        size = -1 if size is None else size
+        self._fill(size)
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        while b"\n" not in self._buffer and not self._done:
+            self._fill(len(self._buffer) + 1)
+        end = self._buffer.find(b"\n") + 1 or len(self._buffer)
+        if size is not None and 0 <= size < end:
+            end = size
+        return self.read(end)
+
+    def __iter__(self) -> Iterator[bytes]:
+        line = self.readline()
+        while line:
+            yield line
+            line = self.readline()
@@ -1,26 +1,129 @@
 import threading
 
+from .deferred import DeferredQueue
+from .processes import ServiceProcess
+from .scheduler import Job, Scheduler
+
 
 class ServiceThreads:
-    def __init__(self):
+    def __init__(
+        self,
+        scheduler_workers=4,
+        defer_workers=4,
+        defer_queue_size=1000,
+        defer_timeout=1.0,
+    ):
         self.app = None
+        self.scheduler = Scheduler(workers=scheduler_workers)
+        self.deferred = DeferredQueue(
+            workers=defer_workers, maxsize=defer_queue_size, timeout=defer_timeout
+        )
+        self.processes = {}
         self._service_threads = []
+        self._running = False
 
     def init_app(self, app):
         self.app = app
         self.app.before_first_request(self.run_all)
         self.app.extensions["service_threads"] = self
 
-    def add(self, method):
-        self._service_threads.append({"method": method, "kwargs": {"app": self.app}})
+    def add(self, method, **kwargs):
+        self._service_threads.append({"method": method, "kwargs": kwargs})
 
     def run_all(self):
+        if self._running:
+            return
+        self._running = True
+        # fork before starting any threads of our own
+        for process in self.processes.values():
+            process.start(app=self.app)
         for process in self._service_threads:
             thread = threading.Thread(
-                target=process["method"], kwargs=process["kwargs"]
+                target=process["method"], kwargs={"app": self.app, **process["kwargs"]}
             )
             thread.start()
+        if self.scheduler.jobs:
+            self.scheduler.start(app=self.app)
+        # deferred workers are started by the first call to defer
+        self.deferred.app = self.app
+
+    def defer(self, func, *args, **kwargs):
+        self.deferred.defer(func, *args, **kwargs)
+
+    def stop(self, wait=True):
+        self.scheduler.stop(wait=wait)
+        self.deferred.stop()
+        for process in self.processes.values():
+            process.stop()
+
+    def stats(self):
+        return {
+            "jobs": self.scheduler.stats(),
+            "deferred": self.deferred.stats(),
+            "processes": {
+                name: process.stats() for name, process in self.processes.items()
+            },
+        }
 
     def thread(self, func):
         self.add(method=func)
         return func
+
+    def process(
+        self,
+        func=None,
+        name=None,
+        restart=True,
+        max_restarts=None,
+        backoff=1.0,
+        queue_size=0,
+    ):
+        def wrap(f):
+            process = ServiceProcess(
+                f,
+                name=name,
+                restart=restart,
+                max_restarts=max_restarts,
+                backoff=backoff,
+                queue_size=queue_size,
+            )
+            if process.name in self.processes:
+                raise ValueError(f"a process called '{process.name}' already exists")
+            self.processes[process.name] = process
+            return f
+
+        if func is not None:
+            return wrap(func)
+        return wrap
+
+    def every(self, seconds, jitter=0.0, missed="coalesce", overlap=False, name=None):
+        def wrap(func):
+            self.scheduler.add(
+                Job(
+                    func,
+                    seconds=seconds,
+                    jitter=jitter,
+                    missed=missed,
+                    overlap=overlap,
+                    name=name,
+                )
+            )
+            return func
+
+        return wrap
+
+    def cron(self, expression, jitter=0.0, missed="coalesce", overlap=False, name=None):
+        def wrap(func):
+            self.scheduler.add(
+                Job(
+                    func,
+                    cron=expression,
+                    jitter=jitter,
+                    missed=missed,
+                    overlap=overlap,
+                    name=name,
+                )
+            )
+            return func
+
+        return wrap
@@ -1,6 +1,19 @@
+from .base import current_token
+from .codec import ClaimCodec
 from .error import BatchValidationError, TokenValidationError
 from .handler import Handler
+from .keys import Key, KeyRing
+from .metrics import TokenMetrics
 from .protect import Protect
+from .provider import TokenProvider
+from .revocation import (
+    FileRevocationStore,
+    MemoryRevocationStore,
+    RedisRevocationStore,
+    Revocations,
+    TokenRevokedError,
+)
 from .rules import AllOf, AnyOf, HasKeys, HasScopes, HasValue, MatchValues, NoneOf
+from .sessions import MemorySessionStore, RedisSessionStore, SessionTokens
 
 protect = Protect
@@ -1,10 +1,34 @@
-from typing import Any, Dict, NoReturn
+from typing import Any, Dict, NoReturn, Optional
+
+import flask
+
+from . import error
 
 
 class TokenHandlerBase:
     G_KEY = "_ACCESS_TOKEN"
+    EXTENSION_KEY = "token-handler"
 
 
 class TokenRule:
+    def compile(self) -> "TokenRule":
+        return self
+
     def validate(self, token: Dict[str, Any]) -> NoReturn:
         raise NotImplementedError
+
+
+def current_token() -> Optional[Dict[str, Any]]:
+    if TokenHandlerBase.G_KEY in flask.g:
+        return flask.g.get(TokenHandlerBase.G_KEY)
+    handler = flask.current_app.extensions.get(TokenHandlerBase.EXTENSION_KEY)
+    if handler is None:
+        raise error.TokenValidationError("no token handler has been initialised")
+    return handler.load_token()
+
+
+def current_metrics() -> Any:
+    if not flask.has_app_context():
+        return None
+    handler = flask.current_app.extensions.get(TokenHandlerBase.EXTENSION_KEY)
+    return getattr(handler, "metrics", None)
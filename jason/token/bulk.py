@@ -0,0 +1,119 @@
+import concurrent.futures
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, NoReturn, Optional
+
+import jwt
+
+from .keys import KeyRing
+from .revocation import TokenRevokedError
+
+# exceptions that fail a single item rather than the whole batch
+ITEM_ERRORS = (jwt.InvalidTokenError, ValueError, TypeError)
+
+_worker_handler = None
+
+
+class TokenResult(NamedTuple):
+    value: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def handler_settings(handler: Any) -> Dict[str, Any]:
+    # everything needed to build an equivalent handler in another process
+    settings = {
+        "key": handler.key,
+        "lifespan": handler.lifespan,
+        "issuer": handler.issuer,
+        "audience": handler.audience,
+        "algorithm": handler.algorithm,
+        "verify": handler.verify,
+        "leeway": handler.leeway,
+        "encryption_key": handler.encryption_key,
+        "claim_codec": list(handler.claim_codecs.values()),
+        **handler.DECODER_OPTIONS,
+    }
+    if handler.cipher is not None:
+        # workers reuse the cipher chosen here instead of benchmarking again
+        settings["cipher"] = handler.cipher.name
+    if handler.scope_map is not None:
+        settings["scope_map"] = handler.scope_map.scopes
+    return settings
+
+
+def key_ring_source(handler: Any) -> Optional[Dict[str, Any]]:
+    # a ring can't be pickled, workers load their own from the same file or jwks
+    ring = handler.key_ring
+    if ring is None:
+        return None
+    if ring.path is not None:
+        return {"path": ring.path}
+    return {"jwks": ring.jwks}
+
+
+def _init_worker(
+    handler_class: type, settings: Dict[str, Any], key_ring: Dict[str, Any] = None
+) -> NoReturn:
+    global _worker_handler
+    _worker_handler = handler_class(**settings)
+    if key_ring is not None:
+        _worker_handler.configure(key_ring=KeyRing(**key_ring))
+
+
+def generate_one(handler: Any, claims: Dict[str, Any]) -> TokenResult:
+    claims = dict(claims)
+    user_id = claims.pop("uid", None)
+    scopes = claims.pop("scp", ())
+    not_before = claims.pop("nbf", None)
+    try:
+        token_string = handler.generate_token(user_id, scopes, claims, not_before)
+    except ITEM_ERRORS as ex:
+        return TokenResult(error=ex)
+    return TokenResult(value=token_string)
+
+
+def verify_one(handler: Any, token_string: str) -> TokenResult:
+    try:
+        return TokenResult(value=handler.decode_token(token_string))
+    except ITEM_ERRORS as ex:
+        return TokenResult(error=ex)
+
+
+def check_revoked(handler: Any, result: TokenResult) -> TokenResult:
+    # revocations stay in this process, so tokens verified by workers are checked here
+    if result.ok and handler.revocations.is_revoked(result.value.get("jti")):
+        return TokenResult(error=TokenRevokedError("token has been revoked"))
+    return result
+
+
+def generate_in_worker(claims: Dict[str, Any]) -> TokenResult:
+    return generate_one(_worker_handler, claims)
+
+
+def verify_in_worker(token_string: str) -> TokenResult:
+    return verify_one(_worker_handler, token_string)
+
+
+def run(
+    handler: Any,
+    items: Iterable[Any],
+    func: Callable[[Any, Any], TokenResult],
+    worker_func: Callable[[Any], TokenResult],
+    workers: int = None,
+    chunk_size: int = 256,
+) -> List[TokenResult]:
+    if not workers:
+        return [func(handler, item) for item in items]
+    if handler.sessions is not None:
+        raise ValueError("session tokens can't be generated or verified by workers")
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(type(handler), handler_settings(handler), key_ring_source(handler)),
+    ) as executor:
+        results = list(executor.map(worker_func, items, chunksize=chunk_size))
+    if func is verify_one and handler.revocations is not None:
+        results = [check_revoked(handler, result) for result in results]
+    return results
@@ -0,0 +1,66 @@
+import hashlib
+import time
+from typing import Any, Dict, NoReturn, Optional, Union
+
+from jason.cache import LRUCache
+
+
+class TokenCache:
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        negative_ttl: float = 5.0,
+        negative_maxsize: int = None,
+        leeway: float = 0,
+    ):
+        self.leeway = leeway
+        self.negative_ttl = negative_ttl
+        self.valid = LRUCache(maxsize=maxsize)
+        self.invalid = LRUCache(maxsize=negative_maxsize or maxsize, ttl=negative_ttl)
+
+    @staticmethod
+    def key(token_string: Union[str, bytes]) -> bytes:
+        if isinstance(token_string, str):
+            token_string = token_string.encode()
+        return hashlib.blake2b(token_string, digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        token_data = self.valid.get(key)
+        if token_data is not None:
+            nbf = token_data.get("nbf")
+            if nbf is None or nbf - self.leeway <= time.time():
+                return dict(token_data)
+            return None
+        if self.negative_ttl:
+            ex = self.invalid.get(key)
+            if ex is not None:
+                raise ex.with_traceback(None)
+        return None
+
+    def put(self, key: bytes, token_data: Dict[str, Any]) -> NoReturn:
+        exp = token_data.get("exp")
+        if exp is None:
+            return
+        self.valid.set(key, dict(token_data), expires=exp + self.leeway)
+
+    def put_error(self, key: bytes, ex: Exception) -> NoReturn:
+        if self.negative_ttl:
+            self.invalid.set(key, ex)
+
+    def clear(self) -> NoReturn:
+        self.valid.clear()
+        self.invalid.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        valid = self.valid.stats()
+        lookups = valid["hits"] + valid["misses"]
+        return {
+            "size": valid["size"],
+            "hits": valid["hits"],
+            "misses": valid["misses"] - self.invalid.hits,
+            "negative_size": len(self.invalid),
+            "negative_hits": self.invalid.hits,
+            "hit_rate": (valid["hits"] + self.invalid.hits) / lookups
+            if lookups
+            else 0.0,
+        }
@@ -0,0 +1,78 @@
+import base64
+import json
+import zlib
+from typing import Any, Dict
+
+import jwt
+
+# claims PyJWT validates itself have to stay where it expects them
+REGISTERED_CLAIMS = ("iat", "nbf", "exp", "iss", "aud")
+VERSION_KEY = "cv"
+COMPRESSED_KEY = "z"
+
+
+class ClaimCodec:
+    def __init__(
+        self,
+        claims: Dict[str, str] = None,
+        version: int = 1,
+        compress: bool = True,
+        level: int = 9,
+    ):
+        self.claims = dict(claims or {})
+        self.short_claims = {short: claim for claim, short in self.claims.items()}
+        if len(self.short_claims) != len(self.claims):
+            raise ValueError("claim codec contains duplicate short keys")
+        reserved = set(REGISTERED_CLAIMS) | {VERSION_KEY, COMPRESSED_KEY}
+        for claim, short in self.claims.items():
+            if claim in REGISTERED_CLAIMS or short in reserved:
+                raise ValueError(f"claim {claim} cannot be mapped to {short}")
+        self.version = version
+        self.compress = compress
+        self.level = level
+
+    def encode(self, token_data: Dict[str, Any]) -> Dict[str, Any]:
+        encoded = {VERSION_KEY: self.version}
+        custom = {}
+        for key, value in token_data.items():
+            if key in REGISTERED_CLAIMS:
+                encoded[key] = value
+            elif key in self.claims:
+                custom[self.claims[key]] = value
+            elif key in self.short_claims or key in (VERSION_KEY, COMPRESSED_KEY):
+                # it would be read back as a different claim, or not at all
+                raise ValueError(f"claim {key} collides with a reserved or short key")
+            else:
+                custom[key] = value
+        if self.compress and custom:
+            raw = json.dumps(custom, separators=(",", ":")).encode()
+            packed = base64.urlsafe_b64encode(zlib.compress(raw, self.level))
+            # small claim sets can grow when deflated, keep whichever is shorter
+            if len(packed) < len(raw):
+                encoded[COMPRESSED_KEY] = packed.rstrip(b"=").decode()
+                return encoded
+        encoded.update(custom)
+        return encoded
+
+    def decode(self, token_data: Dict[str, Any]) -> Dict[str, Any]:
+        custom = {}
+        decoded = {}
+        for key, value in token_data.items():
+            if key in REGISTERED_CLAIMS:
+                decoded[key] = value
+            elif key == COMPRESSED_KEY:
+                custom.update(self._inflate(value))
+            elif key != VERSION_KEY:
+                custom[key] = value
+        for key, value in custom.items():
+            decoded[self.short_claims.get(key, key)] = value
+        return decoded
+
+    @staticmethod
+    def _inflate(packed: str) -> Dict[str, Any]:
+        try:
+            packed = packed + "=" * (-len(packed) % 4)
+            raw = zlib.decompress(base64.urlsafe_b64decode(packed))
+            return json.loads(raw)
+        except (ValueError, zlib.error) as ex:
+            raise jwt.DecodeError(f"invalid compressed claims: {ex}")
@@ -1,18 +1,28 @@
 import json
 import time
-from typing import Any, Dict, NoReturn
+import uuid
+from typing import Any, Dict, Iterable, List, NoReturn, Optional, Sequence, Union
 
 import flask
 import jwt
 
 from jason import crypto
 
-from . import base
+from . import base, bulk
+from .cache import TokenCache
+from .codec import VERSION_KEY, ClaimCodec
+from .hs256 import HS256
+from .keys import KeyRing
+from .metrics import TokenMetrics
+from .revocation import Revocations, TokenRevokedError
+from .scopes import ScopeMap
+from .sessions import SessionTokens
 
 
 class Handler(base.TokenHandlerBase):
 
     HEADER_KEY = "Authorization"
+    G_STRING_KEY = "_ACCESS_TOKEN_STRING"
     CIPHER = crypto.ChaCha20
 
     DECODER_OPTIONS = {
@@ -38,7 +48,23 @@ class Handler(base.TokenHandlerBase):
         self.algorithm = None
         self.verify = None
         self.auto_update = None
+        self.refresh_threshold = None
         self.cipher = None
+        self.cipher_name = None
+        self.encryption_key = None
+        self.leeway = 0
+        self.cache_size = None
+        self.negative_cache_ttl = 5.0
+        self.cache = None
+        self.scope_map = None
+        self.claim_codec = None
+        self.claim_codecs = {}
+        self.signer = None
+        self.revocations = None
+        self.sessions = None
+        self.key_ring = None
+        self.key_ring_generation = None
+        self.metrics = None
         self.init_app(app)
         self.configure(**kwargs)
 
@@ -47,9 +73,8 @@ class Handler(base.TokenHandlerBase):
             return
         self.app = app
         self.app.before_first_request(self.before_first_request)
-        self.app.before_request(self.before_request)
         self.app.after_request(self.after_request)
-        app.extensions["token-handler"] = self
+        app.extensions[self.EXTENSION_KEY] = self
 
     def configure(
         self,
@@ -60,7 +85,18 @@ class Handler(base.TokenHandlerBase):
         algorithm: str = None,
         verify: bool = None,
         auto_update: bool = None,
+        refresh_threshold: float = None,
         encryption_key: str = None,
+        cipher: str = None,
+        leeway: float = None,
+        cache_size: int = None,
+        negative_cache_ttl: float = None,
+        scope_map: List[str] = None,
+        claim_codec: Union[ClaimCodec, Sequence[ClaimCodec]] = None,
+        revocations: Revocations = None,
+        sessions: SessionTokens = None,
+        key_ring: KeyRing = None,
+        metrics: bool = None,
         **kwargs: Any,
     ) -> NoReturn:
         if key is not None:
@@ -77,16 +113,77 @@ class Handler(base.TokenHandlerBase):
             self.verify = verify
         if auto_update is not None:
             self.auto_update = auto_update
+        if refresh_threshold is not None:
+            if not 0 < refresh_threshold <= 1:
+                raise ValueError("refresh_threshold must be between 0 and 1")
+            self.refresh_threshold = refresh_threshold
         if encryption_key is not None:
-            self.cipher = self.CIPHER(encryption_key)
+            self.encryption_key = encryption_key
+        if cipher is not None:
+            self.cipher_name = cipher
+        if self.encryption_key and (encryption_key, cipher) != (None, None):
+            self.cipher = self._make_cipher()
+        if leeway is not None:
+            self.leeway = leeway
+        if cache_size is not None:
+            self.cache_size = cache_size
+        if negative_cache_ttl is not None:
+            self.negative_cache_ttl = negative_cache_ttl
+        if scope_map is not None:
+            self.scope_map = ScopeMap(scope_map) if scope_map else None
+        if claim_codec is not None:
+            if isinstance(claim_codec, ClaimCodec):
+                claim_codec = [claim_codec]
+            # older versions are kept so tokens issued with them can still be read
+            self.claim_codecs = {codec.version: codec for codec in claim_codec}
+            self.claim_codec = None
+            if self.claim_codecs:
+                self.claim_codec = self.claim_codecs[max(self.claim_codecs)]
+        if revocations is not None:
+            self.revocations = revocations
+        if sessions is not None:
+            self.sessions = sessions
+        if key_ring is not None:
+            self.key_ring = key_ring
+        if metrics is not None:
+            self.metrics = TokenMetrics() if metrics else None
+        if any(v is not None for v in (leeway, cache_size, negative_cache_ttl)):
+            self.cache = None
+            if self.cache_size:
+                self.cache = TokenCache(
+                    maxsize=self.cache_size,
+                    negative_ttl=self.negative_cache_ttl,
+                    leeway=self.leeway,
+                )
         for key, value in kwargs.items():
             if key not in self.DECODER_OPTIONS:
                 raise ValueError(f"invalid keyword argument {key}")
             self.DECODER_OPTIONS[key] = value
 
+    def _make_cipher(self) -> crypto.AEADCipher:
+        # every cipher decrypts tokens sealed by the others, only encryption changes
+        if self.cipher_name is None:
+            return self.CIPHER(self.encryption_key)
+        if self.cipher_name == "auto":
+            return crypto.fastest_cipher(self.encryption_key)
+        return crypto.get_cipher(self.cipher_name)(self.encryption_key)
+
+    def _signer(self) -> Optional[HS256]:
+        # HS256 tokens skip PyJWT's generic per call setup
+        if self.algorithm != HS256.ALGORITHM or self.key is None:
+            return None
+        if self.signer is None or self.signer.key is not self.key:
+            self.signer = HS256(self.key)
+        return self.signer
+
     def _encode(
         self, token_data: Dict[str, Any], json_encoder: Any = json.JSONEncoder
     ) -> str:
+        if self.key_ring is not None:
+            return self._encode_with_ring(token_data, json_encoder)
+        signer = self._signer()
+        if signer is not None:
+            return signer.encode(token_data, json_encoder=json_encoder)
         return jwt.encode(
             payload=token_data,
             key=self.key,
@@ -94,7 +191,64 @@ class Handler(base.TokenHandlerBase):
             json_encoder=json_encoder,
         )
 
+    def _encode_with_ring(
+        self, token_data: Dict[str, Any], json_encoder: Any = json.JSONEncoder
+    ) -> str:
+        key = self.key_ring.signing_key
+        if key.signer is not None:
+            return key.signer.encode(token_data, json_encoder=json_encoder)
+        return jwt.encode(
+            payload=token_data,
+            key=key.key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid} if key.kid is not None else None,
+            json_encoder=json_encoder,
+        )
+
+    def _decode_with_ring(self, token_string: str) -> Dict[str, Any]:
+        if isinstance(token_string, str):
+            token_string = token_string.encode()
+        error = None
+        for key in self.key_ring.select(token_string):
+            issuer = key.issuer or self.issuer
+            audience = key.audience or self.audience
+            try:
+                if key.signer is not None:
+                    return key.signer.decode(
+                        token_string,
+                        verify=self.verify,
+                        options=self.DECODER_OPTIONS,
+                        issuer=issuer,
+                        audience=audience,
+                        leeway=self.leeway,
+                    )
+                return jwt.decode(
+                    jwt=token_string,
+                    key=key.key,
+                    verify=self.verify,
+                    algorithms=[key.algorithm],
+                    options=self.DECODER_OPTIONS,
+                    issuer=issuer,
+                    audience=audience,
+                    leeway=self.leeway,
+                )
+            except jwt.InvalidSignatureError as ex:
+                error = ex
+        raise error
+
     def _decode(self, token_string: str) -> Dict[str, Any]:
+        if self.key_ring is not None:
+            return self._decode_with_ring(token_string)
+        signer = self._signer()
+        if signer is not None:
+            return signer.decode(
+                token_string,
+                verify=self.verify,
+                options=self.DECODER_OPTIONS,
+                issuer=self.issuer,
+                audience=self.audience,
+                leeway=self.leeway,
+            )
         return jwt.decode(
             jwt=token_string,
             key=self.key,
@@ -103,15 +257,91 @@ class Handler(base.TokenHandlerBase):
             options=self.DECODER_OPTIONS,
             issuer=self.issuer,
             audience=self.audience,
+            leeway=self.leeway,
         )
 
+    def _read(self, token_string: str) -> Dict[str, Any]:
+        if self.metrics is not None:
+            return self._read_timed(token_string)
+        if self.cipher:
+            token_string = self.cipher.decrypt(token_string)
+        return self._decode_claims(token_string)
+
+    def _read_timed(self, token_string: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        if self.cipher:
+            token_string = self.cipher.decrypt(token_string)
+            decrypted = time.perf_counter()
+            self.metrics.decrypt.observe(decrypted - start)
+            start = decrypted
+        token_data = self._decode_claims(token_string)
+        self.metrics.decode.observe(time.perf_counter() - start)
+        return token_data
+
+    def _decode_claims(self, token_string: str) -> Dict[str, Any]:
+        token_data = self._decode(token_string)
+        if VERSION_KEY not in token_data:
+            return token_data
+        codec = self.claim_codecs.get(token_data[VERSION_KEY])
+        if codec is None:
+            raise jwt.InvalidTokenError(
+                f"unknown claim codec version {token_data[VERSION_KEY]}"
+            )
+        return codec.decode(token_data)
+
+    def encode_token(self, token_data: Dict[str, Any]) -> str:
+        if self.sessions is not None:
+            return self.sessions.issue(token_data)
+        if self.claim_codec:
+            token_data = self.claim_codec.encode(token_data)
+        token_string = self._encode(token_data=token_data)
+        if self.cipher:
+            token_string = self.cipher.encrypt(token_string)
+        return token_string
+
+    def decode_token(self, token_string: str) -> Dict[str, Any]:
+        try:
+            token_data = self._decode_cached(token_string)
+            # checked after the cache, so revoking a cached token takes effect at once
+            if self.revocations and self.revocations.is_revoked(token_data.get("jti")):
+                raise TokenRevokedError("token has been revoked")
+        except (jwt.InvalidTokenError, ValueError) as ex:
+            if self.metrics is not None:
+                self.metrics.reject(type(ex).__name__)
+            raise
+        return token_data
+
+    def _decode_cached(self, token_string: str) -> Dict[str, Any]:
+        if self.sessions is not None:
+            # sessions have their own cache, which notices deleted sessions
+            return self.sessions.load(token_string)
+        if self.cache is None:
+            return self._read(token_string)
+        if self.key_ring is not None:
+            generation = self.key_ring.generation
+            if generation != self.key_ring_generation:
+                # tokens signed with a key that has since been removed mustn't verify
+                self.cache.clear()
+                self.key_ring_generation = generation
+        key = self.cache.key(token_string)
+        token_data = self.cache.get(key)
+        if token_data is not None:
+            return token_data
+        try:
+            token_data = self._read(token_string)
+        except (jwt.InvalidTokenError, ValueError) as ex:
+            self.cache.put_error(key, ex)
+            raise
+        self.cache.put(key, token_data)
+        return token_data
+
     def before_first_request(self) -> NoReturn:
         missing = []
         if self.algorithm is None:
             self.algorithm = "HS256"
         if self.lifespan is None:
             missing.append("lifespan")
-        if self.key is None:
+        if self.key is None and self.key_ring is None:
             missing.append("key")
         if self.verify is None:
             self.verify = True
@@ -120,37 +350,108 @@ class Handler(base.TokenHandlerBase):
                 "Handler is missing the values for: " f"{', '.join(missing)}"
             )
 
-    def before_request(self) -> NoReturn:
+    def load_token(self) -> Optional[Dict[str, Any]]:
+        if self.G_KEY in flask.g:
+            return flask.g.get(self.G_KEY)
         token_string = flask.request.headers.get(self.HEADER_KEY, None)
-        if not token_string:
-            return
-        if self.cipher:
-            token_string = self.cipher.decrypt(token_string)
-        token_data = self._decode(token_string)
-        flask.g[self.G_KEY] = token_data
+        token_data = self.decode_token(token_string) if token_string else None
+        flask.g.setdefault(self.G_STRING_KEY, token_string)
+        flask.g.setdefault(self.G_KEY, token_data)
+        return token_data
+
+    def needs_refresh(self, token_data: Dict[str, Any]) -> bool:
+        if self.refresh_threshold is None or "exp" not in token_data:
+            return True
+        remaining = token_data["exp"] - time.time()
+        return remaining < self.lifespan * self.refresh_threshold
 
     def after_request(self, response: flask.Response) -> flask.Response:
         if not self.auto_update:
             return response
-        token_data = flask.g[self.G_KEY]
+        # only tokens that were read during the request are refreshed
+        token_data = flask.g.get(self.G_KEY)
+        if token_data is None:
+            return response
+        if not self.needs_refresh(token_data):
+            token_string = flask.g.get(self.G_STRING_KEY)
+            if token_string:
+                response.headers[self.HEADER_KEY] = token_string
+            return response
         token_data["exp"] = time.time() + self.lifespan
-        token_string = self._encode(token_data=token_data)
-        if self.cipher:
-            token_string = self.cipher.encrypt(token_string)
-        response.headers[self.HEADER_KEY] = token_string
+        if self.sessions is not None:
+            # the session is extended in place, the client keeps its token
+            token_string = flask.g.get(self.G_STRING_KEY)
+            self.sessions.save(token_string, token_data)
+            response.headers[self.HEADER_KEY] = token_string
+            return response
+        response.headers[self.HEADER_KEY] = self.encode_token(token_data)
         return response
 
-    def generate_token(self, user_id=None, scopes=(), token_data=None, not_before=None):
+    def generate_token(
+        self, user_id=None, scopes=(), token_data=None, not_before=None, audience=None
+    ):
         token_data = token_data or {}
-        token_data["nbf"] = not_before or time.time()
+        token_data["iat"] = time.time()
+        token_data["nbf"] = not_before or token_data["iat"]
         token_data["uid"] = user_id
-        token_data["scp"] = scopes
+        token_data["scp"] = self.scope_map.encode(scopes) if self.scope_map else scopes
         token_data["exp"] = time.time() + self.lifespan
         if self.issuer:
             token_data["iss"] = self.issuer
-        if self.audience:
-            token_data["aud"] = self.audience
-        token_string = self._encode(token_data=token_data)
-        if self.cipher:
-            token_string = self.cipher.encrypt(token_string)
-        return token_string
+        if audience or self.audience:
+            token_data["aud"] = audience or self.audience
+        if self.key_ring is not None and self.key_ring.signing_key.issuer:
+            token_data["iss"] = self.key_ring.signing_key.issuer
+        token_data.setdefault("jti", uuid.uuid4().hex)
+        return self.encode_token(token_data)
+
+    def revoke(self, token_data: Dict[str, Any]) -> NoReturn:
+        if self.revocations is None:
+            raise ValueError("Handler is not configured with revocations")
+        if "jti" not in token_data:
+            raise ValueError("token has no jti claim and cannot be revoked")
+        self.revocations.revoke(token_data["jti"], token_data.get("exp"))
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        if self.metrics is not None:
+            stats["pipeline"] = self.metrics.snapshot()
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        if self.sessions is not None and self.sessions.cache is not None:
+            stats["sessions"] = self.sessions.cache.stats()
+        if self.revocations is not None:
+            stats["revocations"] = self.revocations.stats()
+        return stats
+
+    def generate_tokens(
+        self,
+        claims: Iterable[Dict[str, Any]],
+        workers: int = None,
+        chunk_size: int = 256,
+    ) -> List[bulk.TokenResult]:
+        self.before_first_request()
+        return bulk.run(
+            self,
+            claims,
+            bulk.generate_one,
+            bulk.generate_in_worker,
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+
+    def verify_tokens(
+        self,
+        token_strings: Iterable[str],
+        workers: int = None,
+        chunk_size: int = 256,
+    ) -> List[bulk.TokenResult]:
+        self.before_first_request()
+        return bulk.run(
+            self,
+            token_strings,
+            bulk.verify_one,
+            bulk.verify_in_worker,
+            workers=workers,
+            chunk_size=chunk_size,
+        )
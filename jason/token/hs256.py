@@ -0,0 +1,162 @@
+"""
+jason.token.hs256.py
+
+a specialised HS256 encoder/decoder that produces and accepts the same tokens as
+PyJWT, but prepares the header segment and the HMAC key once instead of per call
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from calendar import timegm
+from datetime import datetime
+from typing import Any, Dict, Iterable, NoReturn, Optional, Union
+
+import jwt
+
+_TIME_CLAIMS = ("exp", "iat", "nbf")
+
+
+def b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class HS256:
+    ALGORITHM = "HS256"
+
+    def __init__(self, key: Union[str, bytes], kid: str = None):
+        self.key = key
+        self.kid = kid
+        # PyJWT's own key checks, so the same keys are accepted and rejected
+        secret = jwt.algorithms.HMACAlgorithm(None).prepare_key(key)
+        self._hmac = hmac.new(secret, digestmod=hashlib.sha256)
+        header = {"typ": "JWT", "alg": self.ALGORITHM}
+        if kid is not None:
+            header["kid"] = kid
+        header = json.dumps(header, separators=(",", ":"))
+        self.header_segment = b64encode(header.encode())
+
+    def sign(self, signing_input: bytes) -> bytes:
+        mac = self._hmac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(
+        self, payload: Dict[str, Any], json_encoder: Any = json.JSONEncoder
+    ) -> bytes:
+        for claim in _TIME_CLAIMS:
+            if isinstance(payload.get(claim), datetime):
+                payload[claim] = timegm(payload[claim].utctimetuple())
+        payload_json = json.dumps(payload, separators=(",", ":"), cls=json_encoder)
+        signing_input = self.header_segment + b"." + b64encode(payload_json.encode())
+        return signing_input + b"." + b64encode(self.sign(signing_input))
+
+    def decode(
+        self,
+        token: Union[str, bytes],
+        verify: bool = True,
+        options: Dict[str, bool] = None,
+        issuer: str = None,
+        audience: Union[str, Iterable[str]] = None,
+        leeway: float = 0,
+    ) -> Dict[str, Any]:
+        options = options or {}
+        if isinstance(token, str):
+            token = token.encode()
+        try:
+            signing_input, signature = token.rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".", 1)
+        except ValueError:
+            raise jwt.DecodeError("Not enough segments")
+        verify_signature = options.get("verify_signature", verify)
+        if header_segment != self.header_segment:
+            self._check_header(header_segment, verify_signature)
+        try:
+            payload_bytes = b64decode(payload_segment)
+            signature = b64decode(signature)
+        except (TypeError, binascii.Error):
+            raise jwt.DecodeError("Invalid payload padding")
+        if verify_signature:
+            if not hmac.compare_digest(signature, self.sign(signing_input)):
+                raise jwt.InvalidSignatureError("Signature verification failed")
+        try:
+            payload = json.loads(payload_bytes)
+        except ValueError as ex:
+            raise jwt.DecodeError(f"Invalid payload string: {ex}")
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+        if verify:
+            self.validate_claims(payload, options, issuer, audience, leeway)
+        return payload
+
+    @staticmethod
+    def _check_header(header_segment: bytes, verify_signature: bool) -> NoReturn:
+        # the header is constant for tokens we issue, anything else gets a full parse
+        try:
+            header = json.loads(b64decode(header_segment))
+        except (TypeError, binascii.Error, ValueError) as ex:
+            raise jwt.DecodeError(f"Invalid header string: {ex}")
+        if not isinstance(header, dict):
+            raise jwt.DecodeError("Invalid header string: must be a json object")
+        if verify_signature and header.get("alg") != HS256.ALGORITHM:
+            raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+
+    @staticmethod
+    def validate_claims(
+        payload: Dict[str, Any],
+        options: Dict[str, bool],
+        issuer: Optional[str],
+        audience: Union[str, Iterable[str], None],
+        leeway: float,
+    ) -> NoReturn:
+        for claim in _TIME_CLAIMS:
+            if options.get(f"require_{claim}") and payload.get(claim) is None:
+                raise jwt.MissingRequiredClaimError(claim)
+        now = int(time.time())
+        try:
+            if "iat" in payload and options.get("verify_iat"):
+                int(payload["iat"])
+        except ValueError:
+            raise jwt.InvalidIssuedAtError("Issued At claim (iat) must be an integer.")
+        try:
+            if "nbf" in payload and options.get("verify_nbf"):
+                if int(payload["nbf"]) > now + leeway:
+                    raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+            if "exp" in payload and options.get("verify_exp"):
+                if int(payload["exp"]) < now - leeway:
+                    raise jwt.ExpiredSignatureError("Signature has expired")
+        except ValueError:
+            raise jwt.DecodeError("Time claims (nbf, exp) must be integers.")
+        if options.get("verify_iss") and issuer is not None:
+            if "iss" not in payload:
+                raise jwt.MissingRequiredClaimError("iss")
+            if payload["iss"] != issuer:
+                raise jwt.InvalidIssuerError("Invalid issuer")
+        if options.get("verify_aud"):
+            _validate_audience(payload, audience)
+
+
+def _validate_audience(
+    payload: Dict[str, Any], audience: Union[str, Iterable[str], None]
+) -> NoReturn:
+    if audience is None:
+        if "aud" in payload:
+            raise jwt.InvalidAudienceError("Invalid audience")
+        return
+    if "aud" not in payload:
+        raise jwt.MissingRequiredClaimError("aud")
+    claims = payload["aud"]
+    if isinstance(claims, str):
+        claims = [claims]
+    if not isinstance(claims, list) or any(not isinstance(c, str) for c in claims):
+        raise jwt.InvalidAudienceError("Invalid claim format in token")
+    if isinstance(audience, str):
+        audience = [audience]
+    if not any(aud in claims for aud in audience):
+        raise jwt.InvalidAudienceError("Invalid audience")
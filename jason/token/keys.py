@@ -0,0 +1,155 @@
+import base64
+import binascii
+import json
+import os
+import threading
+from typing import Any, Dict, List, NamedTuple, NoReturn, Optional
+
+import jwt
+
+from .hs256 import HS256
+
+
+class Key(NamedTuple):
+    kid: Optional[str]
+    algorithm: str
+    key: Any
+    issuer: Optional[str] = None
+    audience: Optional[str] = None
+    signer: Optional[HS256] = None
+
+
+class _Ring(NamedTuple):
+    keys: List[Key]
+    by_kid: Dict[str, Key]
+    by_issuer: Dict[Optional[str], List[Key]]
+    by_header: Dict[bytes, Key]
+    signing_key: Optional[Key]
+
+
+def parse_key(jwk: Dict[str, Any]) -> Key:
+    algorithm = jwk.get("alg", HS256.ALGORITHM)
+    algorithms = jwt.algorithms.get_default_algorithms()
+    if algorithm not in algorithms or algorithm == "none":
+        raise ValueError(f"unsupported key algorithm '{algorithm}'")
+    try:
+        # keys are parsed and prepared once, when the ring is loaded
+        prepared = algorithms[algorithm].from_jwk(json.dumps(jwk))
+    except (jwt.exceptions.InvalidKeyError, KeyError, binascii.Error) as ex:
+        raise ValueError(f"invalid key {jwk.get('kid')}: {ex}")
+    signer = None
+    if algorithm == HS256.ALGORITHM:
+        signer = HS256(prepared, kid=jwk.get("kid"))
+    return Key(
+        kid=jwk.get("kid"),
+        algorithm=algorithm,
+        key=prepared,
+        issuer=jwk.get("iss"),
+        audience=jwk.get("aud"),
+        signer=signer,
+    )
+
+
+def _build(jwks: Dict[str, Any]) -> _Ring:
+    if not isinstance(jwks, dict) or not isinstance(jwks.get("keys"), list):
+        raise ValueError("key ring must be a JSON object with a list of 'keys'")
+    keys = [parse_key(jwk) for jwk in jwks["keys"] if jwk.get("use", "sig") == "sig"]
+    by_kid, by_issuer, by_header = {}, {}, {}
+    for key in keys:
+        if key.kid is not None:
+            if key.kid in by_kid:
+                raise ValueError(f"duplicate key id {key.kid}")
+            by_kid[key.kid] = key
+        # keys without an issuer are filed under None and accept any issuer
+        by_issuer.setdefault(key.issuer, []).append(key)
+        if key.signer is not None and key.kid is not None:
+            by_header[key.signer.header_segment] = key
+    # the first key is the one new tokens are signed with
+    return _Ring(keys, by_kid, by_issuer, by_header, keys[0] if keys else None)
+
+
+class KeyRing:
+    def __init__(self, path: str = None, jwks: Dict[str, Any] = None):
+        if (path is None) == (jwks is None):
+            raise ValueError("KeyRing requires either a path or jwks")
+        self.path = path
+        self.jwks = jwks
+        self._mtime = None
+        # bumped on every refresh, so caches of verified tokens know to start over
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._ring = _build(jwks) if jwks is not None else self._load()
+
+    def _load(self) -> _Ring:
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path) as f:
+            ring = _build(json.load(f))
+        self._mtime = mtime
+        return ring
+
+    def refresh(self, force: bool = False) -> bool:
+        if self.path is None:
+            return False
+        with self._lock:
+            if not force and os.stat(self.path).st_mtime_ns == self._mtime:
+                return False
+            # swapped in one assignment, readers see either the old or the new ring
+            self._ring = self._load()
+            self.generation += 1
+        return True
+
+    def schedule(self, threads: Any, seconds: float = 60.0, jitter: float = 0.0) -> Any:
+        return threads.every(seconds, jitter=jitter, name="token-key-ring")(
+            self._refresh_job
+        )
+
+    def _refresh_job(self, app: Any = None) -> NoReturn:
+        self.refresh()
+
+    @property
+    def keys(self) -> List[Key]:
+        return self._ring.keys
+
+    @property
+    def signing_key(self) -> Key:
+        signing_key = self._ring.signing_key
+        if signing_key is None:
+            raise ValueError("key ring has no signing keys")
+        return signing_key
+
+    def get(self, kid: str) -> Optional[Key]:
+        return self._ring.by_kid.get(kid)
+
+    def select(self, token_string: bytes) -> List[Key]:
+        ring = self._ring
+        try:
+            header_segment, payload_segment, _ = token_string.split(b".")
+        except ValueError:
+            raise jwt.DecodeError("Not enough segments")
+        key = ring.by_header.get(header_segment)
+        if key is not None:
+            return [key]
+        header = _segment(header_segment)
+        if header.get("kid") is not None:
+            key = ring.by_kid.get(header["kid"])
+            if key is None:
+                raise jwt.InvalidTokenError(f"unknown key id {header['kid']}")
+            return [key]
+        # no kid, so the keys of the issuer it claims are tried in order
+        issuer = _segment(payload_segment).get("iss")
+        keys = ring.by_issuer.get(issuer) or ring.by_issuer.get(None)
+        if not keys:
+            raise jwt.InvalidTokenError(f"no keys for issuer {issuer}")
+        return keys
+
+
+def _segment(segment: bytes) -> Dict[str, Any]:
+    try:
+        data = json.loads(
+            base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+        )
+    except (binascii.Error, ValueError) as ex:
+        raise jwt.DecodeError(f"Invalid token segment: {ex}")
+    if not isinstance(data, dict):
+        raise jwt.DecodeError("Invalid token segment: must be a json object")
+    return data
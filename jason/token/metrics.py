@@ -0,0 +1,97 @@
+import bisect
+import collections
+import threading
+import time
+from typing import Any, Dict, NoReturn, Sequence
+
+# seconds, from 10us to 10ms, anything slower lands in +Inf
+BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> NoReturn:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        buckets, cumulative = {}, 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+            "buckets": buckets,
+        }
+
+
+class TokenMetrics:
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = buckets
+        self.decrypt = Histogram(buckets)
+        self.decode = Histogram(buckets)
+        self.rules: Dict[str, Histogram] = {}
+        self.rejections = collections.Counter()
+        self.rule_rejections = collections.Counter()
+        self._lock = threading.Lock()
+
+    def _rule_histogram(self, name: str) -> Histogram:
+        histogram = self.rules.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.rules.setdefault(name, Histogram(self.buckets))
+        return histogram
+
+    def reject(self, reason: str) -> NoReturn:
+        with self._lock:
+            self.rejections[reason] += 1
+
+    def validate_rule(self, rule: Any, token: Dict[str, Any]) -> NoReturn:
+        name = type(rule).__name__
+        start = time.perf_counter()
+        try:
+            rule.validate(token)
+        except Exception:
+            with self._lock:
+                self.rule_rejections[name] += 1
+            raise
+        finally:
+            self._rule_histogram(name).observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            rejections = dict(self.rejections)
+            rule_rejections = dict(self.rule_rejections)
+            rules = dict(self.rules)
+        return {
+            "decrypt": self.decrypt.snapshot(),
+            "decode": self.decode.snapshot(),
+            "rules": {name: histogram.snapshot() for name, histogram in rules.items()},
+            "rejections": rejections,
+            "rule_rejections": rule_rejections,
+        }
@@ -0,0 +1,25 @@
+from typing import Any, Tuple, Union
+
+import jsonpointer
+
+Pointer = Tuple[str, ...]
+
+
+def compile_pointer(pointer: str) -> Pointer:
+    if not pointer.startswith("/"):
+        pointer = f"/{pointer}"
+    return tuple(jsonpointer.JsonPointer(pointer).parts)
+
+
+def resolve(obj: Any, pointer: Union[str, Pointer]) -> Any:
+    if isinstance(pointer, str):
+        pointer = compile_pointer(pointer)
+    for part in pointer:
+        try:
+            if isinstance(obj, (list, tuple)):
+                obj = obj[int(part)]
+            else:
+                obj = obj[part]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise jsonpointer.JsonPointerException(f"path '{part}' does not exist")
+    return obj
@@ -1,20 +1,23 @@
 import functools
 from typing import Any, Callable
 
-import flask
-
-from . import base, rules
+from . import base, error, rules
 
 
 class Protect(base.TokenHandlerBase):
-    def __init__(self, *token_rules: base.TokenRule):
-        self.rules = rules.AllOf(*token_rules)
+    def __init__(self, *token_rules: base.TokenRule, collect_errors: bool = False):
+        self.rules = rules.AllOf(*token_rules, collect_errors=collect_errors).compile()
 
     def __call__(self, func: Callable) -> Callable:
         @functools.wraps(func)
         def call(*args: Any, **kwargs: Any) -> Any:
-            token = flask.g[self.G_KEY]
-            self.rules.validate(token)
+            metrics = base.current_metrics()
+            token = base.current_token()
+            if token is None:
+                if metrics is not None:
+                    metrics.reject("MissingToken")
+                raise error.TokenValidationError("request does not contain a token")
+            self.rules.validate(token, metrics=metrics)
             return func(*args, **kwargs)
 
         return call
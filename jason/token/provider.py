@@ -0,0 +1,120 @@
+import concurrent.futures
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterable, NamedTuple, NoReturn, Tuple
+
+
+class _Entry(NamedTuple):
+    token_string: str
+    refresh_at: float
+    expire_at: float
+
+
+class TokenProvider:
+    def __init__(
+        self,
+        handler: Any,
+        refresh_after: float = 0.5,
+        expire_after: float = 0.9,
+        background: bool = True,
+    ):
+        if not 0 < refresh_after <= expire_after <= 1:
+            raise ValueError(
+                "refresh_after and expire_after must satisfy "
+                "0 < refresh_after <= expire_after <= 1"
+            )
+        self.handler = handler
+        self.refresh_after = refresh_after
+        self.expire_after = expire_after
+        self.background = background
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._tokens: Dict[Hashable, _Entry] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._executor = None
+
+    @staticmethod
+    def key(
+        audience: str = None, scopes: Iterable[str] = (), subject: Any = None
+    ) -> Tuple:
+        return audience, tuple(sorted(scopes)), subject
+
+    def get(
+        self, audience: str = None, scopes: Iterable[str] = (), subject: Any = None
+    ) -> str:
+        key = self.key(audience, scopes, subject)
+        entry = self._tokens.get(key)
+        now = time.time()
+        if entry is not None and now < entry.expire_at:
+            self.hits += 1
+            if now >= entry.refresh_at:
+                self._refresh_later(key)
+            return entry.token_string
+        self.misses += 1
+        return self._mint(key).token_string
+
+    def _mint(self, key: Tuple, force: bool = False) -> _Entry:
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # one caller mints, anyone else asking for the same token waits for it
+        with key_lock:
+            entry = self._tokens.get(key)
+            if not force and entry is not None and time.time() < entry.expire_at:
+                return entry
+            audience, scopes, subject = key
+            issued = time.time()
+            token_string = self.handler.generate_token(
+                user_id=subject, scopes=list(scopes), audience=audience
+            )
+            lifespan = self.handler.lifespan
+            entry = _Entry(
+                token_string,
+                refresh_at=issued + lifespan * self.refresh_after,
+                expire_at=issued + lifespan * self.expire_after,
+            )
+            self._tokens[key] = entry
+            return entry
+
+    def _refresh_later(self, key: Tuple) -> NoReturn:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None and self.background:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="token-provider"
+                )
+        if self._executor is None:
+            self._refresh(key)
+        else:
+            self._executor.submit(self._refresh, key)
+
+    def _refresh(self, key: Tuple) -> NoReturn:
+        try:
+            self._mint(key, force=True)
+            self.refreshes += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self) -> NoReturn:
+        with self._lock:
+            self._tokens.clear()
+
+    def stop(self, wait: bool = True) -> NoReturn:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._tokens),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
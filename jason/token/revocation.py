@@ -0,0 +1,218 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, NoReturn, Optional, Tuple
+
+import jwt
+
+Entry = Tuple[str, Optional[float]]
+
+
+class TokenRevokedError(jwt.InvalidTokenError):
+    pass
+
+
+class BloomFilter:
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> NoReturn:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class MemoryRevocationStore:
+    def __init__(self):
+        self.entries: List[Entry] = []
+        self.index: Dict[str, Optional[float]] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, exp: float = None) -> NoReturn:
+        with self._lock:
+            self.entries.append((jti, exp))
+            self.index[jti] = exp
+
+    def changes(self, cursor: Any = None) -> Tuple[List[Entry], Any]:
+        cursor = cursor or 0
+        entries = self.entries[cursor:]
+        return entries, cursor + len(entries)
+
+    def contains(self, jti: str) -> bool:
+        return jti in self.index
+
+
+class FileRevocationStore:
+    # a stand in for a shared store when every process can see the same file
+    def __init__(self, path: str):
+        self.path = path
+
+    def revoke(self, jti: str, exp: float = None) -> NoReturn:
+        line = f"{jti} {'' if exp is None else exp}\n".encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def changes(self, cursor: Any = None) -> Tuple[List[Entry], Any]:
+        cursor = cursor or 0
+        if not os.path.exists(self.path):
+            return [], cursor
+        with open(self.path, "rb") as f:
+            f.seek(cursor)
+            data = f.read()
+        # a line still being written is picked up by the next sync
+        end = data.rfind(b"\n") + 1
+        return self._parse(data[:end]), cursor + end
+
+    def contains(self, jti: str) -> bool:
+        entries, _ = self.changes()
+        return any(entry[0] == jti for entry in entries)
+
+    @staticmethod
+    def _parse(data: bytes) -> List[Entry]:
+        entries = []
+        for line in data.decode().splitlines():
+            jti, _, exp = line.partition(" ")
+            entries.append((jti, float(exp) if exp else None))
+        return entries
+
+
+class RedisRevocationStore:
+    def __init__(self, redis: Any, key: str = "jason:revoked-tokens"):
+        self.redis = redis
+        self.log_key = f"{key}:log"
+        self.index_key = f"{key}:index"
+
+    def revoke(self, jti: str, exp: float = None) -> NoReturn:
+        pipeline = self.redis.pipeline()
+        pipeline.rpush(self.log_key, f"{jti} {'' if exp is None else exp}")
+        pipeline.hset(self.index_key, jti, "" if exp is None else exp)
+        pipeline.execute()
+
+    def changes(self, cursor: Any = None) -> Tuple[List[Entry], Any]:
+        cursor = cursor or 0
+        lines = self.redis.lrange(self.log_key, cursor, -1)
+        entries = []
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode()
+            jti, _, exp = line.partition(" ")
+            entries.append((jti, float(exp) if exp else None))
+        return entries, cursor + len(lines)
+
+    def contains(self, jti: str) -> bool:
+        return bool(self.redis.hexists(self.index_key, jti))
+
+
+class Revocations:
+    def __init__(
+        self,
+        store: Any = None,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        exact_size: int = None,
+    ):
+        self.store = store or MemoryRevocationStore()
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.exact_size = exact_size or capacity
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.exact: Dict[str, Optional[float]] = {}
+        # while every revocation fits in `exact`, bloom hits never need the store
+        self.complete = True
+        self.cursor = None
+        self.checks = 0
+        self.store_lookups = 0
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, exp: float = None) -> NoReturn:
+        self.store.revoke(jti, exp)
+        self._add(jti, exp, time.time())
+
+    def _add(self, jti: str, exp: Optional[float], now: float) -> NoReturn:
+        if exp is not None and exp < now:
+            return
+        with self._lock:
+            if jti in self.exact:
+                return
+            self.bloom.add(jti)
+            if len(self.exact) < self.exact_size:
+                self.exact[jti] = exp
+            else:
+                self.complete = False
+
+    def sync(self) -> int:
+        entries, self.cursor = self.store.changes(self.cursor)
+        now = time.time()
+        for jti, exp in entries:
+            self._add(jti, exp, now)
+        self._prune(now)
+        return len(entries)
+
+    def _prune(self, now: float) -> NoReturn:
+        with self._lock:
+            expired = [
+                jti for jti, exp in self.exact.items() if exp is not None and exp < now
+            ]
+            for jti in expired:
+                del self.exact[jti]
+            # a bloom filter can't forget, so it is rebuilt once it is mostly stale
+            if self.complete and self.bloom.count > 2 * max(len(self.exact), 1):
+                bloom = BloomFilter(self.capacity, self.error_rate)
+                for jti in self.exact:
+                    bloom.add(jti)
+                self.bloom = bloom
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        self.checks += 1
+        if jti is None or jti not in self.bloom:
+            return False
+        if jti in self.exact:
+            return True
+        if self.complete:
+            return False
+        self.store_lookups += 1
+        return self.store.contains(jti)
+
+    def schedule(self, threads: Any, seconds: float = 5.0, jitter: float = 0.0) -> Any:
+        return threads.every(seconds, jitter=jitter, name="token-revocations")(
+            self._sync_job
+        )
+
+    def _sync_job(self, app: Any = None) -> NoReturn:
+        self.sync()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self.exact),
+            "bloom_count": self.bloom.count,
+            "complete": self.complete,
+            "checks": self.checks,
+            "store_lookups": self.store_lookups,
+        }
@@ -6,16 +6,34 @@ from .. import base, error
 
 
 class AllOf(base.TokenRule):
-    def __init__(self, *rules: base.TokenRule):
+    def __init__(self, *rules: base.TokenRule, collect_errors: bool = False):
         self.rules = rules
+        self.collect_errors = collect_errors
 
-    def validate(self, token: Dict[str, Any]) -> NoReturn:
+    def compile(self) -> base.TokenRule:
+        rules = []
+        for rule in self.rules:
+            if isinstance(rule, base.TokenRule):
+                rule = rule.compile()
+            if isinstance(rule, AllOf) and rule.collect_errors == self.collect_errors:
+                rules.extend(rule.rules)
+            else:
+                rules.append(rule)
+        self.rules = tuple(rules)
+        return self
+
+    def validate(self, token: Dict[str, Any], metrics: Any = None) -> NoReturn:
         errors = []
         for rule in self.rules:
             try:
-                rule.validate(token)
+                if metrics is None:
+                    rule.validate(token)
+                else:
+                    metrics.validate_rule(rule, token)
             except (error.TokenValidationError, error.BatchValidationError) as ex:
                 errors.append(ex)
+                if not self.collect_errors:
+                    break
         if len(errors):
             raise props.BatchValidationError(
                 "token did not conform to one or more of the defined rules", errors
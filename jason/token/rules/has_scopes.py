@@ -2,18 +2,21 @@ from typing import Any, Dict, NoReturn
 
 from jason import props
 
-from .. import base
+from .. import base, scopes
 
 
 class HasScopes(base.TokenRule):
-    def __init__(self, *scopes: str):
-        self.scopes = scopes
+    def __init__(self, *scopes_: str):
+        self.scopes = scopes_
+        self.required = [(scope, scopes.split_scope(scope)) for scope in scopes_]
 
     def validate(self, token: Dict[str, Any]) -> NoReturn:
-        errors = []
-        for scope in self.scopes:
-            if scope not in token["scp"]:
-                errors.append(f"token is missing a required scope {scope}")
+        index = scopes.scope_index(token)
+        errors = [
+            f"token is missing a required scope {scope}"
+            for scope, parts in self.required
+            if not index.has(scope, parts)
+        ]
         if len(errors):
             raise props.BatchValidationError(
                 f"token is missing one or more required scopes", errors
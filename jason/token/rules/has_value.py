@@ -6,6 +6,7 @@ from jason import props
 from jason.props.base import SchemaAttribute, SchemaRule
 
 from .. import base, error
+from ..pointer import compile_pointer, resolve
 
 
 class HasValue(base.TokenRule):
@@ -13,23 +14,25 @@ class HasValue(base.TokenRule):
         if not pointer.startswith("/"):
             pointer = f"/{pointer}"
         self.pointer = pointer
+        self.parts = compile_pointer(pointer)
         if isinstance(value, type):
             value = value()
         self.value = value
+        self.is_schema = isinstance(
+            value,
+            (
+                SchemaAttribute,
+                SchemaRule,
+                props.SchemaAttribute,
+                props.Model,
+                props.SchemaRule,
+            ),
+        )
 
     def validate(self, token: Dict[str, Any]) -> NoReturn:
         try:
-            v = jsonpointer.resolve_pointer(token, self.pointer)
-            if isinstance(
-                self.value,
-                (
-                    SchemaAttribute,
-                    SchemaRule,
-                    props.SchemaAttribute,
-                    props.Model,
-                    props.SchemaRule,
-                ),
-            ):
+            v = resolve(token, self.parts)
+            if self.is_schema:
                 self.value.load(v)
             elif v != self.value:
                 raise error.TokenValidationError(
@@ -1,15 +1,18 @@
-from typing import Any, Callable, Dict, List, NoReturn
+from typing import Any, Callable, Dict, List, NoReturn, Tuple
 
 import flask
 import jsonpointer
 
 from .. import base, error
+from ..pointer import Pointer, compile_pointer, resolve
 
 
 class MatchValues(base.TokenRule):
+    G_KEY = "_TOKEN_RULE_VALUES"
+
     def __init__(self, *paths: str):
         self.paths = paths
-        self.matchers: List[(Callable, str)] = [
+        self.matchers: List[Tuple[str, Callable, Pointer]] = [
             self._resolve_path(path) for path in paths
         ]
         if len(self.matchers) < 2:
@@ -17,9 +20,7 @@ class MatchValues(base.TokenRule):
 
     def validate(self, token: Dict[str, Any]) -> NoReturn:
         try:
-            assert self._check_equal(
-                [matcher[0](matcher[1], token) for matcher in self.matchers]
-            )
+            assert self._check_equal(self._values(token))
         except jsonpointer.JsonPointerException:
             raise error.TokenValidationError(f"path to value does not exist in token")
         except AssertionError:
@@ -27,41 +28,56 @@ class MatchValues(base.TokenRule):
                 f"one or more values at paths {', '.join(self.paths)} do not match"
             )
 
-    def _resolve_path(self, path: str) -> (Callable, str):
+    def _values(self, token: Dict[str, Any]) -> List[Any]:
+        # request values don't change during a request, so they are shared
+        # between every rule that looks at them
+        cache = None
+        if flask.has_request_context():
+            cache = flask.g.setdefault(self.G_KEY, {})
+        values = []
+        for name, obj, parts in self.matchers:
+            if cache is None or name == "token":
+                values.append(obj(parts, token))
+                continue
+            key = (name, parts)
+            if key not in cache:
+                cache[key] = obj(parts, token)
+            values.append(cache[key])
+        return values
+
+    def _resolve_path(self, path: str) -> Tuple[str, Callable, Pointer]:
         if ":" not in path:
             raise ValueError(f"invalid path: {path}")
         object_name, pointer = path.split(":")
-        if not pointer.startswith("/"):
-            pointer = f"/{pointer}"
         if object_name.startswith("_") or not hasattr(self, object_name):
             raise AttributeError(f"invalid match object {object_name}")
         obj: Callable = getattr(self, object_name)
-        return obj, pointer
+        return object_name, obj, compile_pointer(pointer)
 
     @staticmethod
     def _check_equal(values: List[Any]) -> bool:
         return all(str(values[0]) == str(rest) for rest in values[1:])
 
     @staticmethod
-    def header(path: str, _: Any) -> Any:
-        return jsonpointer.resolve_pointer(flask.request.headers, path)
+    def header(path: Pointer, _: Any) -> Any:
+        return resolve(flask.request.headers, path)
 
     @staticmethod
-    def json(path: str, _: Any) -> Any:
-        return jsonpointer.resolve_pointer(flask.request.json, path)
+    def json(path: Pointer, _: Any) -> Any:
+        return resolve(flask.request.json, path)
 
     @staticmethod
-    def url(path: str, _: Any) -> Any:
-        return jsonpointer.resolve_pointer(flask.request.view_args, path)
+    def url(path: Pointer, _: Any) -> Any:
+        return resolve(flask.request.view_args, path)
 
     @staticmethod
-    def query(path: str, _: Any) -> Any:
-        return jsonpointer.resolve_pointer(flask.request.args, path)
+    def query(path: Pointer, _: Any) -> Any:
+        return resolve(flask.request.args, path)
 
     @staticmethod
-    def form(path: str, _: Any) -> Any:
-        return jsonpointer.resolve_pointer(flask.request.form, path)
+    def form(path: Pointer, _: Any) -> Any:
+        return resolve(flask.request.form, path)
 
     @staticmethod
-    def token(path: str, token: Dict) -> Any:
-        return jsonpointer.resolve_pointer(token, path)
+    def token(path: Pointer, token: Dict) -> Any:
+        return resolve(token, path)
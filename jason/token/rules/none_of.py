@@ -7,6 +7,13 @@ class NoneOf(base.TokenRule):
     def __init__(self, *rules: base.TokenRule):
         self.rules = rules
 
+    def compile(self) -> base.TokenRule:
+        self.rules = tuple(
+            rule.compile() if isinstance(rule, base.TokenRule) else rule
+            for rule in self.rules
+        )
+        return self
+
     def validate(self, token: Dict[str, Any]) -> NoReturn:
         for rule in self.rules:
             try:
@@ -0,0 +1,110 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import flask
+
+from . import base
+
+SEPARATOR = ":"
+WILDCARD = "*"
+_END = object()
+G_KEY = "_TOKEN_SCOPE_INDEX"
+
+Scopes = Union[int, Sequence[str]]
+
+
+def split_scope(scope: str) -> Tuple[str, ...]:
+    return tuple(scope.split(SEPARATOR))
+
+
+class ScopeMap:
+    def __init__(self, scopes: Iterable[str]):
+        self.scopes = list(scopes)
+        if len(set(self.scopes)) != len(self.scopes):
+            raise ValueError("scope map contains duplicate scopes")
+        self.bits = {scope: 1 << i for i, scope in enumerate(self.scopes)}
+
+    def encode(self, scopes: Iterable[str]) -> int:
+        mask = 0
+        for scope in scopes:
+            if scope not in self.bits:
+                raise ValueError(f"scope {scope} has not been registered")
+            mask |= self.bits[scope]
+        return mask
+
+    def decode(self, mask: int) -> List[str]:
+        return [scope for scope, bit in self.bits.items() if mask & bit]
+
+    def mask(self, scope: str) -> Optional[int]:
+        return self.bits.get(scope)
+
+
+class ScopeIndex:
+    def __init__(self, scopes: Scopes, scope_map: ScopeMap = None):
+        self.mask = None
+        self.scope_map = scope_map
+        if isinstance(scopes, int):
+            if scope_map is None:
+                raise ValueError("scopes are encoded but no scope map is configured")
+            self.mask = scopes
+            scopes = scope_map.decode(scopes)
+        self.scopes = frozenset(scopes or ())
+        self.has_wildcards = any(WILDCARD in scope for scope in self.scopes)
+        self._trie = None
+
+    @property
+    def trie(self) -> Dict:
+        if self._trie is None:
+            trie = {}
+            for scope in self.scopes:
+                node = trie
+                for part in split_scope(scope):
+                    node = node.setdefault(part, {})
+                node[_END] = True
+            self._trie = trie
+        return self._trie
+
+    def has(self, scope: str, parts: Tuple[str, ...] = None) -> bool:
+        if self.mask is not None:
+            bit = self.scope_map.mask(scope)
+            if bit is not None and self.mask & bit:
+                return True
+        elif scope in self.scopes:
+            return True
+        if parts is None:
+            parts = split_scope(scope)
+        # wildcards only grant from the token's side, a required "*" is matched literally
+        if not self.has_wildcards:
+            return False
+        return self._match(self.trie, parts, 0)
+
+    def _match(self, node: Dict, parts: Tuple[str, ...], i: int) -> bool:
+        if i == len(parts):
+            return _END in node
+        part = parts[i]
+        # a trailing wildcard in the token grants everything below it
+        wildcard = node.get(WILDCARD)
+        if wildcard is not None and _END in wildcard:
+            return True
+        if part in node and self._match(node[part], parts, i + 1):
+            return True
+        return wildcard is not None and self._match(wildcard, parts, i + 1)
+
+
+def scope_map() -> Optional[ScopeMap]:
+    if not flask.has_app_context():
+        return None
+    handler = flask.current_app.extensions.get(base.TokenHandlerBase.EXTENSION_KEY)
+    return getattr(handler, "scope_map", None)
+
+
+def scope_index(token: Dict[str, Any]) -> ScopeIndex:
+    # built once per request and shared between every HasScopes rule
+    if not flask.has_request_context():
+        return ScopeIndex(token["scp"], scope_map=scope_map())
+    cached = flask.g.get(G_KEY)
+    if cached is not None and cached[0] is token:
+        return cached[1]
+    index = ScopeIndex(token["scp"], scope_map=scope_map())
+    flask.g.pop(G_KEY, None)
+    flask.g.setdefault(G_KEY, (token, index))
+    return index
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import secrets
+import threading
+import time
+from typing import Any, Dict, NoReturn, Optional
+
+import jwt
+
+from jason.cache import LRUCache
+
+
+class MemorySessionStore:
+    def __init__(self):
+        self.sessions: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.sessions.get(key)
+        if entry is None:
+            return None
+        claims, expires = entry
+        if expires is not None and expires <= time.time():
+            self.delete(key)
+            return None
+        return dict(claims)
+
+    def set(self, key: str, claims: Dict[str, Any], ttl: float = None) -> NoReturn:
+        expires = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self.sessions[key] = (dict(claims), expires)
+
+    def delete(self, key: str) -> NoReturn:
+        with self._lock:
+            self.sessions.pop(key, None)
+
+
+class RedisSessionStore:
+    def __init__(self, redis: Any, prefix: str = "jason:session:"):
+        self.redis = redis
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self.redis.get(f"{self.prefix}{key}")
+        if data is None:
+            return None
+        return json.loads(data)
+
+    def set(self, key: str, claims: Dict[str, Any], ttl: float = None) -> NoReturn:
+        data = json.dumps(claims, separators=(",", ":"))
+        if ttl is None:
+            self.redis.set(f"{self.prefix}{key}", data)
+        else:
+            self.redis.set(f"{self.prefix}{key}", data, px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> NoReturn:
+        self.redis.delete(f"{self.prefix}{key}")
+
+
+class SessionTokens:
+    def __init__(
+        self,
+        store: Any = None,
+        cache_size: int = 1024,
+        cache_ttl: float = 5.0,
+        token_bytes: int = 24,
+        leeway: float = 0,
+    ):
+        self.store = store or MemorySessionStore()
+        # sessions deleted from the store are still accepted here for up to cache_ttl
+        self.cache = LRUCache(maxsize=cache_size, ttl=cache_ttl) if cache_size else None
+        self.token_bytes = token_bytes
+        self.leeway = leeway
+
+    @staticmethod
+    def key(token_string: str) -> str:
+        # the store only ever sees a digest, so reading it doesn't reveal live tokens
+        if isinstance(token_string, bytes):
+            token_string = token_string.decode()
+        return hashlib.blake2b(token_string.encode(), digest_size=16).hexdigest()
+
+    def issue(self, claims: Dict[str, Any]) -> str:
+        token_string = secrets.token_urlsafe(self.token_bytes)
+        self.save(token_string, claims)
+        return token_string
+
+    def save(self, token_string: str, claims: Dict[str, Any]) -> NoReturn:
+        key = self.key(token_string)
+        ttl = None
+        if claims.get("exp") is not None:
+            ttl = claims["exp"] - time.time() + self.leeway
+        self.store.set(key, claims, ttl=ttl)
+        if self.cache is not None:
+            self.cache.pop(key)
+
+    def load(self, token_string: str) -> Dict[str, Any]:
+        key = self.key(token_string)
+        claims = self.cache.get(key) if self.cache is not None else None
+        if claims is None:
+            claims = self.store.get(key)
+            if claims is None:
+                raise jwt.InvalidTokenError("session does not exist")
+            if self.cache is not None:
+                self.cache.set(key, claims)
+        now = time.time()
+        exp = claims.get("exp")
+        if exp is not None and exp + self.leeway < now:
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        nbf = claims.get("nbf")
+        if nbf is not None and nbf - self.leeway > now:
+            raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+        return dict(claims)
+
+    def revoke(self, token_string: str) -> NoReturn:
+        key = self.key(token_string)
+        self.store.delete(key)
+        if self.cache is not None:
+            self.cache.pop(key)
@@ -0,0 +1,55 @@
+import pytest
+
+from jason import crypto
+
+
+@pytest.fixture(params=crypto.available_ciphers())
+def cipher(request):
+    return crypto.get_cipher(request.param)("secret-key")
+
+
+def test_round_trip(cipher):
+    encrypted = cipher.encrypt("some-secret-message")
+    assert cipher.decrypt(encrypted) == "some-secret-message"
+
+
+def test_round_trip_bytes(cipher):
+    envelope = cipher.encrypt_bytes(b"some-secret-message")
+    assert envelope[:2] == bytes((2, cipher.cipher_id))
+    assert cipher.decrypt_bytes(envelope) == b"some-secret-message"
+
+
+@pytest.mark.parametrize("other", crypto.available_ciphers())
+def test_decrypts_other_ciphers(cipher, other):
+    encrypted = crypto.get_cipher(other)("secret-key").encrypt("some-secret-message")
+    assert cipher.decrypt(encrypted) == "some-secret-message"
+
+
+def test_rejects_other_keys(cipher):
+    encrypted = type(cipher)("other-key").encrypt("some-secret-message")
+    with pytest.raises(ValueError):
+        cipher.decrypt(encrypted)
+
+
+def test_rejects_unknown_cipher_id(cipher):
+    with pytest.raises(ValueError):
+        cipher.decrypt_bytes(bytes((2, 99)) + bytes(40))
+
+
+def test_unknown_cipher():
+    with pytest.raises(ValueError):
+        crypto.get_cipher("rot13")
+
+
+def test_fastest_cipher():
+    cipher = crypto.fastest_cipher("secret-key", rounds=5)
+    assert cipher.name in crypto.available_ciphers()
+
+
+def test_register_rejects_duplicate_ids():
+    class Duplicate(crypto.AEADCipher):
+        name = "duplicate"
+        cipher_id = crypto.ChaCha20.cipher_id
+
+    with pytest.raises(ValueError):
+        crypto.register(Duplicate)
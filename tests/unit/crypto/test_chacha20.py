@@ -1,4 +1,8 @@
+import base64
+import string
+
 import pytest
+from Crypto.Cipher import ChaCha20 as _ChaCha20
 
 from jason.crypto import ChaCha20
 
@@ -39,3 +43,40 @@ def test_decrypts_to_string(cipher):
     encrypted = cipher.encrypt(string)
     decrypted = cipher.decrypt(encrypted)
     assert isinstance(decrypted, str)
+
+
+def legacy_encrypt(cipher, string):
+    legacy = _ChaCha20.new(key=cipher.key)
+    cipher_text = base64.b64encode(legacy.encrypt(string.encode())).decode()
+    nonce = base64.b64encode(legacy.nonce).decode()
+    return f"{cipher.escape(cipher_text)}--{cipher.escape(nonce)}"
+
+
+def test_encrypts_to_url_safe_envelope(cipher):
+    encrypted = cipher.encrypt("some-secret-message")
+    assert "=" not in encrypted
+    assert set(encrypted) <= set(string.ascii_letters + string.digits + "-_")
+
+
+def test_decrypts_legacy_format(cipher):
+    for _ in range(20):
+        encrypted = legacy_encrypt(cipher, "some-secret-message")
+        assert cipher.decrypt(encrypted) == "some-secret-message"
+
+
+def test_rejects_tampered_envelope(cipher):
+    encrypted = cipher.encrypt("some-secret-message")
+    tampered = encrypted[:-2] + ("A" if encrypted[-2] != "A" else "B") + encrypted[-1]
+    with pytest.raises(ValueError):
+        cipher.decrypt(tampered)
+
+
+def test_rejects_short_envelope(cipher):
+    with pytest.raises(ValueError):
+        cipher.decrypt("AQID")
+
+
+def test_rejects_unknown_version(cipher):
+    encrypted = cipher.encrypt("some-secret-message")
+    with pytest.raises(ValueError):
+        cipher.decrypt("Aw" + encrypted[2:])
@@ -0,0 +1,79 @@
+import pytest
+
+from jason import crypto
+from jason.crypto import stream
+
+KEY = "secret-key"
+
+
+def chunks(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("length", [0, 1, 15, 16, 17, 64, 1000])
+def test_round_trip(length):
+    data = bytes(range(256)) * 4
+    data = data[:length]
+    encrypted = b"".join(crypto.encrypt_stream(KEY, chunks(data, 7), chunk_size=16))
+    assert b"".join(crypto.decrypt_stream(KEY, chunks(encrypted, 5))) == data
+
+
+def test_overhead_is_constant_per_chunk():
+    data = b"x" * 1000
+    encrypted = b"".join(crypto.encrypt_stream(KEY, [data], chunk_size=100))
+    assert len(encrypted) == stream.HEADER_LENGTH + len(data) + 10 * stream.TAG_LENGTH
+
+
+def test_decryptor_holds_one_chunk():
+    encrypted = b"".join(crypto.encrypt_stream(KEY, [b"x" * 1000], chunk_size=100))
+    decryptor = crypto.StreamDecryptor(KEY)
+    assert decryptor.update(encrypted[:500]) == b"x" * 400
+    assert len(decryptor._buffer) <= 100 + stream.TAG_LENGTH
+
+
+def encrypted_chunks(data=b"x" * 100, chunk_size=10):
+    encrypted = b"".join(crypto.encrypt_stream(KEY, [data], chunk_size=chunk_size))
+    header = encrypted[: stream.HEADER_LENGTH]
+    body = encrypted[stream.HEADER_LENGTH :]
+    return header, chunks(body, chunk_size + stream.TAG_LENGTH)
+
+
+def decrypt(encrypted, key=KEY):
+    return b"".join(crypto.decrypt_stream(key, [encrypted]))
+
+
+def test_rejects_truncated_stream():
+    header, sealed = encrypted_chunks()
+    with pytest.raises(ValueError):
+        decrypt(header + b"".join(sealed[:-1]))
+
+
+def test_rejects_reordered_chunks():
+    header, sealed = encrypted_chunks()
+    sealed[0], sealed[1] = sealed[1], sealed[0]
+    with pytest.raises(ValueError):
+        decrypt(header + b"".join(sealed))
+
+
+def test_rejects_changed_chunk_size():
+    header, sealed = encrypted_chunks()
+    header = header[:1] + (11).to_bytes(4, "big") + header[5:]
+    with pytest.raises(ValueError):
+        decrypt(header + b"".join(sealed))
+
+
+def test_rejects_other_keys():
+    header, sealed = encrypted_chunks()
+    with pytest.raises(ValueError):
+        decrypt(header + b"".join(sealed), key="other-key")
+
+
+def test_rejects_large_chunk_sizes():
+    encrypted = b"".join(crypto.encrypt_stream(KEY, [b"x"], chunk_size=1024))
+    with pytest.raises(ValueError):
+        b"".join(crypto.decrypt_stream(KEY, [encrypted], max_chunk_size=512))
+
+
+def test_rejects_empty_stream():
+    with pytest.raises(ValueError):
+        decrypt(b"")
@@ -0,0 +1,144 @@
+import threading
+from unittest import mock
+
+import pytest
+
+from jason import make_config, props
+from jason.service import App
+
+kombu = pytest.importorskip("kombu")
+from jason.ext.kombu import BatchConsumer  # noqa: E402 isort:skip
+
+
+class ItemSchema(props.Model):
+    name = props.String()
+
+
+@pytest.fixture
+def app():
+    return App(__name__, config=make_config("rabbit").load(), testing=True)
+
+
+@pytest.fixture
+def queue():
+    exchange = kombu.Exchange("test_exchange", "direct")
+    return kombu.Queue("test_queue", exchange=exchange, routing_key="test")
+
+
+def publish(queue, *bodies, url="memory://"):
+    with kombu.Connection(url) as connection:
+        producer = connection.Producer()
+        for body in bodies:
+            producer.publish(
+                body, exchange=queue.exchange, routing_key="test", declare=[queue]
+            )
+
+
+def consume_until(consumer, app, count):
+    thread = threading.Thread(target=consumer.run, args=(app,))
+    thread.start()
+    for _ in range(100):
+        if consumer.messages >= count:
+            break
+        threading.Event().wait(0.01)
+    consumer.stop()
+    thread.join(timeout=5)
+
+
+def test_collects_messages_into_batches(app, queue):
+    batches = []
+    publish(queue, *({"name": f"item-{i}"} for i in range(10)))
+
+    @BatchConsumer(queue, batch_size=4, batch_timeout=0.05, connection_url="memory://")
+    def consumer(items):
+        batches.append(items)
+
+    consume_until(consumer.consumer, app, 10)
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+def test_validates_batch_with_model(app, queue):
+    batches = []
+    publish(queue, {"name": "valid"}, {"nope": 1})
+
+    @BatchConsumer(
+        queue,
+        batch_size=2,
+        batch_timeout=0.05,
+        model=ItemSchema,
+        connection_url="memory://",
+    )
+    def consumer(items):
+        batches.append(items)
+
+    consume_until(consumer.consumer, app, 1)
+    assert batches == [[{"name": "valid"}]]
+
+
+def test_commits_once_per_batch():
+    database = mock.Mock()
+    consumer = BatchConsumer(kombu.Queue("q"), database=database)
+    consumer.handler = mock.Mock()
+    messages = [mock.Mock(), mock.Mock()]
+    for message in messages:
+        consumer._receive({}, message)
+    consumer.flush()
+    database.session.commit.assert_called_once()
+    assert all(message.ack.called for message in messages)
+
+
+def message(redelivered=False):
+    return mock.Mock(delivery_info={"redelivered": redelivered})
+
+
+def test_requeues_batch_on_failure():
+    database = mock.Mock()
+    consumer = BatchConsumer(kombu.Queue("q"), database=database)
+    consumer.handler = mock.Mock(side_effect=RuntimeError)
+    messages = [message(), message()]
+    for item in messages:
+        consumer._receive({}, item)
+    consumer.flush()
+    # the batch, then each message on its own
+    assert database.session.rollback.call_count == 3
+    assert all(item.requeue.called for item in messages)
+    assert not any(item.ack.called for item in messages)
+
+
+def test_retries_failed_batch_one_message_at_a_time():
+    def handler(items):
+        if {"bad": True} in items:
+            raise RuntimeError
+
+    consumer = BatchConsumer(kombu.Queue("q"))
+    consumer.handler = handler
+    messages = [message(), message(redelivered=True), message()]
+    for body, item in zip([{}, {"bad": True}, {}], messages):
+        consumer._receive(body, item)
+    consumer.flush()
+    assert messages[0].ack.called and messages[2].ack.called
+    messages[1].reject.assert_called_once_with()
+    messages[1].requeue.assert_not_called()
+    assert consumer.messages == 2
+    assert consumer.rejected == 1
+
+
+def test_acks_batch_with_one_call_over_amqp():
+    consumer = BatchConsumer(kombu.Queue("q"))
+    consumer.handler = mock.Mock()
+    consumer._multiple_ack = True
+    messages = [mock.Mock(), mock.Mock()]
+    for message in messages:
+        consumer._receive({}, message)
+    consumer.flush()
+    messages[-1].ack.assert_called_once_with(multiple=True)
+    messages[0].ack.assert_not_called()
+
+
+def test_default_prefetch():
+    assert BatchConsumer(kombu.Queue("q"), batch_size=50).prefetch_count == 100
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        BatchConsumer(kombu.Queue("q"), batch_size=0)
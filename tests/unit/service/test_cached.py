@@ -0,0 +1,224 @@
+import threading
+import time
+
+import flask
+import pytest
+
+from jason import cached, props, request_schema
+from jason.service.cached import Entry
+from jason.token.base import TokenHandlerBase
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in self.data if key.startswith(match.rstrip("*"))]
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def app(calls):
+    app = flask.Flask(__name__)
+
+    @app.route("/items/<int:item_id>", methods=["GET", "POST"])
+    @cached(ttl=60)
+    def item(item_id):
+        calls.append(item_id)
+        return flask.jsonify(id=item_id, call=len(calls))
+
+    @app.route("/items")
+    @request_schema(query=props.Inline(props=dict(page=props.Int(default=1))))
+    @cached(ttl=60)
+    def items(query):
+        calls.append(query["page"])
+        return flask.jsonify(page=query["page"])
+
+    @app.route("/missing")
+    @cached(ttl=60)
+    def missing():
+        calls.append("missing")
+        return flask.jsonify(error="not found"), 404
+
+    return app
+
+
+def test_caches_by_arguments(app, calls):
+    client = app.test_client()
+    assert client.get("/items/1").json == {"id": 1, "call": 1}
+    assert client.get("/items/1").json == {"id": 1, "call": 1}
+    assert client.get("/items/2").json == {"id": 2, "call": 2}
+    assert calls == [1, 2]
+    assert app.view_functions["item"].cache.stats()["hits"] == 1
+
+
+def test_caches_by_query(app, calls):
+    client = app.test_client()
+    client.get("/items?page=2")
+    client.get("/items?page=2")
+    client.get("/items")
+    client.get("/items?page=1")
+    assert calls == [2, 1, 1]
+
+
+def test_caches_by_request_read_in_the_view(calls):
+    app = flask.Flask(__name__)
+
+    @app.route("/search")
+    @cached(ttl=60)
+    def search():
+        calls.append(flask.request.args.get("page"))
+        return flask.jsonify(page=flask.request.args.get("page"))
+
+    client = app.test_client()
+    assert client.get("/search?page=1").json == {"page": "1"}
+    assert client.get("/search?page=2&q=a").json == {"page": "2"}
+    assert client.get("/search?q=a&page=2").json == {"page": "2"}
+    assert client.get("/search", data=b"page=3").json == {"page": None}
+    assert client.get("/search").json == {"page": None}
+    assert calls == ["1", "2", None, None]
+
+
+def test_skips_other_methods(app, calls):
+    client = app.test_client()
+    client.get("/items/1")
+    client.post("/items/1")
+    assert calls == [1, 1]
+
+
+def test_does_not_cache_errors(app, calls):
+    client = app.test_client()
+    assert client.get("/missing").status_code == 404
+    assert client.get("/missing").status_code == 404
+    assert calls == ["missing", "missing"]
+
+
+def test_invalidate(app, calls):
+    client = app.test_client()
+    client.get("/items/1")
+    app.view_functions["item"].cache.invalidate(url="/items/1")
+    client.get("/items/1")
+    assert calls == [1, 1]
+
+
+def test_claims():
+    app = flask.Flask(__name__)
+    calls = []
+
+    @app.route("/me")
+    @cached(ttl=60, claims=["sub"])
+    def me():
+        calls.append(flask.g.get(TokenHandlerBase.G_KEY)["sub"])
+        return flask.jsonify(calls[-1])
+
+    def get(sub):
+        with app.test_request_context("/me"):
+            flask.g.setdefault(TokenHandlerBase.G_KEY, {"sub": sub})
+            return app.view_functions["me"]().get_json()
+
+    assert [get("a"), get("b"), get("a")] == ["a", "b", "a"]
+    assert calls == ["a", "b"]
+
+
+def test_single_computation_for_concurrent_misses():
+    app = flask.Flask(__name__)
+    calls = []
+    started = threading.Event()
+
+    @app.route("/slow")
+    @cached(ttl=60)
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return flask.jsonify(len(calls))
+
+    def get(results):
+        with app.test_request_context("/slow"):
+            results.append(app.view_functions["slow"]().get_json())
+
+    results = []
+    threads = [threading.Thread(target=get, args=(results,)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert results == [1] * 5
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_serves_stale_while_refreshing(background):
+    app = flask.Flask(__name__)
+    calls = []
+
+    @app.route("/")
+    @cached(ttl=0.01, stale=60, background=background)
+    def index():
+        calls.append(flask.request.path)
+        return flask.jsonify(len(calls))
+
+    cache = app.view_functions["index"].cache
+    client = app.test_client()
+    assert client.get("/").json == 1
+    time.sleep(0.02)
+    key = next(iter(cache.local._data))
+    cache._refreshing.add(key)
+    # someone else is refreshing, the stale copy is served
+    assert client.get("/").json == 1
+    cache._refreshing.discard(key)
+    response = client.get("/")
+    cache.stop()
+    # the background refresh still sees the request it was started from
+    assert calls == ["/", "/"]
+    assert response.json == (1 if background else 2)
+    assert client.get("/").json == 2
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_redis_tier():
+    redis = FakeRedis()
+    app = flask.Flask(__name__)
+    calls = []
+
+    def make_view():
+        @cached(ttl=60, redis=redis, prefix="test")
+        def index():
+            calls.append(1)
+            return flask.jsonify(len(calls))
+
+        return index
+
+    first, second = make_view(), make_view()
+    other_app = flask.Flask(__name__)
+    app.add_url_rule("/", "index", first)
+    other_app.add_url_rule("/", "index", second)
+    assert app.test_client().get("/").json == 1
+    # another process, with its own local tier, finds the shared copy
+    assert other_app.test_client().get("/").json == 1
+    assert second.cache.stats()["shared_hits"] == 1
+    second.cache.clear()
+    assert redis.data == {}
+
+
+def test_entry_round_trip():
+    entry = Entry(200, [["Content-Type", "image/png"]], bytes(range(256)), 1.5)
+    assert Entry.loads(entry.dumps()) == entry
@@ -0,0 +1,229 @@
+import gzip
+import io
+import zlib
+
+import flask
+import pytest
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+from jason.service import App, CompressionMiddleware, make_config
+from jason.service.compression import DECODERS, negotiate
+
+BIG = {"items": [{"id": i, "name": f"item {i}"} for i in range(500)]}
+
+
+@pytest.fixture
+def app():
+    app = App(__name__, config=make_config().load(compress=True), testing=True)
+
+    @app.route("/big")
+    def big():
+        return flask.jsonify(BIG)
+
+    @app.route("/small")
+    def small():
+        return flask.jsonify({"a": 1})
+
+    @app.route("/image")
+    def image():
+        return flask.Response(b"\x89PNG" * 1000, content_type="image/png")
+
+    @app.route("/tagged")
+    def tagged():
+        response = flask.jsonify(BIG)
+        response.set_etag("abc")
+        return response
+
+    @app.route("/stream")
+    def stream():
+        lines = (b'{"id": %d}\n' % i for i in range(1000))
+        return flask.Response(lines, content_type="application/x-ndjson")
+
+    @app.route("/short-stream")
+    def short_stream():
+        return flask.Response(iter([b"{}", b"\n"]), content_type="application/json")
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        return flask.jsonify(size=len(flask.request.get_data()))
+
+    return app
+
+
+def get(app, path, **headers):
+    return app.test_client().get(path, headers=headers)
+
+
+def test_compresses_large_json(app):
+    response = get(app, "/big", **{"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert "Content-Length" not in response.headers
+    assert flask.json.loads(gzip.decompress(response.data)) == BIG
+
+
+def test_not_accepted(app):
+    response = get(app, "/big")
+    assert "Content-Encoding" not in response.headers
+    assert flask.json.loads(response.data) == BIG
+    response = get(app, "/big", **{"Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_leaves_small_responses(app):
+    response = get(app, "/small", **{"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert flask.json.loads(response.data) == {"a": 1}
+
+
+def test_leaves_incompressible_types(app):
+    response = get(app, "/image", **{"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_weakens_etags(app):
+    response = get(app, "/tagged", **{"Accept-Encoding": "gzip"})
+    assert response.headers["ETag"] == 'W/"abc"'
+
+
+def test_streams(app):
+    response = get(app, "/stream", **{"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    expected = b"".join(b'{"id": %d}\n' % i for i in range(1000))
+    assert gzip.decompress(response.data) == expected
+
+
+def test_streamed_chunks_are_flushed(app):
+    app_iter = app.wsgi_app(
+        {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": "/stream",
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+            "HTTP_ACCEPT_ENCODING": "gzip",
+        },
+        lambda status, headers, exc_info=None: None,
+    )
+    decompressor = zlib.decompressobj(31)
+    first = decompressor.decompress(next(iter(app_iter)))
+    # everything buffered to reach the size threshold comes out in the first chunk
+    assert first.startswith(b'{"id": 0}\n')
+    app_iter.close()
+
+
+def test_short_streams_are_not_compressed(app):
+    response = get(app, "/short-stream", **{"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data == b"{}\n"
+
+
+def test_head(app):
+    response = app.test_client().head("/big", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_leaves_range_responses(app, tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("x" * 10_000)
+
+    @app.route("/file")
+    def file():
+        return flask.send_file(str(path), mimetype="text/plain", conditional=True)
+
+    client = app.test_client()
+    response = client.get(
+        "/file", headers={"Range": "bytes=0-2999", "Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 206
+    assert "Content-Encoding" not in response.headers
+    assert response.data == b"x" * 3000
+    # the full body too, as it offers ranges of its uncompressed bytes
+    response = client.get("/file", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+def test_disabled():
+    app = App(__name__, config=make_config().load(), testing=True)
+    assert not isinstance(app.wsgi_app, CompressionMiddleware)
+
+
+def post(app, data, encoding):
+    return app.test_client().post(
+        "/echo", data=data, headers={"Content-Encoding": encoding}
+    )
+
+
+def test_decompresses_requests(app):
+    response = post(app, gzip.compress(b"x" * 5000), "gzip")
+    assert response.json == {"size": 5000}
+    response = post(app, zlib.compress(b"x" * 5000), "deflate")
+    assert response.json == {"size": 5000}
+
+
+def test_rejects_decompression_bombs(app):
+    app.wsgi_app.max_request_size = 1000
+    response = post(app, gzip.compress(b"\0" * 10_000_000), "gzip")
+    assert response.status_code == 413
+
+
+def test_rejects_bad_request_bodies(app):
+    assert post(app, b"not gzip", "gzip").status_code == 400
+    assert post(app, gzip.compress(b"x" * 5000)[:-20], "gzip").status_code == 400
+    assert post(app, b"x", "compress").status_code == 415
+
+
+class Socket(io.BytesIO):
+    def read(self, size=-1):
+        data = super().read(size)
+        if size != 0 and not data:
+            raise AssertionError("a socket blocks once the body has been read")
+        return data
+
+
+def test_reads_no_further_than_the_content_length(app):
+    body = gzip.compress(b"x" * 5000)
+    environ = EnvironBuilder(
+        "/echo", method="POST", headers={"Content-Encoding": "gzip"}
+    ).get_environ()
+    environ["wsgi.input"] = Socket(body)
+    environ["CONTENT_LENGTH"] = str(len(body))
+    app_iter, status, _ = run_wsgi_app(app.wsgi_app, environ, buffered=True)
+    assert status == "200 OK"
+    assert flask.json.loads(b"".join(app_iter)) == {"size": 5000}
+
+
+def test_brotli_requests(app):
+    brotli = pytest.importorskip("brotli")
+    app.wsgi_app.max_request_size = 1000
+    bomb = brotli.compress(b"\0" * 10_000_000)
+    assert post(app, bomb, "br").status_code == 413
+    assert len(DECODERS["br"]().decompress(bomb, 1000)) < 100_000
+    assert post(app, brotli.compress(b"x" * 5000)[:-5], "br").status_code == 400
+
+
+def test_zstd_requests(app):
+    zstandard = pytest.importorskip("zstandard")
+    compress = zstandard.ZstdCompressor().compress
+    assert post(app, compress(b"x" * 5000), "zstd").json == {"size": 5000}
+    assert post(app, compress(b"x" * 5000)[:-3], "zstd").status_code == 400
+    app.wsgi_app.max_request_size = 1000
+    bomb = compress(b"\0" * 10_000_000)
+    assert post(app, bomb, "zstd").status_code == 413
+    assert len(DECODERS["zstd"]().decompress(bomb, 1000)) < 200_000
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate(header, expected):
+    assert negotiate(header, ["br", "gzip"]) == expected
@@ -0,0 +1,129 @@
+import flask
+import pytest
+
+from jason import conditional
+from jason.service import App, make_config
+from jason.service.conditional import cache_control_header, make_etag
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def app(calls):
+    app = App(__name__, config=make_config().load(), testing=True)
+
+    @app.route("/items")
+    @conditional(max_age=5, private=True)
+    def items():
+        calls.append("items")
+        return flask.jsonify([1, 2, 3])
+
+    @app.route("/items/<int:item_id>", methods=["GET", "PUT"])
+    @conditional(version=lambda item_id: f"{item_id}:7", weak=True)
+    def item(item_id):
+        calls.append("item")
+        return flask.jsonify(id=item_id)
+
+    @app.route("/missing")
+    @conditional(max_age=60)
+    def missing():
+        return flask.jsonify(error="not found"), 404
+
+    @app.route("/plain")
+    def plain():
+        return flask.jsonify([1, 2, 3])
+
+    return app
+
+
+def test_hashes_bodies(app):
+    client = app.test_client()
+    response = client.get("/items")
+    etag = response.headers["ETag"]
+    assert etag == f'"{make_etag(response.data)}"'
+    assert response.headers["Cache-Control"] == "max-age=5, private"
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "max-age=5, private"
+
+
+def test_changed_bodies(app):
+    response = app.test_client().get("/items", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_weak_comparison(app):
+    client = app.test_client()
+    etag = client.get("/items").headers["ETag"]
+    response = client.get("/items", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+
+
+def test_version_skips_the_view(app, calls):
+    client = app.test_client()
+    response = client.get("/items/3")
+    etag = response.headers["ETag"]
+    assert etag == f'W/"{make_etag(b"3:7")}"'
+    assert calls == ["item"]
+    response = client.get("/items/3", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert calls == ["item"]
+    response = client.get("/items/4", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_other_methods(app, calls):
+    client = app.test_client()
+    etag = client.get("/items/3").headers["ETag"]
+    response = client.put("/items/3", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+def test_errors_are_left_alone(app):
+    response = app.test_client().get("/missing")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
+    assert "Cache-Control" not in response.headers
+
+
+def test_app_etags():
+    app = App(__name__, config=make_config().load(etags=True), testing=True)
+    app.route("/plain")(lambda: flask.jsonify([1, 2, 3]))
+    client = app.test_client()
+    etag = client.get("/plain").headers["ETag"]
+    assert client.get("/plain", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_app_etags_keep_headers_from_later_hooks():
+    app = App(__name__, config=make_config().load(etags=True), testing=True)
+    app.route("/plain")(lambda: flask.jsonify([1, 2, 3]))
+
+    @app.after_request
+    def refreshed_token(response):
+        response.headers["Authorization"] = "Bearer new-token"
+        return response
+
+    client = app.test_client()
+    etag = client.get("/plain").headers["ETag"]
+    response = client.get("/plain", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["Authorization"] == "Bearer new-token"
+    assert "Content-Length" not in response.headers
+
+
+def test_app_etags_off_by_default(app):
+    assert "ETag" not in app.test_client().get("/plain").headers
+
+
+def test_cache_control_header():
+    assert cache_control_header(no_cache=True, max_age=0) == "no-cache, max-age=0"
+    assert cache_control_header(public=False) is None
+    with pytest.raises(TypeError):
+        cache_control_header(max_age="5")
@@ -0,0 +1,108 @@
+import threading
+from unittest import mock
+
+import flask
+import pytest
+
+from jason import ServiceThreads, make_config
+from jason.service import App
+from jason.service.deferred import DeferredQueue, DeferredQueueFull
+
+
+@pytest.fixture
+def app():
+    return App(__name__, config=make_config().load(), testing=True)
+
+
+def test_runs_submitted_work():
+    deferred = DeferredQueue(workers=2)
+    done = threading.Event()
+    deferred.submit(done.set)
+    assert done.wait(2)
+    deferred.stop()
+    assert deferred.stats()["completed"] == 1
+
+
+def test_runs_work_in_app_context(app):
+    deferred = DeferredQueue(workers=1)
+    deferred.start(app=app)
+    names = []
+    deferred.submit(lambda: names.append(flask.current_app.name))
+    deferred.stop()
+    assert names == [app.name]
+
+
+def test_drains_queue_on_stop():
+    deferred = DeferredQueue(workers=1)
+    results = []
+    for i in range(20):
+        deferred.submit(results.append, i)
+    deferred.stop()
+    assert results == list(range(20))
+    assert deferred.stats()["depth"] == 0
+
+
+def test_applies_backpressure_when_full():
+    deferred = DeferredQueue(workers=1, maxsize=1, timeout=0.01)
+    started, release = threading.Event(), threading.Event()
+    deferred.submit(lambda: started.set() or release.wait())
+    started.wait(1)
+    deferred.submit(mock.Mock())
+    try:
+        with pytest.raises(DeferredQueueFull):
+            deferred.submit(mock.Mock())
+    finally:
+        release.set()
+    deferred.stop()
+    assert deferred.stats()["rejected"] == 1
+
+
+def test_counts_failures():
+    deferred = DeferredQueue(workers=1)
+    deferred.submit(mock.Mock(side_effect=RuntimeError))
+    deferred.stop()
+    assert deferred.stats()["failed"] == 1
+
+
+def test_defers_until_response_is_closed(app):
+    threads = ServiceThreads(defer_workers=1)
+    threads.init_app(app)
+    calls = []
+
+    @app.route("/")
+    def view():
+        app.defer(calls.append, "after")
+        assert calls == []
+        return "ok"
+
+    response = app.test_client().get("/", buffered=False)
+    assert threads.stats()["deferred"]["submitted"] == 0
+    response.close()
+    threads.deferred.stop()
+    assert calls == ["after"]
+    assert threads.stats()["deferred"]["submitted"] == 1
+
+
+def test_defer_reports_a_full_queue_to_the_view(app):
+    threads = ServiceThreads(defer_workers=1, defer_queue_size=1, defer_timeout=0.01)
+    threads.init_app(app)
+    calls = []
+
+    @app.route("/")
+    def view():
+        app.defer(calls.append, "first")
+        with pytest.raises(DeferredQueueFull):
+            app.defer(calls.append, "second")
+        return "ok"
+
+    response = app.test_client().get("/")
+    assert response.status_code == 200
+    response.close()
+    threads.deferred.stop()
+    assert calls == ["first"]
+    assert threads.stats()["deferred"]["rejected"] == 1
+
+
+def test_defer_requires_threads(app):
+    with pytest.raises(RuntimeError):
+        app.defer(mock.Mock())
@@ -0,0 +1,141 @@
+import gzip
+import io
+
+import flask
+import pytest
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+from jason import crypto
+from jason.service import App, EncryptionMiddleware, make_config
+from jason.service.encryption import ENCODING
+
+KEY = "secret-key"
+
+
+@pytest.fixture
+def app():
+    app = flask.Flask(__name__)
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        return flask.jsonify(flask.request.get_json())
+
+    @app.route("/stream")
+    def stream():
+        return flask.Response(b"%d\n" % i for i in range(1000))
+
+    @app.route("/public")
+    def public():
+        return "public"
+
+    @app.route("/empty")
+    def empty():
+        return "", 204
+
+    app.wsgi_app = EncryptionMiddleware(
+        app.wsgi_app, KEY, paths=["/echo", "/stream", "/empty"], chunk_size=64
+    )
+    return app
+
+
+def encrypt(data):
+    return b"".join(crypto.encrypt_stream(KEY, [data], chunk_size=64))
+
+
+def decrypt(data):
+    return b"".join(crypto.decrypt_stream(KEY, [data]))
+
+
+def test_decrypts_requests_and_encrypts_responses(app):
+    body = b'{"items": [' + b",".join(b"%d" % i for i in range(200)) + b"]}"
+    response = app.test_client().post(
+        "/echo",
+        data=encrypt(body),
+        headers={
+            "Content-Type": "application/json",
+            "Content-Encoding": ENCODING,
+            "Accept-Encoding": f"gzip, {ENCODING}",
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == ENCODING
+    assert "Content-Length" not in response.headers
+    assert flask.json.loads(decrypt(response.data)) == flask.json.loads(body)
+
+
+def test_streams_responses(app):
+    response = app.test_client().get("/stream", headers={"Accept-Encoding": ENCODING})
+    expected = b"".join(b"%d\n" % i for i in range(1000))
+    assert decrypt(response.data) == expected
+
+
+def test_plain_when_not_accepted(app):
+    response = app.test_client().get("/stream")
+    assert "Content-Encoding" not in response.headers
+    assert response.data.startswith(b"0\n1\n")
+
+
+def test_ignores_other_paths(app):
+    response = app.test_client().get("/public", headers={"Accept-Encoding": ENCODING})
+    assert response.data == b"public"
+
+
+def test_leaves_bodyless_responses_alone(app):
+    response = app.test_client().get("/empty", headers={"Accept-Encoding": ENCODING})
+    assert response.status_code == 204
+    assert response.data == b""
+
+
+def test_rejects_tampered_requests(app):
+    body = bytearray(encrypt(b'{"a": 1}'))
+    body[-1] ^= 1
+    response = app.test_client().post(
+        "/echo",
+        data=bytes(body),
+        headers={"Content-Type": "application/json", "Content-Encoding": ENCODING},
+    )
+    assert response.status_code == 400
+
+
+def test_required(app):
+    app.wsgi_app.required = True
+    client = app.test_client()
+    response = client.post("/echo", json={"a": 1})
+    assert response.status_code == 415
+    response = client.get("/stream")
+    assert response.headers["Content-Encoding"] == ENCODING
+
+
+def test_reads_no_further_than_the_content_length(app):
+    body = encrypt(b'{"a": 1}')
+    environ = EnvironBuilder(
+        "/echo",
+        method="POST",
+        headers={"Content-Type": "application/json", "Content-Encoding": ENCODING},
+    ).get_environ()
+    # the rest of a keep-alive connection follows the body, and must be left unread
+    environ["wsgi.input"] = io.BytesIO(body + b"GET / HTTP/1.1\r\n")
+    environ["CONTENT_LENGTH"] = str(len(body))
+    app_iter, status, _ = run_wsgi_app(app.wsgi_app, environ, buffered=True)
+    assert status == "200 OK"
+    assert flask.json.loads(b"".join(app_iter)) == {"a": 1}
+
+
+def test_decrypts_stacked_encodings():
+    app = App(__name__, config=make_config().load(compress=True), testing=True)
+    app.route("/echo", methods=["POST"])(lambda: flask.jsonify(flask.request.json))
+    app.wsgi_app = EncryptionMiddleware(app.wsgi_app, KEY)
+    body = b'{"items": [' + b",".join(b"%d" % i for i in range(500)) + b"]}"
+    response = app.test_client().post(
+        "/echo",
+        data=encrypt(gzip.compress(body)),
+        headers={
+            "Content-Type": "application/json",
+            "Content-Encoding": f"gzip, {ENCODING}",
+            "Accept-Encoding": f"gzip, {ENCODING}",
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == f"gzip, {ENCODING}"
+    data = gzip.decompress(decrypt(response.data))
+    assert flask.json.loads(data) == flask.json.loads(body)
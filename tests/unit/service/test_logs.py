@@ -0,0 +1,96 @@
+import io
+import json
+import logging
+
+import pytest
+
+from jason import make_config
+from jason.service import logs
+from jason.service.processes import ServiceProcess
+
+
+@pytest.fixture
+def stream():
+    stream = io.StringIO()
+    yield stream
+    logs.stop_logging()
+
+
+def lines(stream):
+    logs.stop_logging()
+    return [line for line in stream.getvalue().splitlines() if line]
+
+
+def test_writes_json(stream):
+    logs.init_logging(make_config().load(), stream=stream)
+    logging.getLogger("jason.test").info("hello %s", "world", extra={"user": 1})
+    (line,) = lines(stream)
+    entry = json.loads(line)
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "jason.test"
+    assert entry["user"] == 1
+
+
+def test_writes_exceptions(stream):
+    logs.init_logging(make_config().load(), stream=stream)
+    try:
+        raise ValueError("nope")
+    except ValueError:
+        logging.getLogger("jason.test").exception("failed")
+    (line,) = lines(stream)
+    assert "ValueError: nope" in json.loads(line)["exception"]
+
+
+def test_writes_text(stream):
+    logs.init_logging(make_config().load(log_format="text"), stream=stream)
+    logging.getLogger("jason.test").warning("hello")
+    (line,) = lines(stream)
+    assert line.endswith("WARNING jason.test: hello")
+
+
+def test_per_logger_levels(stream):
+    config = make_config().load(
+        log_level="WARNING", log_levels="jason.loud=DEBUG, jason.quiet=ERROR"
+    )
+    logs.init_logging(config, stream=stream)
+    logging.getLogger("jason.loud").debug("loud")
+    logging.getLogger("jason.quiet").warning("quiet")
+    logging.getLogger("jason.other").info("other")
+    assert [json.loads(line)["message"] for line in lines(stream)] == ["loud"]
+
+
+def test_does_not_write_on_calling_thread(stream):
+    logs.init_logging(make_config().load(), stream=stream)
+    handler = logs._handler
+    assert isinstance(handler, logging.handlers.QueueHandler)
+    assert handler in logging.getLogger().handlers
+
+
+def test_reinitialising_replaces_handler(stream):
+    logs.init_logging(make_config().load(), stream=stream)
+    logs.init_logging(make_config().load(), stream=stream)
+    handlers = logging.getLogger().handlers
+    assert sum(isinstance(h, logs.QueueHandler) for h in handlers) == 1
+
+
+def test_invalid_levels():
+    with pytest.raises(ValueError):
+        logs.parse_levels("jason.token")
+
+
+def log_from_child(app, inbox, outbox):
+    logging.getLogger("jason.child").warning("from the child")
+
+
+def test_forked_children_write_their_logs(tmp_path):
+    path = tmp_path / "log.txt"
+    with open(path, "w") as stream:
+        logs.init_logging(make_config().load(), stream=stream)
+        process = ServiceProcess(log_from_child, restart=False)
+        process.start(app=None)
+        process.process.join(timeout=5)
+        process.stop()
+        logs.stop_logging()
+    messages = [json.loads(line)["message"] for line in path.read_text().splitlines()]
+    assert "from the child" in messages
@@ -0,0 +1,93 @@
+import os
+from unittest import mock
+
+import pytest
+
+from jason import ServiceThreads, make_config, service
+from jason.service import App, processes
+from jason.service.processes import ServiceProcess
+
+
+def echo(app, inbox, outbox):
+    while True:
+        item = inbox.get()
+        if item == "crash":
+            os._exit(1)
+        outbox.put((item, os.getpid(), type(app).__name__))
+
+
+def test_runs_in_child_process():
+    process = ServiceProcess(echo)
+    process.start(app=None)
+    try:
+        process.put("hello")
+        item, pid, _ = process.get(timeout=5)
+    finally:
+        process.stop()
+    assert item == "hello"
+    assert pid != os.getpid()
+
+
+def test_restarts_crashed_process():
+    process = ServiceProcess(echo, backoff=0)
+    process.start(app=None)
+    try:
+        process.put("crash")
+        process.put("hello")
+        item, _, _ = process.get(timeout=5)
+    finally:
+        process.stop()
+    assert item == "hello"
+    assert process.restarts == 1
+
+
+def test_does_not_restart_when_disabled():
+    process = ServiceProcess(echo, restart=False)
+    process.start(app=None)
+    process.put("crash")
+    process.process.join(timeout=5)
+    process._supervisor.join(timeout=5)
+    assert process.stats()["alive"] is False
+    assert process.restarts == 0
+    process.stop()
+
+
+def test_child_builds_own_app_from_service():
+    threads = ServiceThreads()
+    threads.process(echo)
+
+    @service(make_config())
+    def my_service(app):
+        threads.init_app(app)
+
+    my_service._pre_command(debug=True, config_values={})
+    app = my_service._app
+    try:
+        threads.run_all()
+        threads.processes["echo"].put("hello")
+        item, pid, app_type = threads.processes["echo"].get(timeout=5)
+    finally:
+        threads.stop()
+    assert pid != os.getpid()
+    assert app_type == App.__name__
+    assert app.service is my_service
+
+
+def test_process_decorator_with_options():
+    threads = ServiceThreads()
+    threads.process(name="worker", max_restarts=3)(echo)
+    assert threads.processes["worker"].max_restarts == 3
+
+
+def test_duplicate_process_name():
+    threads = ServiceThreads()
+    threads.process(echo)
+    with pytest.raises(ValueError):
+        threads.process(echo)
+
+
+def test_child_uses_parent_app_without_service():
+    app = mock.Mock(service=None)
+    func = mock.Mock()
+    processes._run_child(func, app, "inbox", "outbox")
+    func.assert_called_once_with(app=app, inbox="inbox", outbox="outbox")
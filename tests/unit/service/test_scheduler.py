@@ -0,0 +1,173 @@
+import datetime
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from jason import ServiceThreads
+from jason.service.scheduler import CronExpression, Job, Scheduler
+
+
+def timestamp(*args):
+    return datetime.datetime(*args).timestamp()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_cron_every_five_minutes():
+    cron = CronExpression("*/5 * * * *")
+    assert cron.next_after(timestamp(2019, 5, 9, 12, 3)) == timestamp(2019, 5, 9, 12, 5)
+
+
+def test_cron_rolls_over_day():
+    cron = CronExpression("30 2 * * *")
+    assert cron.next_after(timestamp(2019, 5, 9, 12, 0)) == timestamp(
+        2019, 5, 10, 2, 30
+    )
+
+
+def test_cron_weekday():
+    # 2019-05-09 is a thursday, 1 is monday
+    cron = CronExpression("0 0 * * 1")
+    assert cron.next_after(timestamp(2019, 5, 9)) == timestamp(2019, 5, 13)
+
+
+def test_cron_day_or_weekday():
+    # with both restricted either one fires, 2026-10-26 is the next monday
+    cron = CronExpression("0 0 1 * 1")
+    assert cron.next_after(timestamp(2026, 10, 19, 12)) == timestamp(2026, 10, 26)
+    assert cron.next_after(timestamp(2026, 10, 27)) == timestamp(2026, 11, 1)
+    # with one of them a wildcard only the other counts
+    cron = CronExpression("0 0 1 * *")
+    assert cron.next_after(timestamp(2026, 10, 19, 12)) == timestamp(2026, 11, 1)
+
+
+def test_cron_ranges_and_lists():
+    cron = CronExpression("0,30 9-17/4 * 1-6 *")
+    assert cron.hour == {9, 13, 17}
+    assert cron.minute == {0, 30}
+    assert cron.month == {1, 2, 3, 4, 5, 6}
+
+
+@pytest.mark.parametrize(
+    "expression", ["* * * *", "60 * * * *", "* 5-1 * * *", "*/0 * * * *"]
+)
+def test_invalid_cron(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_job_requires_one_schedule():
+    with pytest.raises(ValueError):
+        Job(mock.Mock())
+    with pytest.raises(ValueError):
+        Job(mock.Mock(), seconds=1, cron="* * * * *")
+
+
+def test_job_invalid_missed_policy():
+    with pytest.raises(ValueError):
+        Job(mock.Mock(), seconds=1, missed="nope")
+
+
+def test_coalesce_counts_missed_runs():
+    job = Job(mock.Mock(), seconds=10)
+    job.due = 100
+    assert job.reschedule(135) == 3
+    assert job.due == 140
+
+
+def test_catch_up_runs_every_slot():
+    job = Job(mock.Mock(), seconds=10, missed="catch_up")
+    job.due = 100
+    assert job.reschedule(135) == 0
+    assert job.due == 110
+
+
+def test_skip_does_not_run_late_job():
+    scheduler = Scheduler()
+    scheduler._executor = mock.Mock()
+    job = scheduler.add(Job(mock.Mock(), seconds=10, missed="skip"))
+    job.due = 100
+    scheduler._fire(job, 125)
+    scheduler._executor.submit.assert_not_called()
+    assert job.missed_runs == 2
+
+
+def test_overlap_protection():
+    scheduler = Scheduler()
+    scheduler._executor = mock.Mock()
+    job = scheduler.add(Job(mock.Mock(), seconds=10))
+    job.due = 100
+    scheduler._fire(job, 100)
+    scheduler._fire(job, job.due)
+    assert scheduler._executor.submit.call_count == 1
+    assert job.skipped == 1
+
+
+def test_runs_jobs_on_single_dispatcher():
+    threads = ServiceThreads()
+    calls = []
+    threads.every(seconds=0.01)(lambda app: calls.append(app))
+    threads.every(seconds=0.01, name="other")(lambda app: calls.append(app))
+    before = threading.active_count()
+    threads.run_all()
+    try:
+        assert wait_for(lambda: len(calls) >= 10)
+        assert threading.active_count() - before <= 1 + threads.scheduler.workers
+    finally:
+        threads.stop()
+    stats = threads.stats()["jobs"]
+    assert set(stats) == {"<lambda>", "other"}
+    assert stats["other"]["runs"] >= 1
+    assert stats["other"]["mean_duration"] is not None
+
+
+def test_records_failures():
+    scheduler = Scheduler()
+    job = scheduler.add(Job(mock.Mock(side_effect=RuntimeError), seconds=0.01))
+    scheduler.start()
+    try:
+        assert wait_for(lambda: job.failures >= 1)
+    finally:
+        scheduler.stop()
+    assert "RuntimeError" in job.stats()["last_error"]
+
+
+def test_runs_in_app_context():
+    app = mock.MagicMock()
+    func = mock.Mock()
+    scheduler = Scheduler()
+    scheduler.add(Job(func, seconds=0.01))
+    scheduler.start(app=app)
+    try:
+        assert wait_for(lambda: func.called)
+    finally:
+        scheduler.stop()
+    func.assert_called_with(app=app)
+    app.app_context.assert_called()
+
+
+def test_does_not_block_interpreter_exit():
+    script = textwrap.dedent(
+        """
+        from jason import ServiceThreads
+
+        threads = ServiceThreads()
+        threads.every(60)(lambda app=None: None)
+        threads.run_all()
+        print("done")
+        """
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, timeout=10
+    )
+    assert result.stdout.strip() == b"done"
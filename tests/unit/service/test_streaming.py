@@ -0,0 +1,87 @@
+import datetime
+import json
+
+import flask
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.ext.declarative import declarative_base
+
+from jason import stream_json
+from jason.ext.sqlalchemy import SQLAlchemy
+
+
+@pytest.fixture
+def app():
+    return flask.Flask(__name__)
+
+
+def test_streams_json_arrays(app):
+    with app.test_request_context():
+        response = stream_json({"id": i} for i in range(1000))
+        chunks = list(response.response)
+    assert response.content_type == "application/json"
+    assert json.loads(b"".join(chunks)) == [{"id": i} for i in range(1000)]
+
+
+def test_first_item_is_sent_alone(app):
+    with app.test_request_context():
+        response = stream_json(({"id": i} for i in range(1000)), chunk_size=100)
+        chunks = list(response.response)
+    assert chunks[0] == b'[{"id":0}'
+    assert all(len(chunk) <= 100 + 12 for chunk in chunks)
+
+
+def test_streams_ndjson(app):
+    with app.test_request_context():
+        response = stream_json(iter([1, {"a": 2}]), ndjson=True)
+        data = b"".join(response.response)
+    assert response.content_type == "application/x-ndjson"
+    assert data == b'1\n{"a":2}\n'
+
+
+@pytest.mark.parametrize("ndjson, expected", [(False, b"[]"), (True, b"")])
+def test_empty(app, ndjson, expected):
+    with app.test_request_context():
+        assert b"".join(stream_json([], ndjson=ndjson).response) == expected
+
+
+def test_serialize_with_app_encoder(app):
+    @app.route("/")
+    def index():
+        created = datetime.datetime(2020, 1, 2)
+        return stream_json([created], serialize=lambda item: {"created": item})
+
+    response = app.test_client().get("/")
+    assert response.json == [{"created": "Thu, 02 Jan 2020 00:00:00 GMT"}]
+
+
+def test_generators_run_in_the_request_context(app):
+    def items():
+        for i in range(3):
+            yield flask.request.args["name"] + str(i)
+
+    @app.route("/")
+    def index():
+        return stream_json(items())
+
+    assert app.test_client().get("/?name=x").json == ["x0", "x1", "x2"]
+
+
+def test_streams_sqlalchemy_queries(app):
+    Base = declarative_base()
+
+    class Item(Base):
+        __tablename__ = "items"
+        id = sa.Column(sa.Integer, primary_key=True)
+
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = orm.Session(bind=engine)
+    session.add_all(Item(id=i) for i in range(1, 26))
+    session.commit()
+    query = SQLAlchemy.stream(session.query(Item).order_by(Item.id), batch_size=10)
+    assert query._yield_per == 10
+    with app.test_request_context():
+        response = stream_json(query, serialize=lambda item: item.id)
+        assert json.loads(b"".join(response.response)) == list(range(1, 26))
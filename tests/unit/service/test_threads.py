@@ -0,0 +1,23 @@
+from unittest import mock
+
+from jason import ServiceThreads
+
+
+def test_passes_app_to_threads():
+    threads = ServiceThreads()
+    method = mock.Mock()
+    threads.thread(method)
+    app = mock.MagicMock(extensions={})
+    threads.init_app(app)
+    with mock.patch("jason.service.threads.threading.Thread") as thread:
+        threads.run_all()
+    thread.assert_called_once_with(target=method, kwargs={"app": app})
+
+
+def test_runs_threads_once():
+    threads = ServiceThreads()
+    threads.thread(mock.Mock())
+    with mock.patch("jason.service.threads.threading.Thread") as thread:
+        threads.run_all()
+        threads.run_all()
+    assert thread.call_count == 1
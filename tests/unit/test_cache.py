@@ -0,0 +1,51 @@
+import time
+from unittest import mock
+
+import pytest
+
+from jason.cache import LRUCache
+
+
+def test_get_and_set():
+    cache = LRUCache()
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expires_entries():
+    cache = LRUCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, expires=time.time() - 1)
+    assert cache.get("b") is None
+    with mock.patch("jason.cache.time.time", return_value=time.time() + 11):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_pop_and_clear():
+    cache = LRUCache()
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "nope") == "nope"
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
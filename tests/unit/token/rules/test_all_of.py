@@ -10,3 +10,28 @@ def test_validate(prop):
 def test_fails_to_validate(prop, err):
     with pytest.raises(token.BatchValidationError):
         token.AllOf(prop, err, prop).validate({})
+
+
+def test_stops_at_first_failure(prop, err):
+    with pytest.raises(token.BatchValidationError) as ex:
+        token.AllOf(err, err, prop).validate({})
+    assert ex.value.count == 1
+    prop.validate.assert_not_called()
+
+
+def test_collects_all_errors(prop, err):
+    with pytest.raises(token.BatchValidationError) as ex:
+        token.AllOf(err, prop, err, collect_errors=True).validate({})
+    assert ex.value.count == 2
+    prop.validate.assert_called_once()
+
+
+def test_compile_flattens_nested_rules(prop):
+    rule = token.AllOf(prop, token.AllOf(prop, token.AllOf(prop))).compile()
+    assert rule.rules == (prop, prop, prop)
+
+
+def test_compile_keeps_rules_with_other_error_mode(prop):
+    inner = token.AllOf(prop, collect_errors=True)
+    rule = token.AllOf(prop, inner).compile()
+    assert rule.rules == (prop, inner)
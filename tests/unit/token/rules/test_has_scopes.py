@@ -12,3 +12,32 @@ def test_fails_to_validate():
     check = token.HasScopes("read:thing", "write:thing")
     with pytest.raises(token.BatchValidationError):
         check.validate({"scp": ["read:other", "write:other"]})
+
+
+@pytest.mark.parametrize(
+    "granted, required",
+    [
+        (["read:*"], "read:thing"),
+        (["read:*"], "read:thing:child"),
+        (["*:thing"], "read:thing"),
+        (["read:*"], "read:*"),
+    ],
+)
+def test_validate_wildcards(granted, required):
+    token.HasScopes(required).validate({"scp": granted})
+
+
+@pytest.mark.parametrize(
+    "granted, required",
+    [
+        (["read:*"], "write:thing"),
+        (["read"], "read:*"),
+        (["*:thing"], "read:other"),
+        (["read:thing"], "*:other"),
+        (["read:thing"], "read:*"),
+        (["read:thing:child"], "*:thing:child"),
+    ],
+)
+def test_fails_to_validate_wildcards(granted, required):
+    with pytest.raises(token.BatchValidationError):
+        token.HasScopes(required).validate({"scp": granted})
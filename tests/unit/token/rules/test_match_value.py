@@ -1,5 +1,6 @@
 from unittest import mock
 
+import flask
 import pytest
 
 from jason import token
@@ -54,3 +55,16 @@ def test_value_invalid_object():
 
 def test_auto_fix_paths():
     token.MatchValues("url:a", "token:a")
+
+
+def test_caches_request_values_per_request():
+    app = flask.Flask(__name__)
+    with mock.patch.object(
+        token.MatchValues, "header", wraps=token.MatchValues.header
+    ) as header:
+        first = token.MatchValues("header:/X-User", "token:/uid")
+        second = token.MatchValues("header:/X-User", "token:/sub")
+        with app.test_request_context(headers={"X-User": "123"}):
+            first.validate({"uid": "123"})
+            second.validate({"sub": "123"})
+    header.assert_called_once()
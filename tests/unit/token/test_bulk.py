@@ -0,0 +1,93 @@
+import jwt
+import pytest
+
+from jason import token
+from jason.token import bulk
+
+
+@pytest.fixture
+def handler():
+    return token.Handler(
+        key="secret",
+        lifespan=60,
+        algorithm="HS256",
+        issuer="issuer",
+        audience="audience",
+        encryption_key="encryption-key",
+        scope_map=["read:thing", "write:thing"],
+    )
+
+
+CLAIMS = [{"uid": i, "scp": ["read:thing"], "tenant": f"t-{i}"} for i in range(10)]
+
+
+def test_generate_tokens(handler):
+    results = handler.generate_tokens(CLAIMS)
+    assert all(result.ok for result in results)
+    for claims, result in zip(CLAIMS, results):
+        token_data = handler.decode_token(result.value)
+        assert token_data["uid"] == claims["uid"]
+        assert token_data["tenant"] == claims["tenant"]
+
+
+def test_generate_tokens_reports_item_errors(handler):
+    results = handler.generate_tokens([{"uid": 1}, {"uid": 2, "scp": ["unknown"]}])
+    assert results[0].ok
+    assert isinstance(results[1].error, ValueError)
+
+
+def test_verify_tokens(handler):
+    token_strings = [result.value for result in handler.generate_tokens(CLAIMS)]
+    results = handler.verify_tokens(token_strings + ["not-a-token"])
+    assert [result.value["uid"] for result in results[:-1]] == list(range(10))
+    assert not results[-1].ok
+    assert isinstance(results[-1].error, ValueError)
+
+
+def test_verify_tokens_reports_invalid_tokens(handler):
+    expired = jwt.encode({"exp": 1, "iat": 1, "nbf": 1}, "secret")
+    results = handler.verify_tokens([handler.cipher.encrypt(expired)])
+    assert isinstance(results[0].error, jwt.InvalidTokenError)
+
+
+def test_process_pool(handler):
+    results = handler.generate_tokens(CLAIMS, workers=2, chunk_size=3)
+    assert all(result.ok for result in results)
+    results = handler.verify_tokens([r.value for r in results], workers=2)
+    assert [result.value["uid"] for result in results] == list(range(10))
+
+
+def test_handler_settings_round_trip(handler):
+    handler.before_first_request()
+    other = token.Handler(**bulk.handler_settings(handler))
+    token_string = other.generate_token("user-id", ["write:thing"])
+    assert handler.decode_token(token_string)["scp"] == 2
+
+
+def test_process_pool_rejects_revoked_tokens(handler):
+    handler.configure(revocations=token.Revocations())
+    token_string = handler.generate_token("user-id", ["read:thing"])
+    handler.revoke(handler.decode_token(token_string))
+    (result,) = handler.verify_tokens([token_string], workers=2)
+    assert isinstance(result.error, token.TokenRevokedError)
+
+
+def test_process_pool_with_key_ring(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text('{"keys": [{"kty": "oct", "kid": "a", "k": "c2VjcmV0"}]}')
+    handler = token.Handler(
+        key_ring=token.KeyRing(path=str(path)),
+        lifespan=60,
+        issuer="issuer",
+        audience="audience",
+    )
+    results = handler.generate_tokens(CLAIMS[:2], workers=2)
+    assert all(result.ok for result in results)
+    results = handler.verify_tokens([r.value for r in results], workers=2)
+    assert [result.value["uid"] for result in results] == [0, 1]
+
+
+def test_process_pool_rejects_sessions(handler):
+    handler.configure(sessions=token.SessionTokens())
+    with pytest.raises(ValueError):
+        handler.generate_tokens(CLAIMS, workers=2)
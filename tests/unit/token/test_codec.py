@@ -0,0 +1,119 @@
+import jwt
+import pytest
+
+from jason import token
+from jason.token import codec
+
+TOKEN_DATA = {
+    "iat": 1,
+    "nbf": 1,
+    "exp": 2,
+    "iss": "issuer",
+    "aud": "audience",
+    "uid": "user-id",
+    "scp": [f"read:thing-{i}" for i in range(50)],
+    "tenant": "tenant-id",
+}
+
+
+def test_round_trip():
+    claim_codec = codec.ClaimCodec({"tenant": "t"})
+    encoded = claim_codec.encode(TOKEN_DATA)
+    assert encoded["cv"] == 1
+    assert encoded["exp"] == 2
+    assert "z" in encoded
+    assert "tenant" not in encoded
+    assert claim_codec.decode(encoded) == TOKEN_DATA
+
+
+def test_short_keys_without_compression():
+    claim_codec = codec.ClaimCodec({"tenant": "t"}, compress=False)
+    encoded = claim_codec.encode(TOKEN_DATA)
+    assert encoded["t"] == "tenant-id"
+    assert claim_codec.decode(encoded) == TOKEN_DATA
+
+
+def test_small_claims_are_not_compressed():
+    claim_codec = codec.ClaimCodec()
+    encoded = claim_codec.encode({"exp": 2, "uid": 1})
+    assert encoded == {"cv": 1, "exp": 2, "uid": 1}
+
+
+@pytest.mark.parametrize(
+    "claims", [{"exp": "e"}, {"tenant": "z"}, {"a": "x", "b": "x"}]
+)
+def test_invalid_claims(claims):
+    with pytest.raises(ValueError):
+        codec.ClaimCodec(claims)
+
+
+@pytest.mark.parametrize(
+    "token_data", [{"z": "hi"}, {"cv": 7}, {"r": "x", "user_roles": "y"}]
+)
+def test_rejects_colliding_claims(token_data):
+    claim_codec = codec.ClaimCodec({"user_roles": "r"})
+    with pytest.raises(ValueError):
+        claim_codec.encode(token_data)
+
+
+def test_mapped_claims_may_reuse_short_keys():
+    claim_codec = codec.ClaimCodec({"a": "b", "b": "c"}, compress=False)
+    encoded = claim_codec.encode({"a": 1, "b": 2})
+    assert encoded == {"cv": 1, "b": 1, "c": 2}
+    assert claim_codec.decode(encoded) == {"a": 1, "b": 2}
+
+
+def test_corrupt_compressed_claims():
+    with pytest.raises(jwt.DecodeError):
+        codec.ClaimCodec().decode({"cv": 1, "z": "not-deflated"})
+
+
+def make_handler(claim_codec):
+    return token.Handler(
+        key="secret",
+        lifespan=60,
+        algorithm="HS256",
+        issuer="issuer",
+        audience="audience",
+        verify=True,
+        encryption_key="encryption-key",
+        claim_codec=claim_codec,
+    )
+
+
+def test_handler_round_trip():
+    handler = make_handler(token.ClaimCodec({"tenant": "t"}))
+    plain = make_handler([])
+    scopes = TOKEN_DATA["scp"]
+    token_string = handler.generate_token("user-id", scopes, {"tenant": "tenant-id"})
+    assert len(token_string) < len(plain.generate_token("user-id", scopes))
+    token_data = handler.decode_token(token_string)
+    assert token_data["scp"] == scopes
+    assert token_data["tenant"] == "tenant-id"
+    assert "cv" not in token_data
+
+
+def test_handler_reads_older_versions():
+    old = make_handler(token.ClaimCodec({"tenant": "t"}, version=1))
+    new = make_handler(
+        [
+            token.ClaimCodec({"tenant": "t"}),
+            token.ClaimCodec({"tenant": "tn"}, version=2),
+        ]
+    )
+    token_string = old.generate_token("user-id", token_data={"tenant": "tenant-id"})
+    assert new.decode_token(token_string)["tenant"] == "tenant-id"
+    assert new.claim_codec.version == 2
+
+
+def test_handler_rejects_unknown_version():
+    new = make_handler(token.ClaimCodec(version=2))
+    old = make_handler(token.ClaimCodec(version=1))
+    with pytest.raises(jwt.InvalidTokenError):
+        old.decode_token(new.generate_token("user-id"))
+
+
+def test_handler_reads_tokens_without_codec():
+    token_string = make_handler([]).generate_token("user-id")
+    handler = make_handler(token.ClaimCodec())
+    assert handler.decode_token(token_string)["uid"] == "user-id"
@@ -0,0 +1,100 @@
+import time
+
+import jwt
+import pytest
+
+from jason.token.hs256 import HS256
+
+OPTIONS = {
+    "require_exp": True,
+    "require_nbf": True,
+    "require_iat": True,
+    "verify_exp": True,
+    "verify_nbf": True,
+    "verify_iat": True,
+    "verify_aud": True,
+    "verify_iss": True,
+    "verify_signature": True,
+}
+
+
+def claims(**overrides):
+    now = time.time()
+    data = {"iat": now, "nbf": now, "exp": now + 60, "iss": "iss", "aud": "aud"}
+    data.update(overrides)
+    return data
+
+
+def decode(token, **kwargs):
+    kwargs = {"issuer": "iss", "audience": "aud", **kwargs}
+    return HS256("secret").decode(token, options=dict(OPTIONS), **kwargs)
+
+
+def test_encodes_the_same_as_pyjwt():
+    data = claims(uid=1, scp=["a", "b"])
+    assert HS256("secret").encode(dict(data)) == jwt.encode(data, "secret")
+
+
+def test_decodes_pyjwt_tokens():
+    data = claims(uid=1)
+    assert decode(jwt.encode(data, "secret")) == data
+
+
+def test_pyjwt_decodes_our_tokens():
+    data = claims(uid=1)
+    token = HS256("secret").encode(dict(data))
+    assert jwt.decode(token, "secret", audience="aud", algorithms=["HS256"]) == data
+
+
+def test_accepts_differently_ordered_header():
+    data = claims()
+    token = jwt.encode(data, "secret", headers={"kid": "1"})
+    assert decode(token) == data
+
+
+def test_rejects_bad_signature():
+    with pytest.raises(jwt.InvalidSignatureError):
+        decode(jwt.encode(claims(), "other"))
+
+
+def test_rejects_other_algorithms():
+    with pytest.raises(jwt.InvalidAlgorithmError):
+        decode(jwt.encode(claims(), "secret", algorithm="HS512"))
+
+
+@pytest.mark.parametrize(
+    "overrides, kwargs, error",
+    [
+        ({"exp": time.time() - 10}, {}, jwt.ExpiredSignatureError),
+        ({"nbf": time.time() + 10}, {}, jwt.ImmatureSignatureError),
+        ({"iss": "other"}, {}, jwt.InvalidIssuerError),
+        ({"aud": "other"}, {}, jwt.InvalidAudienceError),
+        ({"iat": None}, {}, jwt.MissingRequiredClaimError),
+        ({}, {"audience": None}, jwt.InvalidAudienceError),
+    ],
+)
+def test_validates_claims_like_pyjwt(overrides, kwargs, error):
+    data = {k: v for k, v in claims(**overrides).items() if v is not None}
+    token = jwt.encode(data, "secret")
+    with pytest.raises(error):
+        decode(token, **kwargs)
+    kwargs = {"issuer": "iss", "audience": "aud", **kwargs}
+    with pytest.raises(error):
+        jwt.decode(token, "secret", algorithms=["HS256"], options=OPTIONS, **kwargs)
+
+
+def test_leeway():
+    token = jwt.encode(claims(exp=time.time() - 10), "secret")
+    assert decode(token, leeway=30)
+
+
+def test_skips_verification():
+    token = jwt.encode(claims(exp=time.time() - 10), "other")
+    options = dict(OPTIONS, verify_signature=False)
+    assert HS256("secret").decode(token, verify=False, options=options)
+
+
+@pytest.mark.parametrize("token", [b"abc", b"a.b", b"a.!!!.c"])
+def test_rejects_malformed_tokens(token):
+    with pytest.raises(jwt.DecodeError):
+        decode(token)
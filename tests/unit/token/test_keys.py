@@ -0,0 +1,138 @@
+import base64
+import json
+import os
+import time
+
+import jwt
+import pytest
+
+from jason import token
+from jason.service import ServiceThreads
+
+
+def jwk(kid, secret, **kwargs):
+    k = base64.urlsafe_b64encode(secret.encode()).rstrip(b"=").decode()
+    return {"kty": "oct", "kid": kid, "k": k, "alg": "HS256", **kwargs}
+
+
+def claims(**kwargs):
+    now = time.time()
+    return {"iat": now, "nbf": now, "exp": now + 60, "aud": "aud", **kwargs}
+
+
+@pytest.fixture
+def key_file(tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps({"keys": [jwk("one", "secret-one", iss="first")]}))
+    return str(path)
+
+
+def make_handler(key_ring):
+    return token.Handler(
+        lifespan=60, audience="aud", verify=True, algorithm="HS256", key_ring=key_ring
+    )
+
+
+def test_loads_and_indexes_keys():
+    ring = token.KeyRing(
+        jwks={
+            "keys": [
+                jwk("one", "secret-one", iss="first"),
+                jwk("two", "secret-two", iss="second"),
+                {"kty": "oct", "kid": "enc", "k": "YQ", "use": "enc"},
+            ]
+        }
+    )
+    assert [key.kid for key in ring.keys] == ["one", "two"]
+    assert ring.get("two").issuer == "second"
+    assert ring.get("one").key == b"secret-one"
+    assert ring.signing_key.kid == "one"
+
+
+@pytest.mark.parametrize(
+    "jwks",
+    [
+        {},
+        {"keys": [{"kty": "RSA", "alg": "RS256", "kid": "a"}]},
+        {"keys": [{"kty": "oct", "alg": "HS256", "kid": "a"}]},
+        {"keys": [jwk("a", "one"), jwk("a", "two")]},
+    ],
+)
+def test_invalid_key_rings(jwks):
+    with pytest.raises(ValueError):
+        token.KeyRing(jwks=jwks)
+
+
+def test_handler_signs_with_the_first_key(key_file):
+    handler = make_handler(token.KeyRing(key_file))
+    token_string = handler.generate_token("user-id")
+    assert jwt.get_unverified_header(token_string)["kid"] == "one"
+    token_data = handler.decode_token(token_string)
+    assert token_data["iss"] == "first"
+
+
+def test_selects_keys_by_kid():
+    ring = token.KeyRing(jwks={"keys": [jwk("one", "secret-one"), jwk("two", "b")]})
+    handler = make_handler(ring)
+    token_string = jwt.encode(claims(uid=2), "b", headers={"kid": "two"})
+    assert handler.decode_token(token_string)["uid"] == 2
+    with pytest.raises(jwt.InvalidTokenError):
+        handler.decode_token(jwt.encode(claims(), "b", headers={"kid": "three"}))
+
+
+def test_selects_keys_by_issuer():
+    ring = token.KeyRing(
+        jwks={
+            "keys": [
+                jwk("one", "secret-one", iss="first"),
+                jwk("two", "secret-two", iss="second"),
+                jwk("three", "secret-three", iss="second"),
+            ]
+        }
+    )
+    handler = make_handler(ring)
+    token_string = jwt.encode(claims(iss="second", uid=3), "secret-three")
+    assert handler.decode_token(token_string)["uid"] == 3
+    with pytest.raises(jwt.InvalidIssuerError):
+        handler.decode_token(
+            jwt.encode(claims(iss="first"), "secret-two", headers={"kid": "two"})
+        )
+    with pytest.raises(jwt.InvalidSignatureError):
+        handler.decode_token(jwt.encode(claims(iss="second"), "other"))
+
+
+def test_refresh_swaps_the_ring(key_file):
+    ring = token.KeyRing(key_file)
+    handler = make_handler(ring)
+    old_token = handler.generate_token("user-id")
+    assert not ring.refresh()
+    with open(key_file, "w") as f:
+        json.dump(
+            {"keys": [jwk("two", "secret-two"), jwk("one", "secret-one", iss="first")]},
+            f,
+        )
+    os.utime(key_file, ns=(time.time_ns() + 10**9,) * 2)
+    assert ring.refresh()
+    assert ring.signing_key.kid == "two"
+    assert handler.decode_token(old_token)["uid"] == "user-id"
+    assert jwt.get_unverified_header(handler.generate_token("user-id"))["kid"] == "two"
+
+
+def test_schedule(key_file):
+    threads = ServiceThreads()
+    token.KeyRing(key_file).schedule(threads, seconds=30)
+    assert threads.scheduler.jobs[0].name == "token-key-ring"
+
+
+def test_refresh_clears_the_token_cache(key_file):
+    ring = token.KeyRing(key_file)
+    handler = make_handler(ring)
+    handler.configure(cache_size=16)
+    old_token = handler.generate_token("user-id")
+    assert handler.decode_token(old_token)["uid"] == "user-id"
+    with open(key_file, "w") as f:
+        json.dump({"keys": [jwk("two", "secret-two")]}, f)
+    os.utime(key_file, ns=(time.time_ns() + 10**9,) * 2)
+    assert ring.refresh()
+    with pytest.raises(jwt.InvalidTokenError):
+        handler.decode_token(old_token)
@@ -0,0 +1,84 @@
+import flask
+import jwt
+import pytest
+
+from jason import token
+from jason.token import metrics
+
+
+def test_histogram():
+    histogram = metrics.Histogram(buckets=(0.001, 0.01))
+    for value in (0.0005, 0.005, 0.005, 1):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(1.0105)
+    assert snapshot["buckets"] == {"0.001": 1, "0.01": 3, "inf": 4}
+
+
+def test_rule_timing_and_rejections():
+    token_metrics = token.TokenMetrics()
+    rule = token.HasScopes("read:thing")
+    token_metrics.validate_rule(rule, {"scp": ["read:thing"]})
+    with pytest.raises(token.BatchValidationError):
+        token_metrics.validate_rule(rule, {"scp": []})
+    snapshot = token_metrics.snapshot()
+    assert snapshot["rules"]["HasScopes"]["count"] == 2
+    assert snapshot["rule_rejections"] == {"HasScopes": 1}
+
+
+@pytest.fixture
+def app():
+    app = flask.Flask(__name__)
+    token.Handler(
+        app,
+        key="secret",
+        lifespan=60,
+        algorithm="HS256",
+        issuer="issuer",
+        audience="audience",
+        encryption_key="encryption-key",
+        cache_size=10,
+        metrics=True,
+    )
+
+    @app.route("/")
+    @token.protect(token.HasKeys("uid"), token.HasScopes("read:thing"))
+    def protected():
+        return "ok"
+
+    @app.errorhandler(token.BatchValidationError)
+    @app.errorhandler(token.TokenValidationError)
+    @app.errorhandler(jwt.InvalidTokenError)
+    @app.errorhandler(ValueError)
+    def rejected(_):
+        return "rejected", 403
+
+    return app
+
+
+def test_handler_pipeline_metrics(app):
+    handler = app.extensions[token.Handler.EXTENSION_KEY]
+    client = app.test_client()
+    good = handler.generate_token("user", ["read:thing"])
+    assert client.get("/", headers={"Authorization": good}).status_code == 200
+    assert client.get("/", headers={"Authorization": good}).status_code == 200
+    other = handler.generate_token("user", ["write:thing"])
+    assert client.get("/", headers={"Authorization": other}).status_code == 403
+    assert client.get("/", headers={"Authorization": "bad"}).status_code == 403
+    assert client.get("/").status_code == 403
+
+    stats = handler.stats()
+    pipeline = stats["pipeline"]
+    assert pipeline["decrypt"]["count"] == 2
+    assert pipeline["decode"]["count"] == 2
+    assert pipeline["rules"]["HasKeys"]["count"] == 3
+    assert pipeline["rules"]["HasScopes"]["count"] == 3
+    assert pipeline["rule_rejections"] == {"HasScopes": 1}
+    assert pipeline["rejections"]["MissingToken"] == 1
+    assert sum(pipeline["rejections"].values()) == 2
+    assert stats["cache"]["hits"] == 1
+
+
+def test_metrics_disabled_by_default():
+    assert token.Handler().stats() == {}
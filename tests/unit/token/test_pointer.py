@@ -0,0 +1,33 @@
+import jsonpointer
+import pytest
+
+from jason.token import pointer
+
+
+def test_compiles_pointer():
+    assert pointer.compile_pointer("/a/b/0") == ("a", "b", "0")
+
+
+def test_adds_leading_slash():
+    assert pointer.compile_pointer("a/b") == ("a", "b")
+
+
+def test_unescapes_parts():
+    assert pointer.compile_pointer("/a~1b/c~0d") == ("a/b", "c~d")
+
+
+def test_resolves_dicts_and_lists():
+    parts = pointer.compile_pointer("/a/1/b")
+    assert pointer.resolve({"a": [{}, {"b": 123}]}, parts) == 123
+
+
+def test_resolves_string_pointer():
+    assert pointer.resolve({"a": {"b": 1}}, "/a/b") == 1
+
+
+@pytest.mark.parametrize(
+    "obj", [{}, {"a": []}, {"a": ["x"]}, {"a": None}, {"a": {"1": 2}}]
+)
+def test_missing_path(obj):
+    with pytest.raises(jsonpointer.JsonPointerException):
+        pointer.resolve(obj, ("a", "1", "b"))
@@ -39,3 +39,25 @@ def test_fails_to_validate(prop, err):
 
     with pytest.raises(props.BatchValidationError):
         protected()
+
+
+@mock.patch("flask.g", {"_ACCESS_TOKEN": "token"})
+def test_stops_at_first_failure(prop, err):
+    @token.protect(err, prop)
+    def protected():
+        return True
+
+    with pytest.raises(props.BatchValidationError):
+        protected()
+    prop.validate.assert_not_called()
+
+
+@mock.patch("flask.g", {"_ACCESS_TOKEN": "token"})
+def test_collects_all_errors(prop, err):
+    @token.protect(err, prop, err, collect_errors=True)
+    def protected():
+        return True
+
+    with pytest.raises(props.BatchValidationError):
+        protected()
+    assert err.validate.call_count == 2
@@ -0,0 +1,89 @@
+import threading
+import time
+from unittest import mock
+
+import jwt
+import pytest
+
+from jason import token
+
+
+@pytest.fixture
+def handler():
+    return token.Handler(
+        key="secret",
+        lifespan=60,
+        algorithm="HS256",
+        issuer="issuer",
+        audience="audience",
+    )
+
+
+def test_reuses_tokens(handler):
+    provider = token.TokenProvider(handler)
+    with mock.patch.object(handler, "generate_token", wraps=handler.generate_token):
+        first = provider.get("other-service", ["read:thing"], "user")
+        assert provider.get("other-service", ["read:thing"], "user") == first
+        assert handler.generate_token.call_count == 1
+    assert provider.stats()["hits"] == 1
+
+
+def test_keyed_by_audience_scopes_and_subject(handler):
+    provider = token.TokenProvider(handler)
+    first = provider.get("a", ["read:thing", "write:thing"], "user")
+    assert provider.get("a", ["write:thing", "read:thing"], "user") == first
+    assert provider.get("b", ["read:thing", "write:thing"], "user") != first
+    assert provider.get("a", ["read:thing"], "user") != first
+    assert provider.get("a", ["read:thing", "write:thing"], "other") != first
+
+
+def test_sets_audience(handler):
+    provider = token.TokenProvider(handler)
+    token_string = provider.get("other-service", ["read:thing"], "user")
+    token_data = jwt.decode(
+        token_string, "secret", audience="other-service", algorithms=["HS256"]
+    )
+    assert token_data["scp"] == ["read:thing"]
+    assert token_data["uid"] == "user"
+
+
+def test_refreshes_in_the_background(handler):
+    provider = token.TokenProvider(handler, refresh_after=0.5, expire_after=0.9)
+    with mock.patch("time.time", return_value=1000.0):
+        first = provider.get("a")
+    with mock.patch("time.time", return_value=1031.0):
+        assert provider.get("a") == first
+    provider.stop()
+    assert provider.refreshes == 1
+    assert provider.get("a") != first
+
+
+def test_mints_synchronously_once_expired(handler):
+    provider = token.TokenProvider(handler, refresh_after=0.5, expire_after=0.9)
+    with mock.patch("time.time", return_value=1000.0):
+        first = provider.get("a")
+    with mock.patch("time.time", return_value=1055.0):
+        assert provider.get("a") != first
+    assert provider.stats()["misses"] == 2
+
+
+def test_concurrent_callers_share_one_token(handler):
+    provider = token.TokenProvider(handler)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(provider.get("a")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(results)) == 1
+
+
+@pytest.mark.parametrize(
+    "refresh_after, expire_after", [(0, 0.5), (0.9, 0.5), (0.5, 2)]
+)
+def test_invalid_fractions(handler, refresh_after, expire_after):
+    with pytest.raises(ValueError):
+        token.TokenProvider(handler, refresh_after, expire_after)
@@ -0,0 +1,121 @@
+import time
+from unittest import mock
+
+import jwt
+import pytest
+
+from jason import token
+from jason.service import ServiceThreads
+from jason.token import revocation
+
+
+def test_bloom_filter():
+    bloom = revocation.BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"item-{i}")
+    assert all(f"item-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_revoke_and_check():
+    revocations = token.Revocations()
+    revocations.revoke("a", time.time() + 60)
+    assert revocations.is_revoked("a")
+    assert not revocations.is_revoked("b")
+    assert not revocations.is_revoked(None)
+
+
+def test_expired_revocations_are_ignored():
+    revocations = token.Revocations()
+    revocations.revoke("a", time.time() - 1)
+    assert not revocations.is_revoked("a")
+
+
+def test_sync_picks_up_changes_from_the_store():
+    store = token.MemoryRevocationStore()
+    first = token.Revocations(store)
+    second = token.Revocations(store)
+    first.revoke("a", time.time() + 60)
+    assert not second.is_revoked("a")
+    assert second.sync() == 1
+    assert second.is_revoked("a")
+    assert second.sync() == 0
+
+
+def test_sync_prunes_expired():
+    revocations = token.Revocations()
+    revocations.revoke("a", time.time() + 60)
+    revocations.exact["a"] = time.time() - 1
+    revocations.sync()
+    assert "a" not in revocations.exact
+    assert not revocations.is_revoked("a")
+
+
+def test_falls_back_to_store_when_exact_set_is_full():
+    store = token.MemoryRevocationStore()
+    revocations = token.Revocations(store, exact_size=1)
+    revocations.revoke("a")
+    revocations.revoke("b")
+    assert not revocations.complete
+    with mock.patch.object(store, "contains", wraps=store.contains) as contains:
+        assert revocations.is_revoked("b")
+        assert contains.call_count == 1
+
+
+def test_file_store(tmp_path):
+    store = token.FileRevocationStore(str(tmp_path / "revoked"))
+    assert store.changes() == ([], 0)
+    store.revoke("a", 10.0)
+    store.revoke("b")
+    entries, cursor = store.changes()
+    assert entries == [("a", 10.0), ("b", None)]
+    store.revoke("c", 20.0)
+    assert store.changes(cursor)[0] == [("c", 20.0)]
+    assert store.contains("b")
+    assert not store.contains("d")
+
+
+def test_redis_store():
+    redis = mock.MagicMock()
+    redis.lrange.return_value = [b"a 10.0", b"b "]
+    redis.hexists.return_value = 1
+    store = token.RedisRevocationStore(redis)
+    store.revoke("a", 10.0)
+    redis.pipeline.return_value.rpush.assert_called_once_with(
+        "jason:revoked-tokens:log", "a 10.0"
+    )
+    assert store.changes(3) == ([("a", 10.0), ("b", None)], 5)
+    redis.lrange.assert_called_with("jason:revoked-tokens:log", 3, -1)
+    assert store.contains("a")
+
+
+def test_schedule():
+    threads = ServiceThreads()
+    revocations = token.Revocations()
+    revocations.schedule(threads, seconds=1)
+    assert threads.scheduler.jobs[0].name == "token-revocations"
+
+
+def test_handler_rejects_revoked_tokens():
+    handler = token.Handler(
+        key="secret",
+        lifespan=60,
+        algorithm="HS256",
+        issuer="issuer",
+        audience="audience",
+        cache_size=10,
+        revocations=token.Revocations(),
+    )
+    token_string = handler.generate_token("user-id")
+    token_data = handler.decode_token(token_string)
+    assert token_data["jti"]
+    handler.revoke(token_data)
+    with pytest.raises(jwt.InvalidTokenError):
+        handler.decode_token(token_string)
+    assert handler.decode_token(handler.generate_token("user-id"))
+
+
+def test_handler_revoke_requires_revocations():
+    with pytest.raises(ValueError):
+        token.Handler().revoke({"jti": "a"})
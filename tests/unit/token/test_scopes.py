@@ -0,0 +1,82 @@
+import flask
+import pytest
+
+from jason import token
+from jason.token import scopes
+
+
+def test_scope_map_round_trip():
+    scope_map = scopes.ScopeMap(["read:thing", "write:thing", "admin"])
+    mask = scope_map.encode(["read:thing", "admin"])
+    assert mask == 0b101
+    assert scope_map.decode(mask) == ["read:thing", "admin"]
+
+
+def test_scope_map_rejects_unknown_scope():
+    with pytest.raises(ValueError):
+        scopes.ScopeMap(["read:thing"]).encode(["write:thing"])
+
+
+def test_scope_map_rejects_duplicates():
+    with pytest.raises(ValueError):
+        scopes.ScopeMap(["read:thing", "read:thing"])
+
+
+def test_index_from_mask():
+    scope_map = scopes.ScopeMap(["read:thing", "write:thing"])
+    index = scopes.ScopeIndex(scope_map.encode(["write:thing"]), scope_map=scope_map)
+    assert index.has("write:thing")
+    assert not index.has("read:thing")
+    assert not index.has("write:*")
+
+
+def test_required_wildcards_are_literal():
+    index = scopes.ScopeIndex(["admin:read", "read:*", "*:thing"])
+    assert not index.has("admin:*")
+    assert not index.has("*:read")
+    assert index.has("read:*")
+    assert index.has("write:thing")
+    assert not index.has("write:other")
+
+
+def test_trailing_wildcard_with_more_specific_wildcards():
+    index = scopes.ScopeIndex(["read:*", "read:*:write"])
+    assert index.has("read:orders:list")
+    assert index.has("read:orders")
+    assert index.has("read:orders:write")
+    assert not index.has("write:orders")
+
+
+def test_index_from_mask_requires_map():
+    with pytest.raises(ValueError):
+        scopes.ScopeIndex(3)
+
+
+def test_index_is_shared_within_a_request():
+    app = flask.Flask(__name__)
+    token_data = {"scp": ["read:thing"]}
+    with app.test_request_context():
+        first = scopes.scope_index(token_data)
+        assert scopes.scope_index(token_data) is first
+        assert scopes.scope_index({"scp": ["read:thing"]}) is not first
+
+
+def test_handler_encodes_scopes():
+    app = flask.Flask(__name__)
+    handler = token.Handler(
+        app,
+        key="secret",
+        lifespan=60,
+        algorithm="HS256",
+        issuer="test",
+        audience="test",
+        scope_map=["read:thing", "write:thing"],
+    )
+    with app.test_request_context(
+        headers={handler.HEADER_KEY: handler.generate_token(scopes=["write:thing"])}
+    ):
+        token_data = token.current_token()
+        assert token_data["scp"] == 2
+        token.HasScopes("write:thing").validate(token_data)
+        with pytest.raises(token.BatchValidationError):
+            token.HasScopes("read:thing").validate(token_data)
@@ -0,0 +1,114 @@
+import json
+import time
+from unittest import mock
+
+import flask
+import jwt
+import pytest
+
+from jason import token
+
+
+@pytest.fixture
+def sessions():
+    return token.SessionTokens(cache_ttl=60)
+
+
+def test_issue_and_load(sessions):
+    token_string = sessions.issue({"uid": 1, "exp": time.time() + 60})
+    assert len(token_string) == 32
+    assert sessions.load(token_string)["uid"] == 1
+
+
+def test_store_only_sees_digests(sessions):
+    token_string = sessions.issue({"uid": 1})
+    assert token_string not in sessions.store.sessions
+    assert sessions.key(token_string) in sessions.store.sessions
+
+
+def test_unknown_session(sessions):
+    with pytest.raises(jwt.InvalidTokenError):
+        sessions.load("unknown")
+
+
+def test_expired_session(sessions):
+    token_string = sessions.issue({"uid": 1, "exp": time.time() - 1})
+    with pytest.raises(jwt.InvalidTokenError):
+        sessions.load(token_string)
+
+
+def test_immature_session():
+    sessions = token.SessionTokens(leeway=5)
+    token_string = sessions.issue({"uid": 1, "nbf": time.time() + 60})
+    with pytest.raises(jwt.ImmatureSignatureError):
+        sessions.load(token_string)
+    token_string = sessions.issue({"uid": 1, "nbf": time.time() + 1})
+    assert sessions.load(token_string)["uid"] == 1
+
+
+def test_local_cache(sessions):
+    token_string = sessions.issue({"uid": 1})
+    sessions.load(token_string)
+    with mock.patch.object(sessions.store, "get") as get:
+        assert sessions.load(token_string)["uid"] == 1
+        get.assert_not_called()
+
+
+def test_revoke(sessions):
+    token_string = sessions.issue({"uid": 1})
+    sessions.load(token_string)
+    sessions.revoke(token_string)
+    with pytest.raises(jwt.InvalidTokenError):
+        sessions.load(token_string)
+
+
+def test_redis_store():
+    redis = mock.MagicMock()
+    store = token.RedisSessionStore(redis)
+    store.set("key", {"uid": 1}, ttl=2.5)
+    redis.set.assert_called_once_with("jason:session:key", '{"uid":1}', px=2500)
+    redis.get.return_value = json.dumps({"uid": 1}).encode()
+    assert store.get("key") == {"uid": 1}
+    store.delete("key")
+    redis.delete.assert_called_once_with("jason:session:key")
+
+
+@pytest.fixture
+def app(sessions):
+    app = flask.Flask(__name__)
+    token.Handler(app, lifespan=60, key="unused", sessions=sessions, auto_update=True)
+
+    @app.route("/")
+    @token.protect(token.HasScopes("read:thing"))
+    def protected():
+        return str(token.current_token()["uid"])
+
+    return app
+
+
+def test_protect_with_sessions(app):
+    handler = app.extensions[token.Handler.EXTENSION_KEY]
+    token_string = handler.generate_token(7, ["read:thing"])
+    response = app.test_client().get("/", headers={"Authorization": token_string})
+    assert response.status_code == 200
+    assert response.data == b"7"
+    assert response.headers["Authorization"] == token_string
+
+
+def test_refresh_extends_session(app):
+    handler = app.extensions[token.Handler.EXTENSION_KEY]
+    token_string = handler.generate_token(7, ["read:thing"])
+    before = handler.sessions.load(token_string)["exp"]
+    time.sleep(0.01)
+    app.test_client().get("/", headers={"Authorization": token_string})
+    assert handler.sessions.load(token_string)["exp"] > before
+
+
+def test_handler_rejects_immature_sessions(app):
+    handler = app.extensions[token.Handler.EXTENSION_KEY]
+    token_string = handler.generate_token(
+        7, ["read:thing"], not_before=time.time() + 3600
+    )
+    # the same error the JWT path raises
+    with pytest.raises(jwt.ImmatureSignatureError):
+        handler.decode_token(token_string)
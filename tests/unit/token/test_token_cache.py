@@ -0,0 +1,72 @@
+import time
+
+import jwt
+import pytest
+
+from jason.token.cache import TokenCache
+
+
+def test_caches_claims_until_expiry():
+    cache = TokenCache()
+    key = cache.key("token")
+    cache.put(key, {"exp": time.time() + 10})
+    assert cache.get(key) is not None
+    cache.put(key, {"exp": time.time() - 1})
+    assert cache.get(key) is None
+
+
+def test_honours_leeway():
+    cache = TokenCache(leeway=10)
+    key = cache.key("token")
+    cache.put(key, {"exp": time.time() - 1})
+    assert cache.get(key) is not None
+
+
+def test_honours_not_before():
+    cache = TokenCache()
+    key = cache.key("token")
+    cache.put(key, {"exp": time.time() + 10, "nbf": time.time() + 5})
+    assert cache.get(key) is None
+
+
+def test_does_not_cache_tokens_without_expiry():
+    cache = TokenCache()
+    key = cache.key("token")
+    cache.put(key, {})
+    assert cache.get(key) is None
+
+
+def test_returns_copies():
+    cache = TokenCache()
+    key = cache.key("token")
+    cache.put(key, {"exp": time.time() + 10})
+    cache.get(key)["exp"] = 0
+    assert cache.get(key)["exp"] != 0
+
+
+def test_negative_cache():
+    cache = TokenCache(negative_ttl=5)
+    key = cache.key("token")
+    cache.put_error(key, jwt.ExpiredSignatureError("expired"))
+    with pytest.raises(jwt.ExpiredSignatureError):
+        cache.get(key)
+    assert cache.stats()["negative_hits"] == 1
+
+
+def test_negative_cache_disabled():
+    cache = TokenCache(negative_ttl=0)
+    key = cache.key("token")
+    cache.put_error(key, jwt.ExpiredSignatureError("expired"))
+    assert cache.get(key) is None
+
+
+def test_stats():
+    cache = TokenCache()
+    key = cache.key("token")
+    cache.get(key)
+    cache.put(key, {"exp": time.time() + 10})
+    cache.get(key)
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
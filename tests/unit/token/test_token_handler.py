@@ -1,9 +1,11 @@
+import time
 from unittest import mock
 
 import flask
+import jwt
 import pytest
 
-from jason import Handler
+from jason import Handler, crypto, token
 
 config = {
     "key": "123",
@@ -91,7 +93,7 @@ def test_stores_token_in_g():
     with mock.patch("jason.token.handler.flask") as mock_flask:
         mock_flask.g = {}
         mock_flask.request.headers.get.return_value = token
-        handler.before_request()
+        handler.load_token()
         assert "_ACCESS_TOKEN" in mock_flask.g
 
 
@@ -100,8 +102,8 @@ def test_skips_missing_token():
     with mock.patch("jason.token.handler.flask") as mock_flask:
         mock_flask.g = {}
         mock_flask.request.headers.get.return_value = None
-        handler.before_request()
-        assert "_ACCESS_TOKEN" not in mock_flask.g
+        assert handler.load_token() is None
+        assert mock_flask.g["_ACCESS_TOKEN"] is None
 
 
 def test_stores_decrypted_token_in_g():
@@ -112,7 +114,7 @@ def test_stores_decrypted_token_in_g():
     with mock.patch("jason.token.handler.flask") as mock_flask:
         mock_flask.g = {}
         mock_flask.request.headers.get.return_value = token
-        handler.before_request()
+        handler.load_token()
         assert "_ACCESS_TOKEN" in mock_flask.g
 
 
@@ -140,3 +142,165 @@ def test_auto_update():
         mock_flask.g = {"_ACCESS_TOKEN": {}}
         response = handler.after_request(response)
     assert "Authorization" in response.headers
+
+
+def test_cache_skips_decryption_for_repeat_tokens():
+    handler = Handler(
+        lifespan=10,
+        key="something",
+        algorithm="HS256",
+        encryption_key="something",
+        cache_size=10,
+    )
+    token = handler.generate_token()
+    with mock.patch.object(handler.cipher, "decrypt", wraps=handler.cipher.decrypt):
+        first = handler.decode_token(token)
+        second = handler.decode_token(token)
+        assert handler.cipher.decrypt.call_count == 1
+    assert first == second
+    assert handler.cache.stats()["hits"] == 1
+
+
+def test_cache_remembers_invalid_tokens():
+    handler = Handler(lifespan=10, key="something", algorithm="HS256", cache_size=10)
+    token = Handler(lifespan=10, key="other", algorithm="HS256").generate_token()
+    with mock.patch.object(handler, "_decode", wraps=handler._decode):
+        for _ in range(2):
+            with pytest.raises(jwt.InvalidSignatureError):
+                handler.decode_token(token)
+        assert handler._decode.call_count == 1
+
+
+def test_cache_disabled_by_default():
+    assert Handler().cache is None
+
+
+def test_configure_leeway():
+    handler = Handler(leeway=5, cache_size=10)
+    assert handler.leeway == 5
+    assert handler.cache.leeway == 5
+
+
+@pytest.fixture
+def app():
+    app = flask.Flask(__name__)
+    handler = Handler(
+        app,
+        lifespan=10,
+        key="something",
+        algorithm="HS256",
+        issuer="test_issuer",
+        audience="test_audience",
+    )
+
+    @app.route("/open")
+    def unprotected():
+        return "ok"
+
+    @app.route("/protected")
+    @token.protect()
+    def protected():
+        token.current_token()
+        return "ok"
+
+    app.handler = handler
+    return app
+
+
+def test_does_not_decode_for_unprotected_routes(app):
+    token_string = app.handler.generate_token()
+    with mock.patch.object(app.handler, "decode_token") as decode:
+        response = app.test_client().get(
+            "/open", headers={"Authorization": token_string}
+        )
+    assert response.status_code == 200
+    decode.assert_not_called()
+
+
+def test_decodes_once_for_protected_routes(app):
+    token_string = app.handler.generate_token()
+    with mock.patch.object(
+        app.handler, "decode_token", wraps=app.handler.decode_token
+    ) as decode:
+        response = app.test_client().get(
+            "/protected", headers={"Authorization": token_string}
+        )
+    assert response.status_code == 200
+    decode.assert_called_once()
+
+
+def test_protect_rejects_missing_token(app):
+    with app.test_request_context("/protected"):
+        with pytest.raises(token.TokenValidationError):
+            app.view_functions["protected"]()
+
+
+def test_reuses_token_inside_refresh_window():
+    response = flask.Response()
+    handler = Handler(
+        lifespan=100,
+        key="k",
+        algorithm="HS256",
+        auto_update=True,
+        refresh_threshold=0.3,
+    )
+    with mock.patch("jason.token.handler.flask") as mock_flask, mock.patch.object(
+        handler, "_encode"
+    ) as encode:
+        mock_flask.g = {
+            "_ACCESS_TOKEN": {"exp": time.time() + 50},
+            "_ACCESS_TOKEN_STRING": "incoming",
+        }
+        response = handler.after_request(response)
+    encode.assert_not_called()
+    assert response.headers["Authorization"] == "incoming"
+
+
+def test_reissues_token_near_expiry():
+    response = flask.Response()
+    handler = Handler(
+        lifespan=100,
+        key="k",
+        algorithm="HS256",
+        auto_update=True,
+        refresh_threshold=0.3,
+    )
+    with mock.patch("jason.token.handler.flask") as mock_flask:
+        mock_flask.g = {
+            "_ACCESS_TOKEN": {"exp": time.time() + 20},
+            "_ACCESS_TOKEN_STRING": "incoming",
+        }
+        response = handler.after_request(response)
+    assert response.headers["Authorization"] != "incoming"
+
+
+@pytest.mark.parametrize("threshold", [0, 1.5])
+def test_invalid_refresh_threshold(threshold):
+    with pytest.raises(ValueError):
+        Handler(refresh_threshold=threshold)
+
+
+@pytest.mark.parametrize("cipher", ["aes-gcm", "auto"])
+def test_configure_cipher(cipher):
+    handler = Handler(
+        key="secret",
+        lifespan=60,
+        algorithm="HS256",
+        issuer="issuer",
+        audience="audience",
+        verify=True,
+        encryption_key="encryption-key",
+        cipher=cipher,
+    )
+    assert isinstance(handler.cipher, crypto.AEADCipher)
+    other = Handler(
+        key="secret",
+        lifespan=60,
+        algorithm="HS256",
+        issuer="issuer",
+        audience="audience",
+        verify=True,
+        encryption_key="encryption-key",
+    )
+    assert handler.decode_token(other.generate_token("user-id"))["uid"] == "user-id"
+    assert other.decode_token(handler.generate_token("user-id"))["uid"] == "user-id"